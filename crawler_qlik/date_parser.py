@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Conversão das datas lidas nas telas do QMC e do NPrinting
+Tabela própria de meses em português (sem locale.setlocale, que não existe
+nos containers Linux) e memoização: as telas repetem os mesmos horários em
+muitas linhas, então cada texto distinto é interpretado uma única vez.
+parse_column converte uma coluna inteira de uma vez
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+MESES = ["janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho",
+         "agosto", "setembro", "outubro", "novembro", "dezembro"]
+
+# Nome completo, abreviação ("mar") e grafia sem acento ("marco") -> número do mês
+NUMERO_MES: Dict[str, int] = {}
+for _numero, _nome in enumerate(MESES, start=1):
+    for _chave in (_nome, _nome[:3], _nome.replace("ç", "c")):
+        NUMERO_MES[_chave] = _numero
+
+# "3 de março de 2025 às 08:24" (tela de execuções do NPrinting; horário opcional)
+_RE_DATA_PT = re.compile(r"^\s*(\d{1,2})\s+de\s+([^\W\d_]+)\.?\s+de\s+(\d{4})(?:\s+(?:às|as)\s+(\d{1,2}):(\d{2}))?",
+                         re.IGNORECASE)
+# "2025-03-03 08:24:10" ou "2025-03-03T08:24" (coluna de última execução do QMC)
+_RE_DATA_ISO = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2}))?")
+
+CACHE_DATAS = 4096
+
+
+@lru_cache(maxsize=CACHE_DATAS)
+def parse_pt_datetime(texto: Optional[str]) -> Optional[datetime]:
+    """"3 de março de 2025 às 08:24" -> datetime; None se o texto não for uma data"""
+    m = _RE_DATA_PT.match(texto or "")
+    if not m:
+        return None
+    mes = NUMERO_MES.get(m.group(2).lower())
+    if mes is None:
+        return None
+    try:
+        return datetime(int(m.group(3)), mes, int(m.group(1)), int(m.group(4) or 0), int(m.group(5) or 0))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_DATAS)
+def parse_qmc_datetime(texto: Optional[str]) -> Optional[datetime]:
+    """"2025-03-03 08:24:10" -> datetime até o minuto; None se o texto não for uma data"""
+    m = _RE_DATA_ISO.match(texto or "")
+    if not m:
+        return None
+    try:
+        return datetime(*(int(g or 0) for g in m.groups()))
+    except ValueError:
+        return None
+
+
+def format_pt_datetime(valor: Optional[datetime]) -> str:
+    """Mesmo formato da tela de execuções ("3 de março de 2025 às 08:24")"""
+    if valor is None:
+        return ""
+    return f"{valor.day} de {MESES[valor.month - 1]} de {valor.year} às {valor:%H:%M}"
+
+
+def parse_column(valores: Iterable[Optional[str]],
+                 parser: Callable[[Optional[str]], Optional[datetime]] = parse_pt_datetime) -> List[Optional[datetime]]:
+    """
+    Converte uma coluna inteira: cada texto distinto passa uma vez pelo parser
+    e o resultado é distribuído para todas as linhas iguais.
+
+    Returns:
+        list: datetimes na mesma ordem dos valores (None onde não é data)
+    """
+    valores = list(valores)
+    convertidos = {texto: parser(texto) for texto in dict.fromkeys(valores)}
+    return [convertidos[texto] for texto in valores]
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Download segmentado e retomável dos instaladores do Qlik Sense Desktop
+Divide o arquivo em faixas (HTTP Range) baixadas em paralelo direto na
+posição final de um arquivo .part; o progresso de cada faixa fica num
+arquivo de estado ao lado, então uma falha (ou nova execução) continua de
+onde parou em vez de recomeçar do byte zero. No fim confere tamanho e,
+se informado, o SHA-256
+
+Servidores sem suporte a Range caem no download sequencial de um único fluxo
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+# Faixas baixadas em paralelo por arquivo
+DOWNLOAD_SEGMENTS = int(os.getenv("DESKTOP_DOWNLOAD_SEGMENTS", "4"))
+
+# Arquivos menores que isso (por faixa) não são divididos
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 256
+
+# Pasta dos downloads parciais (sobrevive entre execuções para retomar)
+PARTIAL_DIR = Path(os.getenv("DESKTOP_DOWNLOAD_DIR", "") or Path(__file__).resolve().parent / "cache" / "downloads")
+
+# Parciais de outros assets sem alteração há mais que isso são descartados
+PARTIAL_MAX_AGE_DAYS = float(os.getenv("DESKTOP_PARTIAL_MAX_AGE_DAYS", "7"))
+
+
+class DownloadError(RuntimeError):
+    """Falha definitiva no download (após as novas tentativas)"""
+
+
+def partial_path(url: str, name: str, version_tag: str = "") -> Path:
+    """Caminho estável do .part para a mesma URL/versão (permite retomar)"""
+    key = hashlib.sha1(f"{url}|{version_tag}".encode("utf-8")).hexdigest()[:12]
+    return PARTIAL_DIR / f"{name}.{key}.part"
+
+
+def prune_partials(name: str) -> int:
+    """
+    Remove downloads parciais abandonados: os do mesmo asset (versões/URLs
+    anteriores, que nunca serão retomados) e os de qualquer asset parados há
+    mais de PARTIAL_MAX_AGE_DAYS.
+
+    Returns:
+        int: Arquivos removidos
+    """
+    limit = time.time() - PARTIAL_MAX_AGE_DAYS * 86400
+    # <nome>.<chave>.part, seu estado (.part.json) e o temporário do estado (.part.tmp)
+    same_asset = re.compile(re.escape(name) + r"\.[0-9a-f]{12}\.part(\.json|\.tmp)?")
+    removed = 0
+    for path in PARTIAL_DIR.glob("*.part*"):
+        try:
+            if same_asset.fullmatch(path.name) or path.stat().st_mtime < limit:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def probe(url: str, headers: Dict[str, str], timeout: float) -> Tuple[str, Optional[int], bool]:
+    """
+    Descobre a URL final (após redirecionamentos), o tamanho e o suporte a Range
+    pedindo apenas o primeiro byte.
+
+    Returns:
+        tuple: (url final, tamanho total ou None, aceita Range)
+    """
+    req = Request(url, headers={**headers, "Range": "bytes=0-0"})
+    with urlopen(req, timeout=timeout) as resp:
+        final_url = resp.geturl()
+        content_range = resp.getheader("Content-Range") or ""
+        if resp.status == 206 and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return final_url, (int(total) if total.isdigit() else None), True
+        length = resp.getheader("Content-Length")
+        return final_url, (int(length) if length and length.isdigit() else None), False
+
+
+def plan_segments(total: int, segments: int) -> List[List[int]]:
+    """Divide [0, total) em faixas [início, fim inclusivo]"""
+    count = max(1, min(segments, total // MIN_SEGMENT_SIZE or 1))
+    step = -(-total // count)
+    return [[start, min(start + step, total) - 1] for start in range(0, total, step)]
+
+
+class _Progress:
+    """Progresso agregado das faixas, no mesmo formato de uma linha do downloader"""
+
+    def __init__(self, display_name: str, total: Optional[int], done: int = 0):
+        self.display_name = display_name
+        self.total = total
+        self.done = done
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.done += count
+            now = time.time()
+            if now - self._last < 0.5:
+                return
+            self._last = now
+            self._write()
+
+    def _write(self) -> None:
+        if self.total:
+            sys.stdout.write(f"\r  → {self.display_name} [{self.done * 100 // self.total}%]")
+        else:
+            sys.stdout.write(f"\r  → {self.display_name} [{self.done} bytes]")
+        sys.stdout.flush()
+
+    def finish(self) -> None:
+        with self._lock:
+            if self.total:
+                sys.stdout.write(f"\r  → {self.display_name} [100%]\n")
+            else:
+                sys.stdout.write("\n")
+            sys.stdout.flush()
+
+
+class _State:
+    """Estado das faixas gravado em <arquivo>.part.json"""
+
+    def __init__(self, path: Path, url_key: str, total: int, segments: List[List[int]]):
+        self.path = path
+        self.url_key = url_key
+        self.total = total
+        # Cada faixa: [próximo byte a baixar, fim inclusivo]
+        self.segments = segments
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, path: Path, url_key: str, total: int) -> Optional["_State"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("url_key") != url_key or data.get("total") != total:
+            return None
+        return cls(path, url_key, total, data["segments"])
+
+    def advance(self, index: int, count: int) -> None:
+        with self._lock:
+            self.segments[index][0] += count
+            if time.time() - self._last_save > 2:
+                self._save()
+
+    def remaining(self) -> int:
+        return sum(max(0, end - start + 1) for start, end in self.segments)
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        self._last_save = time.time()
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"url_key": self.url_key, "total": self.total, "segments": self.segments}, f)
+        os.replace(tmp, self.path)
+
+
+def _fetch_segment(url: str, headers: Dict[str, str], part: Path, state: _State, index: int,
+                   progress: _Progress, timeout: float, retries: int, retry_sleep: float) -> None:
+    """Baixa uma faixa escrevendo na posição final; novas tentativas continuam do último byte gravado"""
+    attempt = 0
+    while True:
+        start, end = state.segments[index]
+        if start > end:
+            return
+        attempt += 1
+        try:
+            req = Request(url, headers={**headers, "Range": f"bytes={start}-{end}"})
+            with urlopen(req, timeout=timeout) as resp, open(part, "r+b") as f:
+                if resp.status != 206:
+                    raise DownloadError("servidor ignorou o cabeçalho Range")
+                f.seek(start)
+                while True:
+                    chunk = resp.read(min(CHUNK_SIZE, end - state.segments[index][0] + 1))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    # O estado nunca pode apontar além do que já foi entregue ao SO
+                    f.flush()
+                    state.advance(index, len(chunk))
+                    progress.add(len(chunk))
+                    if state.segments[index][0] > end:
+                        break
+            if state.segments[index][0] <= end:
+                raise DownloadError(f"faixa {start}-{end} interrompida")
+            return
+        except (HTTPError, URLError, TimeoutError, OSError, http.client.HTTPException, DownloadError) as e:
+            state.save()
+            if attempt >= retries:
+                raise DownloadError(f"faixa {index} falhou após {attempt} tentativa(s): {e}")
+            time.sleep(retry_sleep)
+
+
+def _download_ranged(url: str, headers: Dict[str, str], part: Path, url_key: str, total: int,
+                     display_name: str, segments: int, timeout: float, retries: int, retry_sleep: float) -> None:
+    state_path = part.with_name(part.name + ".json")
+    state = _State.load(state_path, url_key, total) if part.exists() else None
+    if state is None:
+        with open(part, "wb") as f:
+            f.truncate(total)
+        state = _State(state_path, url_key, total, plan_segments(total, segments))
+        state.save()
+    else:
+        print(f"  ↻ Retomando {display_name}: {total - state.remaining()} de {total} bytes já baixados")
+
+    progress = _Progress(display_name, total, total - state.remaining())
+    pending = [i for i, (start, end) in enumerate(state.segments) if start <= end]
+    with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+        futures = [
+            pool.submit(_fetch_segment, url, headers, part, state, i, progress, timeout, retries, retry_sleep)
+            for i in pending
+        ]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except DownloadError as e:
+                errors.append(str(e))
+    state.save()
+    if errors:
+        sys.stdout.write("\n")
+        raise DownloadError("; ".join(errors))
+    progress.finish()
+    state_path.unlink(missing_ok=True)
+
+
+def _download_stream(url: str, headers: Dict[str, str], part: Path, display_name: str,
+                     total: Optional[int], timeout: float) -> None:
+    """Fluxo único (servidor sem Range): sempre do byte zero"""
+    progress = _Progress(display_name, total)
+    with urlopen(Request(url, headers=headers), timeout=timeout) as resp, open(part, "wb") as f:
+        while True:
+            chunk = resp.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+            progress.add(len(chunk))
+    progress.finish()
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def download(url: str, dest: Path, headers: Dict[str, str], display_name: str,
+             expected_size: Optional[int] = None, expected_sha256: Optional[str] = None,
+             version_tag: str = "", segments: int = DOWNLOAD_SEGMENTS, timeout: float = 60,
+             retries: int = 3, retry_sleep: float = 3) -> Path:
+    """
+    Baixa url para dest (segmentado e retomável quando o servidor aceita Range).
+
+    Args:
+        url (str): URL do asset
+        dest (Path): Arquivo final (o .part fica em PARTIAL_DIR até concluir)
+        headers (dict): Cabeçalhos HTTP
+        display_name (str): Nome mostrado no progresso
+        expected_size (int): Tamanho esperado (validado no fim)
+        expected_sha256 (str): SHA-256 esperado em hex (validado no fim, se informado)
+        version_tag (str): Identifica a versão do asset (ex.: updated_at) para não retomar um .part antigo
+        segments (int): Faixas em paralelo
+
+    Returns:
+        Path: dest
+
+    Raises:
+        DownloadError: Se o download falhar ou não passar na verificação
+    """
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+    part = partial_path(url, dest.name, version_tag)
+    url_key = part.stem
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            final_url, total, ranged = probe(url, headers, timeout)
+            total = total if total is not None else expected_size
+            if ranged and total:
+                _download_ranged(final_url, headers, part, url_key, total, display_name,
+                                 segments, timeout, retries, retry_sleep)
+            else:
+                _download_stream(final_url, headers, part, display_name, total, timeout)
+            break
+        except (HTTPError, URLError, TimeoutError, http.client.HTTPException, DownloadError) as e:
+            if attempt >= retries:
+                raise DownloadError(f"Falha ao baixar {url}: {e}")
+            time.sleep(retry_sleep)
+
+    size = part.stat().st_size
+    if expected_size is not None and size != expected_size:
+        part.unlink(missing_ok=True)
+        raise DownloadError(f"{display_name}: tamanho baixado ({size}) difere do esperado ({expected_size})")
+    if expected_sha256:
+        digest = sha256_file(part)
+        if digest.lower() != expected_sha256.lower():
+            part.unlink(missing_ok=True)
+            raise DownloadError(f"{display_name}: SHA-256 baixado não confere ({digest})")
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(part, dest)
+    prune_partials(dest.name)
+    return dest
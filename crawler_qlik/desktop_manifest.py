@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Manifesto de integridade das pastas de release do Qlik Sense Desktop
+Cada pasta de destino guarda um .qsd_manifest.json com tamanho, SHA-256,
+updated_at do GitHub e mtime de cada asset, gravado a partir do hash
+calculado durante a cópia. A verificação de "em dia" compara o arquivo com
+o manifesto (e o SHA-256 publicado), pegando cópias truncadas ou trocadas
+que passariam só por tamanho e data
+
+Sem manifesto (pastas antigas), o arquivo é re-hasheado sob demanda —
+em paralelo entre os destinos — e o manifesto é criado
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from crawler_qlik.desktop_store import sha256_of
+
+MANIFEST_NAME = ".qsd_manifest.json"
+
+# Diferença tolerada entre o mtime do arquivo e o registrado (granularidade de SMB/FAT)
+MTIME_TOLERANCE_SECONDS = 2.0
+
+# Arquivos re-hasheados ao mesmo tempo quando falta o manifesto
+REHASH_WORKERS = int(os.getenv("DESKTOP_REHASH_WORKERS", "4"))
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _folder_lock(folder: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(str(folder), threading.Lock())
+
+
+def load_manifest(folder: Path) -> Dict[str, dict]:
+    """Entradas do manifesto de uma pasta ({nome: {'size', 'sha256', 'updated_at', 'mtime'}})"""
+    try:
+        with open(Path(folder) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f).get("assets", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(path: Path, sha256: str, updated_at: Optional[datetime]) -> None:
+    """Registra (ou atualiza) a entrada de um arquivo no manifesto da sua pasta"""
+    path = Path(path)
+    folder = path.parent
+    with _folder_lock(folder):
+        try:
+            st = path.stat()
+            assets = load_manifest(folder)
+            assets[path.name] = {
+                'size': st.st_size,
+                'sha256': sha256.lower(),
+                'updated_at': updated_at.isoformat() if updated_at else None,
+                'mtime': st.st_mtime,
+            }
+            tmp = folder / (MANIFEST_NAME + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({'assets': assets}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, folder / MANIFEST_NAME)
+        except OSError as e:
+            print(f"⚠️ Não foi possível atualizar o manifesto de {folder}: {e}")
+
+
+def is_current(path: Path, remote_size: Optional[int], remote_updated_at: Optional[datetime],
+               remote_sha256: Optional[str]) -> bool:
+    """
+    Verifica se o arquivo de destino corresponde ao asset remoto.
+
+    - tamanho diferente do remoto: desatualizado
+    - entrada do manifesto válida (mesmo tamanho e mtime): compara SHA-256 (ou updated_at)
+    - sem manifesto e com SHA-256 remoto: re-hasheia o arquivo e grava o manifesto
+    - sem nenhum hash: volta à comparação por tamanho e data
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    if remote_size is not None and st.st_size != remote_size:
+        return False
+
+    entry = load_manifest(path.parent).get(path.name)
+    if entry and entry.get('size') == st.st_size and abs(entry.get('mtime', 0) - st.st_mtime) <= MTIME_TOLERANCE_SECONDS:
+        if remote_sha256:
+            return entry.get('sha256') == remote_sha256.lower()
+        if remote_updated_at and entry.get('updated_at'):
+            return datetime.fromisoformat(entry['updated_at']) >= remote_updated_at
+        return True
+
+    if remote_sha256:
+        digest = sha256_of(path)
+        if digest is None or digest != remote_sha256.lower():
+            return False
+        update_manifest(path, digest, remote_updated_at)
+        return True
+
+    if remote_updated_at and datetime.fromtimestamp(st.st_mtime, tz=remote_updated_at.tzinfo) < remote_updated_at:
+        return False
+    return True
+
+
+def check_current(paths: List[Path], remote_size: Optional[int], remote_updated_at: Optional[datetime],
+                  remote_sha256: Optional[str]) -> List[bool]:
+    """is_current para vários destinos em paralelo (os re-hashes de pastas sem manifesto rodam juntos)"""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(REHASH_WORKERS, len(paths)))) as pool:
+        return list(pool.map(lambda p: is_current(p, remote_size, remote_updated_at, remote_sha256), paths))
+
+
+def record_copies(copies: List[dict], updated_at: Optional[datetime]) -> None:
+    """Grava no manifesto os destinos copiados com sucesso (hash calculado durante a cópia)"""
+    for copy in copies:
+        if not copy.get('error') and copy.get('sha256'):
+            update_manifest(Path(copy['destination']), copy['sha256'], updated_at)
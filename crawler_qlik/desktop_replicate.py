@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Replicação concorrente dos assets do Qlik Sense Desktop
+Um leitor alimenta N gravadores (uma thread e uma fila limitada por
+destino), então o arquivo é lido uma única vez e todos os compartilhamentos
+recebem os dados ao mesmo tempo. Cada destino é gravado num arquivo
+temporário e renomeado só no fim, e a vazão de cada um é informada
+
+O SHA-256 é calculado pelo leitor durante a própria cópia (sem segunda
+leitura); se não conferir com o esperado, nenhum destino é renomeado
+"""
+
+import hashlib
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Tamanho de cada bloco lido/gravado
+REPLICATE_BUFFER_SIZE = int(os.getenv("DESKTOP_REPLICATE_BUFFER_MB", "8")) * 1024 * 1024
+
+# Blocos em espera por destino (limita a memória: buffer × profundidade × destinos)
+QUEUE_DEPTH = 4
+
+_END = object()
+
+
+class _Writer(threading.Thread):
+    """Grava os blocos recebidos em <destino>.partial e renomeia ao concluir"""
+
+    def __init__(self, src: Path, dst: Path):
+        super().__init__(daemon=True)
+        self.src = src
+        self.dst = dst
+        self.queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_DEPTH)
+        self.written = 0
+        self.elapsed = 0.0
+        self.error = None
+
+    def run(self):
+        tmp = self.dst.with_name(self.dst.name + ".partial")
+        start = time.perf_counter()
+        f = None
+        try:
+            self.dst.parent.mkdir(parents=True, exist_ok=True)
+            f = open(tmp, "wb")
+        except OSError as e:
+            self.error = e
+        while True:
+            chunk = self.queue.get()
+            if chunk is _END:
+                break
+            if self.error is not None:
+                # Continua consumindo para não travar o leitor
+                continue
+            try:
+                f.write(chunk)
+                self.written += len(chunk)
+            except OSError as e:
+                self.error = e
+        if f is not None:
+            f.close()
+        if self.error is None:
+            try:
+                shutil.copystat(self.src, tmp)
+                os.replace(tmp, self.dst)
+            except OSError as e:
+                self.error = e
+        if self.error is not None:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        self.elapsed = time.perf_counter() - start
+
+    def result(self, sha256: str) -> dict:
+        seconds = max(self.elapsed, 1e-6)
+        return {
+            'destination': str(self.dst),
+            'sha256': sha256,
+            'bytes': self.written,
+            'seconds': round(self.elapsed, 2),
+            'mb_per_s': round(self.written / seconds / (1024 * 1024), 1),
+            'error': str(self.error) if self.error else None,
+        }
+
+
+def replicate(src: Path, destinations: List[Path], buffer_size: int = REPLICATE_BUFFER_SIZE,
+              expected_sha256: Optional[str] = None) -> List[dict]:
+    """
+    Copia src para todos os destinos ao mesmo tempo (lendo a origem uma vez).
+
+    Falha em um destino não interrompe os demais.
+
+    Args:
+        expected_sha256 (str): Se informado, a cópia só é concluída se o hash lido conferir
+
+    Returns:
+        list: Um dict por destino ({'destination', 'sha256', 'bytes', 'seconds', 'mb_per_s', 'error'})
+    """
+    writers = [_Writer(src, Path(dst)) for dst in destinations]
+    for w in writers:
+        w.start()
+    digest = hashlib.sha256()
+    try:
+        with open(src, "rb") as f:
+            while True:
+                chunk = f.read(buffer_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                for w in writers:
+                    w.queue.put(chunk)
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            mismatch = ValueError(f"SHA-256 de {Path(src).name} não confere ({digest.hexdigest()})")
+            for w in writers:
+                w.error = w.error or mismatch
+    except OSError as e:
+        # Falha na leitura da origem invalida todos os destinos
+        for w in writers:
+            w.error = w.error or e
+    finally:
+        for w in writers:
+            w.queue.put(_END)
+        for w in writers:
+            w.join()
+
+    results = [w.result(digest.hexdigest()) for w in writers]
+    for r in results:
+        if r['error']:
+            print(f"  ⚠️ Falha ao copiar para {r['destination']}: {r['error']}")
+        else:
+            print(f"  ⇉ {r['destination']}: {r['bytes'] / (1024 * 1024):.1f} MB em {r['seconds']:.1f}s "
+                  f"({r['mb_per_s']:.1f} MB/s)")
+    return results
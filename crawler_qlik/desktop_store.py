@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Armazenamento por conteúdo (SHA-256) dos assets do Qlik Sense Desktop
+Cada compartilhamento de destino guarda os instaladores uma única vez em
+<base>/.qsd_store/<aa>/<sha256>; as pastas de versão ("Initial Release",
+"Latest", ...) recebem hardlinks para esses objetos. Um asset idêntico entre
+releases/ciclos não é baixado nem copiado de novo — só os que mudaram
+trafegam pela rede
+
+Se o compartilhamento não aceitar hardlink, a pasta de versão recebe uma
+cópia do objeto (ainda sem novo download)
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from crawler_qlik.desktop_replicate import replicate
+
+# Desativa com DESKTOP_DEDUP=0 (volta à cópia direta nas pastas de versão)
+DEDUP_ENABLED = os.getenv("DESKTOP_DEDUP", "1").strip().lower() not in ("0", "false", "no", "nao", "não")
+
+STORE_DIRNAME = ".qsd_store"
+
+
+def object_path(base: Path, sha256: str) -> Path:
+    """Caminho do objeto no armazenamento de um compartilhamento"""
+    sha256 = sha256.lower()
+    return Path(base) / STORE_DIRNAME / sha256[:2] / sha256
+
+
+def has_object(obj: Path, size: Optional[int]) -> bool:
+    try:
+        return size is None or obj.stat().st_size == size
+    except OSError:
+        return False
+
+
+def sha256_of(path: Path) -> Optional[str]:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def link_into(obj: Path, dest: Path) -> str:
+    """
+    Faz dest apontar para o objeto.
+
+    Returns:
+        str: 'atual' (já é o mesmo arquivo), 'vinculado' (hardlink criado) ou 'copiado' (sem suporte a hardlink)
+    """
+    try:
+        if dest.exists() and os.path.samefile(obj, dest):
+            return 'atual'
+    except OSError:
+        pass
+    tmp = dest.with_name(dest.name + ".link")
+    try:
+        tmp.unlink(missing_ok=True)
+        os.link(obj, tmp)
+        os.replace(tmp, dest)
+        return 'vinculado'
+    except OSError:
+        tmp.unlink(missing_ok=True)
+    results = replicate(obj, [dest])
+    if results[0]['error']:
+        raise OSError(results[0]['error'])
+    return 'copiado'
+
+
+def store_asset(sha256: str, size: Optional[int], targets: List[Tuple[Path, Path]],
+                candidates: List[Path], download: Callable[[], Path], force: bool = False) -> Dict:
+    """
+    Garante o objeto em cada compartilhamento e vincula as pastas de versão a ele.
+
+    A origem dos dados, em ordem: objeto já presente em outro compartilhamento,
+    um arquivo existente já conferido (candidates), ou o download.
+
+    Args:
+        sha256 (str): Hash do asset
+        size (int): Tamanho esperado
+        targets (list): Pares (base do compartilhamento, caminho na pasta de versão)
+        candidates (list): Arquivos já conferidos com o SHA-256 (ex.: destinos em dia pelo manifesto)
+        download (callable): Baixa o asset para um temporário e retorna o caminho
+        force (bool): Ignora objetos existentes e baixa de novo
+
+    Returns:
+        dict: {'source': 'armazenamento' | 'existente' | 'download' | None,
+               'copies': vazão das cópias, 'links': {destino: resultado de link_into}}
+    """
+    objects = {base: object_path(base, sha256) for base, _ in targets}
+    missing = [base for base, obj in objects.items() if force or not has_object(obj, size)]
+
+    source_kind = None
+    copies: List[dict] = []
+    if missing:
+        source, tmp = None, None
+        if not force:
+            present = [obj for base, obj in objects.items() if base not in missing]
+            if present:
+                source, source_kind = present[0], 'armazenamento'
+            else:
+                for cand in candidates:
+                    if has_object(cand, size):
+                        source, source_kind = cand, 'existente'
+                        break
+        if source is None:
+            tmp = download()
+            source, source_kind = tmp, 'download'
+        try:
+            for base in missing:
+                objects[base].parent.mkdir(parents=True, exist_ok=True)
+            # O hash é conferido durante a própria cópia; objeto divergente não é gravado
+            copies = replicate(source, [objects[base] for base in missing], expected_sha256=sha256)
+        finally:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+
+    failed = {Path(c['destination']) for c in copies if c['error']}
+    links = {}
+    for base, dest in targets:
+        if objects[base] in failed:
+            links[str(dest)] = 'falhou'
+            continue
+        try:
+            links[str(dest)] = link_into(objects[base], dest)
+        except OSError as e:
+            print(f"  ⚠️ Falha ao vincular {dest}: {e}")
+            links[str(dest)] = 'falhou'
+    return {'source': source_kind, 'copies': copies, 'links': links}
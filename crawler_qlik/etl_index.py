@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Índice local (SQLite) dos metadados das pastas de ETL
+Guarda caminho → (tamanho, mtime, última vez visto) e o mtime de cada
+diretório, para que as verificações horárias só listem de novo os
+diretórios que mudaram, sem varrer a árvore inteira
+
+Observação: o mtime de um diretório muda quando arquivos são criados,
+removidos ou renomeados nele, mas não quando um arquivo existente é
+sobrescrito no lugar. Por isso os diretórios sem mudança que guardam
+arquivos ainda não atualizados hoje são listados de novo (uma listagem traz
+o stat de todas as entradas; os já atualizados hoje não mudam o resultado),
+e há varredura completa periódica
+(ETL_INDEX_FULL_SCAN_HOURS, padrão 24h) ou sob demanda (--full-scan)
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from crawler_qlik.etl_scanner import (
+    DEFAULT_WORKERS_PER_SHARE, FileEntry, describe_os_error, scan_dir_entries, scan_tree, scan_trees
+)
+
+# Banco do índice (fora de reports_qlik/errorlogs, que são limpos após o envio)
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent / "cache" / "etl_index.sqlite3"
+
+
+def full_scan_hours() -> float:
+    """Intervalo máximo entre varreduras completas de uma pasta raiz (lido na hora, após o .env)"""
+    return float(os.getenv("ETL_INDEX_FULL_SCAN_HOURS", "24"))
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    recursive INTEGER NOT NULL,
+    last_full_scan REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    mtime REAL,
+    last_scanned REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dirs_root ON dirs(root);
+CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS idx_files_root_mtime ON files(root, mtime);
+"""
+
+
+def connect(db_path=None) -> sqlite3.Connection:
+    """Abre o índice, criando a pasta e o esquema se necessário"""
+    db_path = Path(db_path or DEFAULT_INDEX_PATH)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _store_listing(conn: sqlite3.Connection, root: str, listing, now: float) -> None:
+    """Grava a listagem de um diretório, removendo arquivos que não existem mais"""
+    conn.execute(
+        "INSERT OR REPLACE INTO dirs (path, root, mtime, last_scanned) VALUES (?, ?, ?, ?)",
+        (listing.path, root, listing.mtime, now)
+    )
+    current = {f.path for f in listing.files}
+    known = {row[0] for row in conn.execute("SELECT path FROM files WHERE dir = ?", (listing.path,))}
+    removed = known - current
+    if removed:
+        conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+    conn.executemany(
+        "INSERT INTO files (path, dir, root, size, mtime, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, last_seen = excluded.last_seen",
+        [(f.path, listing.path, root, f.size, f.mtime, now, now) for f in listing.files]
+    )
+
+
+def _drop_dirs(conn: sqlite3.Connection, dirs: List[str]) -> None:
+    """Remove do índice diretórios que deixaram de existir (e seus arquivos)"""
+    conn.executemany("DELETE FROM files WHERE dir = ?", [(d,) for d in dirs])
+    conn.executemany("DELETE FROM dirs WHERE path = ?", [(d,) for d in dirs])
+
+
+def _dir_mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _full_scan(conn, root, recursive, workers, now) -> bool:
+    listings = []
+    files, warnings = scan_tree(root, recursive, workers, on_listing=listings.append)
+    for w in warnings:
+        print(f"⚠️ {w}")
+    if files is None:
+        return False
+    with conn:
+        conn.execute("DELETE FROM files WHERE root = ?", (root,))
+        conn.execute("DELETE FROM dirs WHERE root = ?", (root,))
+        for listing in listings:
+            _store_listing(conn, root, listing, now)
+        conn.execute(
+            "INSERT OR REPLACE INTO roots (path, recursive, last_full_scan) VALUES (?, ?, ?)",
+            (root, int(recursive), now)
+        )
+    return True
+
+
+def refresh_root(conn: sqlite3.Connection, root: str, recursive: bool = True,
+                 workers: int = DEFAULT_WORKERS_PER_SHARE, full: bool = False,
+                 recheck_since: Optional[float] = None) -> Optional[Dict[str, int]]:
+    """
+    Atualiza o índice de uma pasta raiz.
+
+    Faz varredura completa na primeira vez, quando solicitado (full) ou após
+    full_scan_hours(); nas demais, consulta só o mtime de cada diretório
+    conhecido (em paralelo) e lista novamente apenas os que mudaram e os que
+    guardam arquivos com mtime anterior a recheck_since (padrão: início de
+    hoje), que podem ter sido sobrescritos no lugar sem alterar o mtime do
+    diretório. Subpastas novas são varridas no mesmo pool de threads.
+
+    Returns:
+        dict: {'mode', 'dirs_checked', 'dirs_rescanned', 'files_updated'} ou None se a raiz estiver inacessível
+    """
+    now = time.time()
+    root_row = conn.execute("SELECT recursive, last_full_scan FROM roots WHERE path = ?", (root,)).fetchone()
+    needs_full = (
+        full
+        or root_row is None
+        or bool(root_row[0]) != recursive
+        or now - root_row[1] > full_scan_hours() * 3600
+    )
+    if needs_full:
+        if not _full_scan(conn, root, recursive, workers, now):
+            return None
+        total = conn.execute("SELECT COUNT(*) FROM dirs WHERE root = ?", (root,)).fetchone()[0]
+        return {'mode': 'full', 'dirs_checked': total, 'dirs_rescanned': total, 'files_updated': 0}
+
+    known = dict(conn.execute("SELECT path, mtime FROM dirs WHERE root = ?", (root,)))
+    if _dir_mtime(root) is None:
+        print(f"⚠️ {describe_os_error(root, OSError('pasta inacessível'))}")
+        return None
+
+    if recheck_since is None:
+        recheck_since = _day_bounds(date.today())[0]
+
+    def rescan(d):
+        try:
+            return scan_dir_entries(d)
+        except OSError as e:
+            print(f"⚠️ {describe_os_error(d, e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        current = dict(zip(known, pool.map(_dir_mtime, known)))
+        gone = [d for d, m in current.items() if m is None]
+        changed = [d for d, m in current.items() if m is not None and m != known[d]]
+        unchanged = [d for d in known if d not in gone and d not in changed]
+
+        # Arquivos sobrescritos no lugar não mudam o mtime do diretório: os diretórios
+        # sem mudança com arquivos ainda não atualizados são listados de novo
+        stale_dirs = [d for d in unchanged if conn.execute(
+            "SELECT 1 FROM files WHERE dir = ? AND mtime < ? LIMIT 1", (d, recheck_since)
+        ).fetchone()]
+        listings = [l for l in pool.map(rescan, changed + stale_dirs) if l is not None]
+
+        # Subpastas novas (ainda não indexadas) são varridas por completo, no mesmo pool
+        new_listings = []
+        if recursive:
+            new_subdirs = list(dict.fromkeys(sub for l in listings for sub in l.subdirs if sub not in known))
+            for _, warnings in scan_trees(new_subdirs, pool, True, new_listings.append).values():
+                for w in warnings:
+                    print(f"⚠️ {w}")
+
+    # Arquivos cujo tamanho/mtime mudou sem mudança no diretório
+    files_updated = 0
+    for listing in listings:
+        if listing.path in changed:
+            continue
+        stored = {path: (size, mtime) for path, size, mtime in conn.execute(
+            "SELECT path, size, mtime FROM files WHERE dir = ?", (listing.path,)
+        )}
+        files_updated += sum(1 for f in listing.files if stored.get(f.path) != (f.size, f.mtime))
+
+    relisted = {listing.path for listing in listings}
+    with conn:
+        _drop_dirs(conn, gone)
+        for listing in listings + new_listings:
+            _store_listing(conn, root, listing, now)
+        # Diretórios sem mudança e sem nova listagem: arquivos confirmados
+        confirmed = [d for d in unchanged if d not in relisted]
+        conn.executemany("UPDATE files SET last_seen = ? WHERE dir = ?", [(now, d) for d in confirmed])
+        conn.executemany("UPDATE dirs SET last_scanned = ? WHERE path = ?", [(now, d) for d in confirmed])
+
+    return {'mode': 'incremental', 'dirs_checked': len(known), 'dirs_rescanned': len(listings) + len(new_listings),
+            'files_updated': files_updated}
+
+
+def files_under(conn: sqlite3.Connection, root: str) -> List[FileEntry]:
+    """Arquivos indexados de uma pasta raiz"""
+    return [FileEntry(*row) for row in conn.execute(
+        "SELECT path, size, mtime FROM files WHERE root = ? ORDER BY path", (root,)
+    )]
+
+
+def _day_bounds(day) -> tuple:
+    start = datetime.combine(day, datetime.min.time())
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def not_updated_on(conn: sqlite3.Connection, roots: List[str], day) -> List[FileEntry]:
+    """Arquivos das pastas cujo mtime é anterior ao dia informado (não atualizados no dia)"""
+    start, _ = _day_bounds(day)
+    marks = ", ".join("?" for _ in roots)
+    return [FileEntry(*row) for row in conn.execute(
+        f"SELECT path, size, mtime FROM files WHERE root IN ({marks}) AND mtime < ? ORDER BY path",
+        [*roots, start]
+    )]
+
+
+def stale_since_yesterday(conn: sqlite3.Connection, roots: List[str], day) -> List[FileEntry]:
+    """Arquivos atualizados no dia anterior mas não no dia informado (ficaram desatualizados)"""
+    start, _ = _day_bounds(day)
+    yesterday_start, _ = _day_bounds(day - timedelta(days=1))
+    marks = ", ".join("?" for _ in roots)
+    return [FileEntry(*row) for row in conn.execute(
+        f"SELECT path, size, mtime FROM files WHERE root IN ({marks}) AND mtime >= ? AND mtime < ? ORDER BY path",
+        [*roots, yesterday_start, start]
+    )]
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Varredura concorrente das pastas de ETL
+Percorre os diretórios com os.scandir (o DirEntry já traz tamanho e data de
+modificação da própria listagem), em paralelo com um pool de threads por
+compartilhamento de rede, chamando stat uma única vez por arquivo
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Threads por compartilhamento (servidor\share) — cada listagem é um round-trip SMB
+DEFAULT_WORKERS_PER_SHARE = int(os.getenv("ETL_SCAN_WORKERS", "8"))
+
+
+class FileEntry(NamedTuple):
+    """Metadados de um arquivo obtidos na varredura"""
+    path: str
+    size: int
+    mtime: float
+
+
+class DirListing(NamedTuple):
+    """Resultado da listagem de um único diretório"""
+    path: str
+    mtime: Optional[float]
+    files: List[FileEntry]
+    subdirs: List[str]
+
+
+# Códigos winerror mais comuns nas pastas UNC
+WINERROR_MESSAGES = {
+    1326: "Erro de autenticação ao acessar pasta",
+    53: "Caminho de rede não encontrado",
+    5: "Acesso negado à pasta",
+}
+
+
+def describe_os_error(path: str, error: OSError) -> str:
+    """Mensagem amigável para erros de acesso a pastas de rede"""
+    winerror = getattr(error, "winerror", None)
+    if winerror in WINERROR_MESSAGES:
+        return f"{WINERROR_MESSAGES[winerror]}: {path}"
+    return f"Erro ao acessar pasta {path}: {error}"
+
+
+def share_key(path: str) -> str:
+    """
+    Identifica o compartilhamento de um caminho (\\\\servidor\\share ou unidade local),
+    usado para agrupar as pastas no mesmo pool de threads.
+    """
+    normalized = path.replace("/", "\\")
+    if normalized.startswith("\\\\"):
+        parts = [p for p in normalized.split("\\") if p]
+        return "\\\\" + "\\".join(parts[:2])
+    drive, _ = os.path.splitdrive(path)
+    return drive or os.path.abspath(path).split(os.sep)[0] or os.sep
+
+
+def scan_dir_entries(path: str) -> DirListing:
+    """
+    Lista um único diretório (sem recursão) com os.scandir.
+
+    Raises:
+        OSError: Se o diretório não puder ser listado
+    """
+    files = []
+    subdirs = []
+    dir_mtime = None
+    try:
+        dir_mtime = os.stat(path).st_mtime
+    except OSError:
+        pass
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    files.append(FileEntry(entry.path, st.st_size, st.st_mtime))
+            except OSError:
+                # Arquivo removido/renomeado durante a listagem
+                continue
+    return DirListing(path, dir_mtime, files, subdirs)
+
+
+def scan_trees(roots: List[str], pool: ThreadPoolExecutor, recursive: bool = True,
+               on_listing=None) -> Dict[str, Tuple[Optional[List[FileEntry]], List[str]]]:
+    """
+    Varre várias pastas (e subpastas) ao mesmo tempo num único pool de threads:
+    as listagens de todas as pastas entram na mesma fila, então o pool fica
+    ocupado mesmo quando uma das árvores tem poucos diretórios.
+
+    Args:
+        roots (list): Pastas raiz
+        pool (ThreadPoolExecutor): Pool usado para listar os diretórios
+        recursive (bool): Se False, lista apenas o nível de cada pasta
+        on_listing (callable): Chamado com cada DirListing (ex.: para indexar)
+
+    Returns:
+        dict: {pasta: (arquivos ou None se a raiz estiver inacessível, avisos das subpastas)}
+    """
+    results: Dict[str, Tuple[Optional[List[FileEntry]], List[str]]] = {root: (None, []) for root in roots}
+    # futuro -> (pasta raiz, diretório listado)
+    pending = {pool.submit(scan_dir_entries, root): (root, root) for root in roots}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            root, directory = pending.pop(future)
+            try:
+                listing = future.result()
+            except OSError as e:
+                if directory == root:
+                    print(f"⚠️ {describe_os_error(root, e)}")
+                else:
+                    results[root][1].append(describe_os_error(directory, e))
+                continue
+            if directory == root:
+                results[root] = ([], results[root][1])
+            results[root][0].extend(listing.files)
+            if on_listing:
+                on_listing(listing)
+            if recursive:
+                for sub in listing.subdirs:
+                    pending[pool.submit(scan_dir_entries, sub)] = (root, sub)
+    return results
+
+
+def scan_tree(root: str, recursive: bool = True, max_workers: int = DEFAULT_WORKERS_PER_SHARE,
+              on_listing=None) -> Tuple[Optional[List[FileEntry]], List[str]]:
+    """
+    Varre uma pasta (e subpastas) listando os diretórios em paralelo.
+
+    Args:
+        root (str): Pasta raiz
+        recursive (bool): Se False, lista apenas o nível da pasta
+        max_workers (int): Threads usadas para listar os diretórios
+        on_listing (callable): Chamado com cada DirListing (ex.: para indexar)
+
+    Returns:
+        tuple: (arquivos ou None se a raiz estiver inacessível, avisos das subpastas)
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return scan_trees([root], pool, recursive, on_listing)[root]
+
+
+def scan_directories(dirs: List[str], recursive: bool = True,
+                     workers_per_share: int = DEFAULT_WORKERS_PER_SHARE,
+                     on_listing=None) -> Dict[str, Optional[List[FileEntry]]]:
+    """
+    Varre várias pastas ao mesmo tempo; pastas do mesmo compartilhamento
+    dividem um pool de threads, compartilhamentos diferentes rodam em paralelo.
+
+    Returns:
+        dict: {pasta: lista de FileEntry, ou None se inacessível}
+    """
+    by_share: Dict[str, List[str]] = {}
+    for d in dirs:
+        by_share.setdefault(share_key(d), []).append(d)
+
+    def scan_share(share_dirs):
+        with ThreadPoolExecutor(max_workers=workers_per_share) as pool:
+            share_results = scan_trees(share_dirs, pool, recursive, on_listing)
+        results = {}
+        for d in share_dirs:
+            files, warnings = share_results[d]
+            for w in warnings:
+                print(f"⚠️ {w}")
+            results[d] = files
+        return results
+
+    results: Dict[str, Optional[List[FileEntry]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(by_share))) as pool:
+        for share_results in pool.map(scan_share, by_share.values()):
+            results.update(share_results)
+    # Mantém a ordem de entrada das pastas
+    return {d: results.get(d) for d in dirs}
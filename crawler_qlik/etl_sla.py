@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regras de SLA de atualização dos arquivos de ETL
+Cada regra associa um padrão de caminho (glob ou regex) a uma frequência
+esperada de recarga: intervalo em horas ou calendário (dias da semana, dias
+do mês e hora), com uma janela de tolerância. Arquivos que não casam com
+nenhuma regra seguem o padrão antigo: atualizado no dia
+
+Formato do arquivo (etl_sla_rules.json):
+{
+  "rules": [
+    {"name": "Semanais", "pattern": "*/Semanal/*", "schedule": {"weekdays": [0], "hour": 6}, "grace_hours": 4},
+    {"name": "Mensais", "pattern": "*/Mensal/*", "schedule": {"days": [1], "hour": 6}, "grace_hours": 24},
+    {"name": "Incrementais", "regex": "_INC_.*\\\\.qvd$", "interval_hours": 2, "grace_hours": 1}
+  ]
+}
+weekdays: 0 = segunda ... 6 = domingo. A primeira regra que casar vale.
+"""
+
+import json
+import os
+import re
+import fnmatch
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Arquivo de regras padrão (ao lado do módulo)
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "etl_sla_rules.json"
+
+# Regra aplicada quando nenhuma outra casa: atualizado desde a meia-noite do dia
+DEFAULT_RULE = {"name": "Diário (padrão)", "pattern": "*", "schedule": {"hour": 0}, "grace_hours": 0}
+
+# Quantos dias voltar procurando a última execução prevista no calendário
+SCHEDULE_LOOKBACK_DAYS = 62
+
+# Grupos nomeados e referências numeradas dentro da regex de uma regra
+_NAMED_GROUP = re.compile(r"\(\?P<[^>]*>")
+_NUMBERED_BACKREF = re.compile(r"(?<!\\)\\[1-9]")
+
+_FLAGS = re.IGNORECASE | re.DOTALL
+
+
+class SlaViolation(NamedTuple):
+    """Arquivo fora do SLA"""
+    path: str
+    mtime: float
+    rule: str
+    deadline: datetime
+
+
+def load_rules(path=None) -> List[Dict]:
+    """
+    Carrega as regras do arquivo JSON; a regra padrão é sempre a última.
+
+    Returns:
+        list: Regras na ordem de avaliação
+    """
+    path = Path(path or os.getenv("ETL_SLA_RULES", "") or DEFAULT_RULES_PATH)
+    rules = []
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rules = json.load(f).get("rules", [])
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Erro ao ler regras de SLA em {path}: {e} (usando apenas a regra padrão)")
+            rules = []
+    valid = []
+    for rule in rules:
+        if not (rule.get("pattern") or rule.get("regex")):
+            continue
+        _, problem = _checked_rule_regex(rule)
+        if problem:
+            print(f"⚠️ Regra de SLA '{rule.get('name', '?')}' ignorada: {problem}")
+            continue
+        valid.append(rule)
+    return valid + [DEFAULT_RULE]
+
+
+def _rule_regex(rule: Dict) -> str:
+    if rule.get("regex"):
+        # Regex do usuário: busca em qualquer ponto do caminho. Grupos nomeados
+        # colidiriam com os grupos r<i> da regex combinada: viram grupos sem captura
+        return f".*?(?:{_NAMED_GROUP.sub('(?:', rule['regex'])})"
+    return fnmatch.translate(rule["pattern"].replace("\\", "/"))
+
+
+def _checked_rule_regex(rule: Dict):
+    """
+    Regex da regra compilada isoladamente, antes de entrar na regex combinada.
+
+    Returns:
+        tuple: (regex, None) se válida ou (None, motivo) se inválida
+    """
+    regex = _rule_regex(rule)
+    if rule.get("regex") and _NUMBERED_BACKREF.search(regex):
+        # Na regex combinada a numeração dos grupos muda
+        return None, "referências numeradas (\\1...) não são suportadas"
+    try:
+        re.compile(regex, _FLAGS)
+    except re.error as e:
+        return None, f"regex inválida ({e})"
+    return regex, None
+
+
+def compile_rules(rules: List[Dict]):
+    """
+    Uma única regex com um grupo por regra (a primeira alternativa que casa vence).
+
+    Cada regra é validada isoladamente; as inválidas ficam de fora (nunca
+    casam) sem mudar o índice das demais no nome do grupo.
+    """
+    alternatives = []
+    for i, rule in enumerate(rules):
+        regex, _ = _checked_rule_regex(rule)
+        if regex is not None:
+            alternatives.append(f"(?P<r{i}>{regex})")
+    return re.compile("|".join(alternatives), _FLAGS)
+
+
+def rule_deadline(rule: Dict, now: datetime) -> datetime:
+    """
+    Momento a partir do qual o arquivo precisa ter sido modificado.
+
+    - interval_hours: agora - (intervalo + tolerância)
+    - schedule: última execução prevista cuja tolerância já venceu
+    """
+    grace = timedelta(hours=float(rule.get("grace_hours", 0)))
+    if rule.get("interval_hours") and not rule.get("schedule"):
+        return now - timedelta(hours=float(rule["interval_hours"])) - grace
+
+    schedule = rule.get("schedule") or {}
+    weekdays = set(schedule.get("weekdays") or range(7))
+    days = set(schedule.get("days") or range(1, 32))
+    hour = float(schedule.get("hour", 0))
+    for back in range(SCHEDULE_LOOKBACK_DAYS + 1):
+        day = (now - timedelta(days=back)).date()
+        if day.weekday() not in weekdays or day.day not in days:
+            continue
+        expected = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+        if expected + grace <= now:
+            return expected
+    # Calendário sem ocorrência recente: não cobra o arquivo
+    return datetime.min
+
+
+def evaluate(entries, rules: List[Dict], now: Optional[datetime] = None):
+    """
+    Avalia todos os arquivos de uma vez.
+
+    O prazo é calculado uma vez por regra; por arquivo resta só a
+    classificação pela regex combinada e a comparação vetorizada dos mtimes.
+
+    Args:
+        entries: Sequência de FileEntry (path, size, mtime)
+        rules (list): Regras de load_rules
+        now (datetime): Momento de referência (padrão: agora)
+
+    Returns:
+        tuple: (array booleano ok por arquivo, lista de SlaViolation)
+    """
+    now = now or datetime.now()
+    if not entries:
+        return np.zeros(0, dtype=bool), []
+
+    matcher = compile_rules(rules)
+    deadlines = [rule_deadline(rule, now) for rule in rules]
+    deadline_ts = np.array([d.timestamp() if d != datetime.min else -np.inf for d in deadlines])
+
+    default_idx = len(rules) - 1
+    rule_idx = np.empty(len(entries), dtype=np.int64)
+    for i, entry in enumerate(entries):
+        m = matcher.match(entry.path.replace("\\", "/"))
+        rule_idx[i] = int(m.lastgroup[1:]) if m else default_idx
+
+    mtimes = np.fromiter((entry.mtime for entry in entries), dtype=np.float64, count=len(entries))
+    ok = mtimes >= deadline_ts[rule_idx]
+
+    violations = [
+        SlaViolation(entries[i].path, entries[i].mtime, rules[rule_idx[i]].get("name", f"regra {rule_idx[i]}"),
+                     deadlines[rule_idx[i]])
+        for i in np.flatnonzero(~ok)
+    ]
+    return ok, violations
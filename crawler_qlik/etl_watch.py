@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modo de observação contínua das pastas de ETL
+Mantém um observador de longa duração nas pastas configuradas e emite
+eventos de atualização/SLA assim que acontecem, guardando em memória o
+último estado de cada arquivo para consultas imediatas
+
+Backends:
+- watchdog (inotify no Linux, ReadDirectoryChangesW no Windows) para pastas
+  locais, se o pacote estiver instalado
+- polling por mtime de diretório (fallback para SMB/UNC): a cada intervalo
+  consulta o mtime dos diretórios conhecidos e lista só os que mudaram, com
+  uma varredura completa a cada N ciclos (sobrescrita no lugar não altera o
+  mtime do diretório)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from crawler_qlik.etl_scanner import (
+    DEFAULT_WORKERS_PER_SHARE, FileEntry, describe_os_error, scan_dir_entries, scan_tree
+)
+from crawler_qlik.etl_sla import evaluate as evaluate_sla, load_rules
+from crawler_qlik.network_config import is_remote_path
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+# Intervalo do polling e da reavaliação dos prazos de SLA (segundos)
+DEFAULT_POLL_SECONDS = float(os.getenv("ETL_WATCH_INTERVAL", "60"))
+
+# Varredura completa a cada N ciclos de polling
+DEFAULT_FULL_SCAN_EVERY = int(os.getenv("ETL_WATCH_FULL_SCAN_EVERY", "30"))
+
+# Espera (segundos) para agrupar eventos de arquivo numa única reavaliação de SLA
+# (a gravação de um QVD grande dispara muitos eventos de modificação)
+DEFAULT_DEBOUNCE_SECONDS = float(os.getenv("ETL_WATCH_DEBOUNCE", "2"))
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Repassa eventos do watchdog para o EtlWatcher"""
+
+    def __init__(self, watcher, root):
+        self.watcher = watcher
+        self.root = root
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            if event.event_type in ("moved", "deleted"):
+                self.watcher._drop_tree(self.root, event.src_path)
+            if event.event_type in ("created", "moved"):
+                self.watcher._rescan_tree(self.root, getattr(event, "dest_path", None) or event.src_path)
+            return
+        if event.event_type == "moved":
+            self.watcher._file_removed(event.src_path)
+            self.watcher._file_touched(self.root, event.dest_path)
+        elif event.event_type == "deleted":
+            self.watcher._file_removed(event.src_path)
+        else:
+            self.watcher._file_touched(self.root, event.src_path)
+
+
+class EtlWatcher:
+    """
+    Observa as pastas de ETL e mantém o estado de cada arquivo em memória.
+
+    Eventos emitidos (dict com 'type'):
+    - 'created' / 'updated' / 'deleted': mudança no arquivo
+    - 'violation': arquivo saiu do SLA (prazo venceu sem atualização)
+    - 'recovered': arquivo voltou para dentro do SLA
+    - 'unreachable': pasta raiz ficou inacessível
+    """
+
+    def __init__(self, dirs: List[str], emit: Optional[Callable[[dict], None]] = None,
+                 rules_path: Optional[str] = None, backend: str = "auto",
+                 interval: float = DEFAULT_POLL_SECONDS, full_scan_every: int = DEFAULT_FULL_SCAN_EVERY,
+                 workers: int = DEFAULT_WORKERS_PER_SHARE, debounce: float = DEFAULT_DEBOUNCE_SECONDS):
+        self.dirs = list(dirs)
+        self.emit = emit or (lambda event: None)
+        self.rules = load_rules(rules_path)
+        self.backend = backend
+        self.interval = interval
+        self.full_scan_every = max(1, full_scan_every)
+        self.workers = workers
+        self.debounce = debounce
+
+        self._lock = threading.RLock()
+        self._files: Dict[str, FileEntry] = {}
+        self._by_dir: Dict[str, set] = {}
+        self._dirs: Dict[str, Dict[str, Optional[float]]] = {d: {} for d in self.dirs}
+        self._ok: Dict[str, bool] = {}
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observers = []
+        self._pending_evaluate: Optional[threading.Timer] = None
+
+    # ---------------- consultas ----------------
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Estado atual de todos os arquivos: {path: {'size', 'mtime', 'ok'}}"""
+        with self._lock:
+            return {
+                path: {'size': e.size, 'mtime': e.mtime, 'ok': self._ok.get(path, True)}
+                for path, e in self._files.items()
+            }
+
+    def status(self, path: str) -> Optional[dict]:
+        """Estado de um arquivo (ou None se não estiver sendo observado)"""
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                return None
+            return {'size': entry.size, 'mtime': entry.mtime, 'ok': self._ok.get(path, True)}
+
+    def violations(self) -> List[str]:
+        """Arquivos atualmente fora do SLA"""
+        with self._lock:
+            return sorted(p for p, ok in self._ok.items() if not ok)
+
+    # ---------------- estado interno ----------------
+
+    def _emit(self, event_type: str, **data) -> None:
+        try:
+            self.emit({'type': event_type, 'at': datetime.now().isoformat(timespec='seconds'), **data})
+        except Exception as e:
+            print(f"⚠️ Erro ao emitir evento de observação: {e}")
+
+    def _apply_listing(self, root: str, listing, silent: bool = False) -> None:
+        """Atualiza o estado com a listagem de um diretório (detecta criados/alterados/removidos)"""
+        with self._lock:
+            self._dirs[root][listing.path] = listing.mtime
+            current = {f.path: f for f in listing.files}
+            for path in list(self._by_dir.get(listing.path, ())):
+                if path not in current:
+                    self._file_removed(path, silent)
+            for path, entry in current.items():
+                old = self._files.get(path)
+                if old is not None and old.mtime == entry.mtime and old.size == entry.size:
+                    continue
+                self._files[path] = entry
+                self._by_dir.setdefault(listing.path, set()).add(path)
+                if not silent:
+                    self._emit('created' if old is None else 'updated', path=path, size=entry.size,
+                               mtime=datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M:%S"))
+
+    def _file_touched(self, root: str, path: str) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        listing_dir = os.path.dirname(path)
+        entry = FileEntry(path, st.st_size, st.st_mtime)
+        with self._lock:
+            old = self._files.get(path)
+            if old is not None and old.mtime == entry.mtime and old.size == entry.size:
+                return
+            self._files[path] = entry
+            self._by_dir.setdefault(listing_dir, set()).add(path)
+            self._dirs[root].setdefault(listing_dir, None)
+        self._emit('created' if old is None else 'updated', path=path, size=entry.size,
+                   mtime=datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M:%S"))
+        self._schedule_evaluate()
+
+    def _schedule_evaluate(self) -> None:
+        """Agenda uma reavaliação do SLA; eventos dentro da espera reaproveitam a mesma"""
+        with self._lock:
+            if self._pending_evaluate is not None or self._stop.is_set():
+                return
+            self._pending_evaluate = threading.Timer(self.debounce, self._debounced_evaluate)
+            self._pending_evaluate.daemon = True
+            self._pending_evaluate.start()
+
+    def _debounced_evaluate(self) -> None:
+        with self._lock:
+            self._pending_evaluate = None
+        self._evaluate()
+
+    def _file_removed(self, path: str, silent: bool = False) -> None:
+        with self._lock:
+            if self._files.pop(path, None) is None:
+                return
+            self._by_dir.get(os.path.dirname(path), set()).discard(path)
+            self._ok.pop(path, None)
+        if not silent:
+            self._emit('deleted', path=path)
+
+    def _rescan_tree(self, root: str, path: str, silent: bool = False) -> None:
+        listings = []
+        _, warnings = scan_tree(path, True, self.workers, on_listing=listings.append)
+        for w in warnings:
+            print(f"⚠️ {w}")
+        for listing in listings:
+            self._apply_listing(root, listing, silent)
+
+    def _full_scan(self, root: str, silent: bool = False) -> bool:
+        listings = []
+        files, warnings = scan_tree(root, True, self.workers, on_listing=listings.append)
+        for w in warnings:
+            print(f"⚠️ {w}")
+        if files is None:
+            self._emit('unreachable', folder=root)
+            return False
+        seen_dirs = {l.path for l in listings}
+        with self._lock:
+            for d in [d for d in self._dirs[root] if d not in seen_dirs]:
+                self._drop_dir(root, d, silent)
+            for listing in listings:
+                self._apply_listing(root, listing, silent)
+        return True
+
+    def _drop_dir(self, root: str, directory: str, silent: bool = False) -> None:
+        with self._lock:
+            self._dirs[root].pop(directory, None)
+            for path in list(self._by_dir.pop(directory, ())):
+                self._file_removed(path, silent)
+
+    def _drop_tree(self, root: str, directory: str) -> None:
+        """Remove do estado um diretório movido/apagado e todas as suas subpastas"""
+        prefix = directory.rstrip("/\\") + os.sep
+        with self._lock:
+            inside = [d for d in set(self._dirs[root]) | set(self._by_dir)
+                      if d == directory or d.startswith(prefix)]
+            for d in inside:
+                self._drop_dir(root, d)
+
+    def _incremental_scan(self, root: str) -> None:
+        """Consulta o mtime dos diretórios conhecidos e lista de novo só os que mudaram"""
+        with self._lock:
+            known = dict(self._dirs[root])
+
+        def dir_mtime(path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            current = dict(zip(known, pool.map(dir_mtime, known)))
+        if current.get(root) is None and root in current:
+            self._emit('unreachable', folder=root)
+            return
+        for directory, mtime in current.items():
+            if mtime is None:
+                self._drop_dir(root, directory)
+            elif mtime != known[directory]:
+                try:
+                    listing = scan_dir_entries(directory)
+                except OSError as e:
+                    print(f"⚠️ {describe_os_error(directory, e)}")
+                    continue
+                self._apply_listing(root, listing)
+                for sub in listing.subdirs:
+                    if sub not in known:
+                        self._rescan_tree(root, sub)
+
+    def _evaluate(self) -> None:
+        """Reavalia o SLA de todos os arquivos e emite as transições"""
+        with self._lock:
+            entries = list(self._files.values())
+            ok_mask, _ = evaluate_sla(entries, self.rules)
+            transitions = []
+            for entry, ok in zip(entries, ok_mask):
+                ok = bool(ok)
+                previous = self._ok.get(entry.path)
+                self._ok[entry.path] = ok
+                if previous is None:
+                    if not ok:
+                        transitions.append(('violation', entry))
+                elif previous != ok:
+                    transitions.append(('recovered' if ok else 'violation', entry))
+        for event_type, entry in transitions:
+            self._emit(event_type, path=entry.path,
+                       mtime=datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M:%S"))
+
+    # ---------------- ciclo de vida ----------------
+
+    def _backend_for(self, root: str) -> str:
+        if self.backend == "poll" or not WATCHDOG_AVAILABLE:
+            return "poll"
+        if self.backend == "watchdog":
+            return "watchdog"
+        # auto: notificações nativas só para pastas locais; SMB (UNC ou montado) usa polling
+        return "poll" if is_remote_path(root) else "watchdog"
+
+    def _poll_loop(self, roots: List[str]) -> None:
+        cycle = 0
+        while not self._stop.wait(self.interval):
+            cycle += 1
+            for root in roots:
+                if cycle % self.full_scan_every == 0:
+                    self._full_scan(root)
+                else:
+                    self._incremental_scan(root)
+            self._evaluate()
+
+    def _sla_loop(self) -> None:
+        # Prazos de SLA vencem com o tempo, mesmo sem eventos de arquivo
+        while not self._stop.wait(self.interval):
+            self._evaluate()
+
+    def start(self) -> None:
+        """Faz a varredura inicial e inicia os observadores em segundo plano"""
+        poll_roots = []
+        for root in self.dirs:
+            # Estado inicial sem eventos de criação (apenas violações já existentes)
+            backend = self._backend_for(root)
+            if not self._full_scan(root, silent=True):
+                # O watchdog não observa pasta inexistente: o polling segue tentando
+                print(f"❌ Diretório inacessível: {root}")
+                backend = "poll"
+            print(f"👀 Observando {root} ({backend})")
+            if backend == "watchdog":
+                observer = Observer()
+                observer.schedule(_WatchdogHandler(self, root), root, recursive=True)
+                observer.start()
+                self._observers.append(observer)
+            else:
+                poll_roots.append(root)
+        self._evaluate()
+
+        if poll_roots:
+            t = threading.Thread(target=self._poll_loop, args=(poll_roots,), daemon=True)
+            t.start()
+            self._threads.append(t)
+        if self._observers:
+            t = threading.Thread(target=self._sla_loop, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        """Encerra observadores e threads de polling"""
+        self._stop.set()
+        with self._lock:
+            if self._pending_evaluate is not None:
+                self._pending_evaluate.cancel()
+                self._pending_evaluate = None
+        for observer in self._observers:
+            observer.stop()
+        for observer in self._observers:
+            observer.join(timeout=5)
+        for t in self._threads:
+            t.join(timeout=5)
+
+    def run_forever(self) -> None:
+        """Inicia e bloqueia até Ctrl+C"""
+        self.start()
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            print("\n⏹️ Observação encerrada pelo usuário.")
+        finally:
+            self.stop()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache HTTP em disco para as consultas JSON da API do GitHub
+Guarda o corpo com ETag/Last-Modified e revalida com If-None-Match /
+If-Modified-Since: uma resposta 304 reaproveita o corpo salvo (e não conta
+no rate limit da API). Entradas mais antigas que o prazo de validade são
+buscadas de novo sem condição
+
+Cada entrada também marca se o conteúdo já foi processado com sucesso
+(synced), para que o chamador pule todo o trabalho quando nada mudou
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "github_http.json"
+
+# Validade de uma entrada (horas); depois disso a requisição é incondicional
+CACHE_MAX_AGE_HOURS = float(os.getenv("GITHUB_CACHE_MAX_AGE_HOURS", "24"))
+
+
+class HttpCache:
+    """Cache de respostas JSON com revalidação condicional"""
+
+    def __init__(self, path=None, max_age_hours: float = CACHE_MAX_AGE_HOURS):
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.max_age = max_age_hours * 3600
+        self.revalidated = set()  # URLs que receberam 304 nesta execução
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Política de validade: descarta as entradas vencidas na carga
+        now = time.time()
+        return {url: e for url, e in entries.items() if now - e.get("fetched_at", 0) <= self.max_age}
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar o cache HTTP em {self.path}: {e}")
+
+    def get_json(self, url: str, headers: Dict[str, str], timeout: float):
+        """
+        GET condicional; devolve o JSON atual (do servidor ou do cache em caso de 304).
+
+        Raises:
+            HTTPError/URLError: Falhas que não sejam 304
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        conditional = dict(headers)
+        if entry:
+            if entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+        try:
+            with urlopen(Request(url, headers=conditional), timeout=timeout) as resp:
+                data = json.loads(resp.read().decode("utf-8"))
+                etag = resp.getheader("ETag")
+                last_modified = resp.getheader("Last-Modified")
+        except HTTPError as e:
+            if e.code != 304 or not entry:
+                raise
+            with self._lock:
+                self.revalidated.add(url)
+            return entry["body"]
+
+        with self._lock:
+            self.revalidated.discard(url)
+            self._entries[url] = {
+                "etag": etag, "last_modified": last_modified, "fetched_at": time.time(),
+                "synced": False, "body": data,
+            }
+            self._save()
+        return data
+
+    def unchanged(self, urls: Iterable[str]) -> bool:
+        """True se todas as URLs receberam 304 nesta execução e já foram processadas com sucesso"""
+        with self._lock:
+            return all(url in self.revalidated and self._entries.get(url, {}).get("synced") for url in urls)
+
+    def mark_synced(self, urls: Iterable[str]) -> None:
+        """Marca o conteúdo atual das URLs como processado com sucesso"""
+        with self._lock:
+            for url in urls:
+                if url in self._entries:
+                    self._entries[url]["synced"] = True
+            self._save()
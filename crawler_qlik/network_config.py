@@ -8,8 +8,11 @@ Permite configurar credenciais de rede para acessar pastas UNC
 
 import os
 import sys
-from pathlib import Path
-from typing import Optional, Dict, List
+import stat
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, NamedTuple, Iterable
 import subprocess
 from dotenv import load_dotenv
 
@@ -42,6 +45,17 @@ NETWORK_PATHS = [
     os.getenv("NETWORK_PATH_3", ""),
 ]
 
+# Linux/Docker: raiz onde os compartilhamentos ficam montados (\\servidor\share → <raiz>/servidor/share)
+NETWORK_MOUNT_ROOT = os.getenv("NETWORK_MOUNT_ROOT", "").strip()
+NETWORK_SMB_AUTOMOUNT = os.getenv("NETWORK_SMB_AUTOMOUNT", "0").strip().lower() in ("1", "true", "sim", "yes")
+
+# Prazo máximo de uma verificação de pasta (segundos) — evita esperar o timeout do SMB
+PROBE_TIMEOUT = float(os.getenv("NETWORK_PROBE_TIMEOUT", "5"))
+
+# Validade (segundos) do resultado de acessibilidade: positivo e negativo
+HEALTH_TTL = float(os.getenv("NETWORK_HEALTH_TTL", "300"))
+HEALTH_NEGATIVE_TTL = float(os.getenv("NETWORK_HEALTH_NEGATIVE_TTL", "60"))
+
 # =============================================================================
 # FUNÇÕES DE AUTENTICAÇÃO
 # =============================================================================
@@ -56,6 +70,10 @@ def normalize_unc_path(path_str: str) -> str:
     Returns:
         str: Caminho UNC normalizado
     """
+    # Já é um caminho dentro dos compartilhamentos montados
+    if NETWORK_MOUNT_ROOT and is_remote_path(path_str) and not unc_parts(path_str):
+        return path_str
+    
     # Remove barras extras e normaliza
     path_str = path_str.replace("\\\\", "\\").replace("//", "/")
     
@@ -68,13 +86,172 @@ def normalize_unc_path(path_str: str) -> str:
         # Se tem barra normal, converte para barra invertida
         path_str = "\\" + path_str.replace("/", "\\")
     
+    # Linux com compartilhamentos montados: \\servidor\share\... → NETWORK_MOUNT_ROOT/servidor/share/...
+    if os.name != 'nt' and NETWORK_MOUNT_ROOT:
+        mounted = mount_path_for(path_str)
+        if mounted:
+            return mounted
+    
     return path_str
 
-def setup_network_credentials():
+def unc_parts(path_str: str) -> Optional[tuple]:
+    """
+    Separa um caminho UNC em (servidor, compartilhamento, restante).
+
+    Returns:
+        tuple: (servidor, share, restante) ou None se não for UNC
+    """
+    normalized = path_str.replace("/", "\\")
+    if not normalized.startswith("\\\\"):
+        return None
+    parts = [p for p in normalized.split("\\") if p]
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[1], "\\".join(parts[2:])
+
+def mount_path_for(path_str: str) -> Optional[str]:
+    """Caminho local de um UNC no modo de compartilhamentos montados (NETWORK_MOUNT_ROOT/servidor/share/...)"""
+    parts = unc_parts(path_str)
+    if not parts or not NETWORK_MOUNT_ROOT:
+        return None
+    server, share, rest = parts
+    return os.path.join(NETWORK_MOUNT_ROOT, server, share, *[p for p in rest.split("\\") if p])
+
+def is_remote_path(path_str: str) -> bool:
+    """True para caminhos UNC ou dentro de um compartilhamento montado"""
+    path_str = str(path_str)
+    if unc_parts(path_str):
+        return True
+    if NETWORK_MOUNT_ROOT:
+        root = os.path.abspath(NETWORK_MOUNT_ROOT)
+        return os.path.abspath(path_str).startswith(root + os.sep)
+    return False
+
+class NetworkSessionManager:
+    """
+    Sessões de rede estabelecidas uma vez por servidor (não por pasta).
+
+    - Windows: `net use \\\\servidor\\IPC$` com as credenciais; sessões já
+      existentes (listadas por `net use`) são reaproveitadas
+    - Linux (Docker): modo de compartilhamentos montados em NETWORK_MOUNT_ROOT;
+      com NETWORK_SMB_AUTOMOUNT=1, monta os shares ausentes com mount.cifs
+      (a senha vai pela variável PASSWD, não pela linha de comando)
+
+    As configurações de servidores/shares diferentes rodam em paralelo.
     """
-    Configura credenciais de rede se fornecidas.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready: Dict[str, bool] = {}
+        self._existing: Optional[set] = None
+
+    def _user(self) -> str:
+        clean_username = NETWORK_USERNAME.replace("\\\\", "\\")
+        clean_domain = NETWORK_DOMAIN.replace("\\\\", "\\") if NETWORK_DOMAIN else ""
+        return f"{clean_domain}\\{clean_username}" if clean_domain else clean_username
+
+    def _existing_servers(self) -> set:
+        """Servidores que já têm conexão ativa (saída de `net use`)"""
+        if self._existing is None:
+            self._existing = set()
+            try:
+                result = subprocess.run(["net", "use"], capture_output=True, text=True, timeout=15)
+                for line in result.stdout.splitlines():
+                    for token in line.split():
+                        parts = unc_parts(token)
+                        if parts and line.strip().upper().startswith("OK"):
+                            self._existing.add(parts[0].lower())
+            except (OSError, subprocess.SubprocessError):
+                pass
+        return self._existing
+
+    def _connect_windows(self, server: str) -> bool:
+        if server.lower() in self._existing_servers():
+            print(f"♻️ Sessão de rede já existente: \\\\{server}")
+            return True
+        target = f"\\\\{server}\\IPC$"
+        cmd = ["net", "use", target, f"/user:{self._user()}", NETWORK_PASSWORD]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️ Erro ao configurar credenciais para \\\\{server}: {e}")
+            return False
+        if result.returncode == 0:
+            print(f"✅ Credenciais configuradas para: \\\\{server}")
+            return True
+        print(f"⚠️ Erro ao configurar credenciais para \\\\{server}: {result.stderr.strip()}")
+        return False
+
+    def _mount_linux(self, server: str, share: str) -> bool:
+        mountpoint = os.path.join(NETWORK_MOUNT_ROOT, server, share)
+        if os.path.ismount(mountpoint):
+            return True
+        if not NETWORK_SMB_AUTOMOUNT:
+            print(f"⚠️ Compartilhamento não montado: //{server}/{share} → {mountpoint}")
+            return False
+        os.makedirs(mountpoint, exist_ok=True)
+        username = NETWORK_USERNAME.replace("\\\\", "\\").split("\\")[-1]
+        options = f"username={username}"
+        if NETWORK_DOMAIN:
+            options += f",domain={NETWORK_DOMAIN}"
+        cmd = ["mount", "-t", "cifs", f"//{server}/{share}", mountpoint, "-o", options]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30,
+                                    env={**os.environ, "PASSWD": NETWORK_PASSWORD})
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️ Erro ao montar //{server}/{share}: {e}")
+            return False
+        if result.returncode == 0:
+            print(f"✅ Compartilhamento montado: //{server}/{share} → {mountpoint}")
+            return True
+        print(f"⚠️ Erro ao montar //{server}/{share}: {result.stderr.strip()}")
+        return False
+
+    def ensure(self, paths: Iterable[str]) -> Dict[str, bool]:
+        """
+        Garante a sessão/montagem para os caminhos informados.
+
+        Returns:
+            dict: {servidor (Windows) ou servidor/share (Linux): sucesso}
+        """
+        jobs = {}
+        for path in paths:
+            parts = unc_parts(str(path))
+            if not parts:
+                continue
+            server, share, _ = parts
+            if os.name == 'nt':
+                jobs.setdefault(server.lower(), lambda server=server: self._connect_windows(server))
+            elif NETWORK_MOUNT_ROOT:
+                jobs.setdefault(f"{server}/{share}".lower(), lambda server=server, share=share: self._mount_linux(server, share))
+
+        with self._lock:
+            pending = {key: job for key, job in jobs.items() if not self._ready.get(key)}
+            results = {key: True for key in jobs if key not in pending}
+            if pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                    futures = {key: pool.submit(job) for key, job in pending.items()}
+                    for key, future in futures.items():
+                        results[key] = future.result()
+                        self._ready[key] = results[key]
+        if any(results.get(key) for key in pending):
+            invalidate_path_health()
+        return results
+
+# Gerenciador único do processo (compartilhado por todos os módulos)
+SESSIONS = NetworkSessionManager()
+
+def setup_network_credentials(paths: Optional[Iterable[str]] = None) -> bool:
+    """
+    Configura credenciais de rede se fornecidas (uma vez por servidor, em paralelo).
+
+    Args:
+        paths: Caminhos que serão acessados (padrão: NETWORK_PATHS)
     """
     if not NETWORK_USERNAME or not NETWORK_PASSWORD:
+        if NETWORK_MOUNT_ROOT and os.name != 'nt':
+            # Modo montado sem credenciais: apenas confere as montagens
+            return all(SESSIONS.ensure(paths if paths is not None else NETWORK_PATHS).values())
         print("ℹ️ Credenciais de rede não configuradas.")
         print("   Para configurar, defina as variáveis de ambiente:")
         print("   - NETWORK_USERNAME")
@@ -83,37 +260,8 @@ def setup_network_credentials():
         return False
     
     try:
-        # Tenta configurar credenciais de rede usando net use
-        for path in NETWORK_PATHS:
-            # Normaliza o caminho antes de usar
-            normalized_path = normalize_unc_path(path)
-            
-            if normalized_path.startswith("\\\\"):
-                server_share = normalized_path.split("\\")[2]  # Extrai servidor\share
-                # Limpa o formato do usuário (remove barras duplas se existirem)
-                clean_username = NETWORK_USERNAME.replace("\\\\", "\\")
-                clean_domain = NETWORK_DOMAIN.replace("\\\\", "\\") if NETWORK_DOMAIN else ""
-                
-                cmd = [
-                    "net", "use", normalized_path, 
-                    f"/user:{clean_domain}\\{clean_username}" if clean_domain else f"/user:{clean_username}",
-                    NETWORK_PASSWORD
-                ]
-                
-                result = subprocess.run(
-                    cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    print(f"✅ Credenciais configuradas para: {normalized_path}")
-                else:
-                    print(f"⚠️ Erro ao configurar credenciais para {normalized_path}: {result.stderr.strip()}")
-                    
-        return True
-        
+        results = SESSIONS.ensure(paths if paths is not None else NETWORK_PATHS)
+        return all(results.values()) if results else True
     except Exception as e:
         print(f"❌ Erro ao configurar credenciais de rede: {e}")
         return False
@@ -127,20 +275,14 @@ def test_network_access():
     accessible_paths = []
     inaccessible_paths = []
     
-    for path in NETWORK_PATHS:
-        # Normaliza o caminho antes de testar
-        normalized_path = normalize_unc_path(path)
-        
-        try:
-            if Path(normalized_path).exists():
-                accessible_paths.append(normalized_path)
-                print(f"✅ Acessível: {normalized_path}")
-            else:
-                inaccessible_paths.append(normalized_path)
-                print(f"❌ Inacessível: {normalized_path}")
-        except Exception as e:
+    # Todas as pastas verificadas em paralelo, com prazo por verificação
+    for normalized_path, health in check_paths(NETWORK_PATHS, use_cache=False).items():
+        if health.accessible:
+            accessible_paths.append(normalized_path)
+            print(f"✅ Acessível: {normalized_path} ({health.elapsed:.1f}s)")
+        else:
             inaccessible_paths.append(normalized_path)
-            print(f"❌ Erro ao acessar {normalized_path}: {e}")
+            print(f"❌ Inacessível: {normalized_path} ({health.error})")
     
     print(f"\n📊 Resumo:")
     print(f"  Pastas acessíveis: {len(accessible_paths)}")
@@ -152,19 +294,118 @@ def get_accessible_paths() -> List[str]:
     """
     Retorna apenas as pastas de rede que são acessíveis.
     """
-    accessible = []
-    
-    for path in NETWORK_PATHS:
-        # Normaliza o caminho antes de testar
-        normalized_path = normalize_unc_path(path)
-        
-        try:
-            if Path(normalized_path).exists():
-                accessible.append(normalized_path)
-        except Exception:
-            continue
-    
-    return accessible
+    return [path for path, health in check_paths(NETWORK_PATHS).items() if health.accessible]
+
+# =============================================================================
+# SAÚDE DOS CAMINHOS DE REDE (CACHE + VERIFICAÇÃO PARALELA)
+# =============================================================================
+
+class PathHealth(NamedTuple):
+    """Resultado da verificação de uma pasta"""
+    path: str
+    accessible: bool
+    error: Optional[str]
+    checked_at: float
+    elapsed: float
+
+# Códigos winerror mais comuns nas pastas UNC
+_WINERROR_MESSAGES = {
+    1326: "Erro de autenticação",
+    53: "Caminho de rede não encontrado",
+    5: "Acesso negado",
+}
+
+_health_cache: Dict[str, PathHealth] = {}
+_health_lock = threading.Lock()
+_inflight: Dict[str, threading.Event] = {}
+
+def _probe(path: str) -> PathHealth:
+    """Verifica uma pasta (stat) e devolve o resultado"""
+    start = time.time()
+    try:
+        accessible = stat.S_ISDIR(os.stat(path).st_mode)
+        error = None if accessible else "Não é uma pasta"
+    except FileNotFoundError:
+        accessible, error = False, "Pasta inexistente"
+    except OSError as e:
+        accessible = False
+        error = _WINERROR_MESSAGES.get(getattr(e, "winerror", None), str(e))
+    return PathHealth(path, accessible, error, time.time(), time.time() - start)
+
+def _is_fresh(health: PathHealth, now: float) -> bool:
+    ttl = HEALTH_TTL if health.accessible else HEALTH_NEGATIVE_TTL
+    return now - health.checked_at <= ttl
+
+def check_paths(paths: Iterable[str], timeout: float = PROBE_TIMEOUT,
+                use_cache: bool = True) -> Dict[str, PathHealth]:
+    """
+    Verifica várias pastas ao mesmo tempo, com prazo máximo por verificação.
+
+    Cada pasta é verificada numa thread própria (daemon): um servidor que não
+    responde é marcado como inacessível ao fim do prazo, sem bloquear as demais
+    nem o encerramento do processo. Os resultados (inclusive negativos) ficam
+    em cache por HEALTH_TTL / HEALTH_NEGATIVE_TTL segundos.
+
+    Args:
+        paths: Caminhos (são normalizados com normalize_unc_path)
+        timeout (float): Prazo de cada verificação em segundos
+        use_cache (bool): False ignora o cache e verifica de novo
+
+    Returns:
+        dict: {caminho normalizado: PathHealth}
+    """
+    normalized = [normalize_unc_path(p) for p in paths if p and str(p).strip()]
+    results: Dict[str, PathHealth] = {}
+    waiting: Dict[str, threading.Event] = {}
+    now = time.time()
+
+    with _health_lock:
+        for path in dict.fromkeys(normalized):
+            cached = _health_cache.get(path)
+            if use_cache and cached and _is_fresh(cached, now):
+                results[path] = cached
+                continue
+            if path in _inflight:
+                # Verificação anterior ainda pendurada: aguarda a mesma, sem abrir outra conexão
+                waiting[path] = _inflight[path]
+                continue
+            done = threading.Event()
+            _inflight[path] = done
+            waiting[path] = done
+
+            def run(path=path, done=done):
+                health = _probe(path)
+                with _health_lock:
+                    _health_cache[path] = health
+                    _inflight.pop(path, None)
+                done.set()
+
+            threading.Thread(target=run, name=f"probe:{path}", daemon=True).start()
+
+    deadline = now + timeout
+    for path, done in waiting.items():
+        if done.wait(max(0.0, deadline - time.time())):
+            with _health_lock:
+                results[path] = _health_cache[path]
+        else:
+            health = PathHealth(path, False, f"Sem resposta em {timeout:g}s", time.time(), timeout)
+            with _health_lock:
+                _health_cache[path] = health
+            results[path] = health
+    return results
+
+def is_path_accessible(path, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Atalho de check_paths para uma única pasta"""
+    health = check_paths([str(path)], timeout=timeout)
+    return any(h.accessible for h in health.values())
+
+def invalidate_path_health(path: Optional[str] = None) -> None:
+    """Descarta o cache de uma pasta (ou de todas), ex.: após configurar credenciais"""
+    with _health_lock:
+        if path is None:
+            _health_cache.clear()
+        else:
+            _health_cache.pop(normalize_unc_path(path), None)
 
 # =============================================================================
 # FUNÇÃO PRINCIPAL PARA TESTE
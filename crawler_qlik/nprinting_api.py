@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Coleta das execuções de tarefas do NPrinting pela API REST
+Substitui a raspagem da tela de execuções (Chrome + linhas tr.ng-scope):
+pagina /api/v1/tasks/executions já filtrado pelo dia no servidor (ordem
+decrescente de criação, parando na primeira execução anterior ao dia) e
+monta os mesmos registros da raspagem, com o status traduzido pelo
+status_map_nprinting e as datas no formato da tela, sem depender do locale
+
+A sessão HTTP pode ser injetada (ex.: servidor de teste) e a URL base vem de
+NPRINTING_API_URL ou do endereço de login do NPrinting
+
+Os logs das execuções com falha são baixados depois da varredura, em
+paralelo (save_failure_logs), pela API — também com os cookies da sessão
+do navegador quando a coleta é feita pela tela
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+
+from crawler_qlik.date_parser import format_pt_datetime
+
+# Carrega variáveis de ambiente do arquivo .env (as configurações abaixo são lidas no import)
+load_dotenv()
+
+# URL base da API (vazio = esquema/host de QLIK_NPRINT)
+API_URL = os.getenv("NPRINTING_API_URL", "").strip().rstrip("/")
+
+# Autenticação: local (e-mail/senha do console web) ou ntlm (usuário do domínio; requer requests_ntlm)
+API_AUTH = os.getenv("NPRINTING_API_AUTH", "local").strip().lower()
+LOGIN_PATH = os.getenv("NPRINTING_API_LOGIN_PATH", "/api/web/login/local").strip()
+
+PAGE_SIZE = int(os.getenv("NPRINTING_API_PAGE_SIZE", "100"))
+API_TIMEOUT = float(os.getenv("NPRINTING_API_TIMEOUT", "30"))
+# Log de uma execução ({id} = id da execução) e downloads simultâneos de logs
+LOG_PATH = os.getenv("NPRINTING_API_LOG_PATH", "/api/v1/tasks/executions/{id}/logs").strip()
+LOG_WORKERS = int(os.getenv("NPRINTING_LOG_WORKERS", "4"))
+
+VERIFY_TLS = os.getenv("NPRINTING_API_VERIFY_TLS", "1").strip().lower() not in ("0", "false", "no", "nao", "não")
+
+# Status da API → classe do rótulo na tela (traduzida depois pelo status_map_nprinting)
+API_STATUS_CLASSES = {
+    "completed": "label label-success",
+    "failed": "label label-danger",
+    "warning": "label label-warning",
+    "completedwithwarning": "label label-warning",
+    "enqueued": "label label-default",
+    "queued": "label label-default",
+    "running": "label label-info blink",
+}
+
+TIPOS_TAREFA = {
+    "publish": "Publicação de relatórios",
+    "import": "Importação de metadados",
+}
+
+
+class NPrintingApiError(RuntimeError):
+    """Falha de autenticação ou resposta inesperada da API do NPrinting"""
+
+
+def api_base_url(url_login: Optional[str]) -> str:
+    """URL base da API: NPRINTING_API_URL ou esquema/host do endereço de login"""
+    if API_URL:
+        return API_URL
+    partes = urlsplit(url_login or "")
+    if not partes.scheme or not partes.netloc:
+        raise NPrintingApiError(f"URL do NPrinting inválida: {url_login!r} (defina NPRINTING_API_URL)")
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def execution_id_from_href(href: Optional[str]) -> Optional[str]:
+    """Id da execução no link da tela (".../#/tasks/executions/<id>")"""
+    if not href:
+        return None
+    partes = urlsplit(href)
+    rota = partes.fragment or partes.path
+    segmentos = [s for s in rota.split("?")[0].split("/") if s]
+    return segmentos[-1] if segmentos else None
+
+
+def parse_api_datetime(valor: Optional[str]) -> Optional[datetime]:
+    """Data ISO 8601 da API (UTC, com 'Z') no fuso local"""
+    if not valor:
+        return None
+    try:
+        return datetime.fromisoformat(valor.replace("Z", "+00:00")).astimezone()
+    except ValueError:
+        return None
+
+
+class NPrintingApiClient:
+    """Cliente da API do NPrinting (sessão com cookie de autenticação)"""
+
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None,
+                 timeout: float = API_TIMEOUT, verify: bool = VERIFY_TLS, page_size: int = PAGE_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.session.verify = verify
+        self.timeout = timeout
+        self.page_size = page_size
+        self._tarefas: Optional[Dict[str, dict]] = None
+        self.falhas: List[Tuple[str, str]] = []  # (nome, id da execução) da última consulta
+
+    @classmethod
+    def from_cookies(cls, base_url: str, cookies: Iterable[dict], **kwargs) -> "NPrintingApiClient":
+        """Cliente que reaproveita a sessão do navegador (driver.get_cookies())"""
+        cliente = cls(base_url, **kwargs)
+        for cookie in cookies:
+            cliente.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""),
+                                        path=cookie.get("path", "/"))
+            if "XSRF" in cookie["name"].upper():
+                cliente.session.headers["X-XSRF-TOKEN"] = cookie["value"]
+        return cliente
+
+    # ---------------- autenticação ----------------
+
+    def login(self, email: Optional[str], senha: Optional[str], usuario: Optional[str] = None) -> None:
+        """
+        Autentica a sessão (local: e-mail/senha; ntlm: usuário do domínio).
+
+        Raises:
+            NPrintingApiError: Credenciais recusadas ou modo indisponível
+        """
+        if API_AUTH == "ntlm":
+            try:
+                from requests_ntlm import HttpNtlmAuth
+            except ImportError:
+                raise NPrintingApiError("NPRINTING_API_AUTH=ntlm requer o pacote requests_ntlm")
+            resposta = self.session.get(f"{self.base_url}/api/v1/login/ntlm", timeout=self.timeout,
+                                        auth=HttpNtlmAuth(usuario or "", senha or ""))
+        else:
+            resposta = self.session.post(f"{self.base_url}{LOGIN_PATH}", timeout=self.timeout,
+                                         json={"email": email or "", "password": senha or ""})
+        if resposta.status_code >= 400:
+            raise NPrintingApiError(f"login recusado (HTTP {resposta.status_code})")
+        # O console exige o token anti-XSRF do cookie em cada requisição
+        for nome, valor in self.session.cookies.items():
+            if "XSRF" in nome.upper():
+                self.session.headers["X-XSRF-TOKEN"] = valor
+
+    # ---------------- consultas ----------------
+
+    def _get(self, caminho: str, params: Dict) -> dict:
+        resposta = self.session.get(f"{self.base_url}{caminho}", params=params, timeout=self.timeout)
+        if resposta.status_code in (401, 403):
+            raise NPrintingApiError(f"sessão não autorizada em {caminho} (HTTP {resposta.status_code})")
+        resposta.raise_for_status()
+        try:
+            return resposta.json().get("data", {})
+        except ValueError:
+            raise NPrintingApiError(f"resposta não é JSON em {caminho}")
+
+    def _paginar(self, caminho: str, params: Dict) -> Iterator[dict]:
+        offset = 0
+        while True:
+            dados = self._get(caminho, {**params, "limit": self.page_size, "offset": offset})
+            itens = dados.get("items", [])
+            yield from itens
+            offset += len(itens)
+            if not itens or len(itens) < self.page_size or offset >= dados.get("totalItems", float("inf")):
+                return
+
+    def tarefas(self) -> Dict[str, dict]:
+        """Tarefas por id ({'name', 'type'}), consultadas uma vez por cliente"""
+        if self._tarefas is None:
+            self._tarefas = {item["id"]: item for item in self._paginar("/api/v1/tasks", {})}
+        return self._tarefas
+
+    def execucoes_do_dia(self, dia: date) -> Iterator[dict]:
+        """
+        Execuções criadas no dia, da mais recente para a mais antiga.
+
+        O intervalo do dia vai como filtro na consulta; se o servidor não o
+        aceitar (HTTP 400), a consulta segue só ordenada, e em qualquer caso a
+        paginação para na primeira execução anterior ao dia.
+        """
+        inicio = datetime.combine(dia, dt_time.min).astimezone()
+        fim = inicio + timedelta(days=1)
+        params = {"sort": "-created", "created": f"{inicio.isoformat()},{fim.isoformat()}"}
+        try:
+            itens = self._paginar("/api/v1/tasks/executions", params)
+            primeiro = next(itens, None)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 400:
+                raise
+            print("ℹ️ API do NPrinting não aceitou o filtro por data; usando só a ordenação")
+            params.pop("created")
+            itens = self._paginar("/api/v1/tasks/executions", params)
+            primeiro = next(itens, None)
+        if primeiro is None:
+            return
+        for item in chain([primeiro], itens):
+            criado = parse_api_datetime(item.get("created"))
+            if criado is None:
+                continue
+            if criado < inicio:
+                return  # ordem decrescente: o restante é histórico
+            if criado < fim:
+                yield item
+
+    def tarefas_por_status(self, dia: date, status_map: Dict[str, str]) -> Dict[str, List[list]]:
+        """
+        Registros do dia agrupados por status, no formato da raspagem:
+        [nome, tipo, status, progresso, criado, atualizado]
+        """
+        tarefas = self.tarefas()
+        por_status: Dict[str, List[list]] = {}
+        self.falhas = []
+        for item in self.execucoes_do_dia(dia):
+            tarefa = tarefas.get(item.get("task") or item.get("taskId"), {})
+            status_api = str(item.get("status", "")).lower()
+            status = status_map.get(API_STATUS_CLASSES.get(status_api, ""), status_api.capitalize())
+            progresso = item.get("progress")
+            por_status.setdefault(status, []).append([
+                tarefa.get("name", item.get("taskName", item.get("task", ""))),
+                TIPOS_TAREFA.get(str(tarefa.get("type", "")).lower(), tarefa.get("type", "")),
+                status,
+                f"{round(float(progresso) * 100)}%" if progresso is not None else "",
+                format_pt_datetime(parse_api_datetime(item.get("created"))),
+                format_pt_datetime(parse_api_datetime(item.get("lastUpdate") or item.get("completed"))),
+            ])
+            if status_api == "failed" and item.get("id"):
+                self.falhas.append((por_status[status][-1][0], item["id"]))
+        return por_status
+
+    def logs_execucao(self, execucao_id: str) -> List[dict]:
+        """Linhas do log de uma execução ({'time'/'timestamp', 'level', 'message'})"""
+        return list(self._paginar(LOG_PATH.format(id=execucao_id), {}))
+
+
+def _write_log(cliente: NPrintingApiClient, nome: str, execucao_id: str, errorlogs_dir: Path) -> Optional[str]:
+    linhas = cliente.logs_execucao(execucao_id)
+    if not linhas:
+        return None
+    log_path = Path(errorlogs_dir) / f"{nome}_log.txt"
+    with open(log_path, "w", encoding="utf-8") as f:
+        for linha in linhas:
+            momento = linha.get("time") or linha.get("timestamp") or linha.get("created") or ""
+            f.write(f"[{momento}] {linha.get('level', '')} - {linha.get('message', '')}\n")
+    return str(log_path)
+
+
+def save_failure_logs(cliente: NPrintingApiClient, falhas: List[Tuple[str, str]], errorlogs_dir: Path,
+                      workers: int = LOG_WORKERS) -> Dict[str, Optional[str]]:
+    """
+    Baixa e grava em paralelo o log de cada execução com falha (<nome>_log.txt).
+
+    Args:
+        falhas (list): Pares (nome da tarefa, id da execução)
+
+    Returns:
+        dict: {nome: caminho do log, ou None se não foi possível obtê-lo}
+    """
+    if not falhas:
+        return {}
+    resultados: Dict[str, Optional[str]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(falhas)))) as pool:
+        futuros = {nome: pool.submit(_write_log, cliente, nome, execucao_id, errorlogs_dir)
+                   for nome, execucao_id in falhas}
+        for nome, futuro in futuros.items():
+            try:
+                resultados[nome] = futuro.result()
+            except (NPrintingApiError, requests.RequestException, OSError) as e:
+                print(f"⚠️ Log da tarefa '{nome}' indisponível pela API: {e}")
+                resultados[nome] = None
+            if resultados[nome]:
+                print(f"📁 Log salvo: {resultados[nome]}")
+    return resultados
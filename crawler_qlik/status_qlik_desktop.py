@@ -5,22 +5,28 @@ import os
 import re
 import sys
 import json
-import time
 import errno
 import argparse
 from pathlib import Path
-from typing import Dict, List, Optional
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
+from typing import Callable, Dict, List, Optional
 from datetime import datetime, timezone
-import shutil
 import tempfile
-import subprocess
+import contextlib
 from dotenv import load_dotenv
 
-# Carrega variáveis de ambiente do arquivo .env
+# Carrega variáveis de ambiente do arquivo .env (antes dos módulos que leem DESKTOP_*/GITHUB_* no import)
 load_dotenv()
 
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.desktop_download import download, DownloadError
+from crawler_qlik.desktop_replicate import replicate
+from crawler_qlik.desktop_store import DEDUP_ENABLED, store_asset
+from crawler_qlik.http_cache import HttpCache
+from crawler_qlik.desktop_manifest import check_current, record_copies, update_manifest
+from crawler_qlik.network_config import check_paths, normalize_unc_path, setup_network_credentials
+from crawler_qlik.network_config import NETWORK_USERNAME, NETWORK_PASSWORD, NETWORK_MOUNT_ROOT
+
 # Configuração para Windows - suporte a UTF-8
 if os.name == 'nt':  # Windows
     try:
@@ -38,11 +44,6 @@ if os.name == 'nt':  # Windows
 REPO_OWNER = "qlik-download"
 REPO_NAME = "qlik-sense-desktop"
 
-# Credenciais de rede (opcional)
-NETWORK_USERNAME = os.getenv("NETWORK_USERNAME", "")
-NETWORK_PASSWORD = os.getenv("NETWORK_PASSWORD", "")
-NETWORK_DOMAIN = os.getenv("NETWORK_DOMAIN", "")
-
 # Caminhos de destino (UNC) — lidos do arquivo .env
 DESTINATION_BASE_DIRS = [
     os.getenv("NETWORK_PATH_1", ""),
@@ -53,14 +54,16 @@ DESTINATION_BASE_DIRS = [
 # Remove caminhos vazios da lista
 DESTINATION_BASE_DIRS = [path for path in DESTINATION_BASE_DIRS if path.strip()]
 
-# Verifica se pelo menos um caminho está configurado
-if not DESTINATION_BASE_DIRS:
+def check_destinations_configured() -> bool:
+    """Verifica se pelo menos um caminho de destino está configurado no .env"""
+    if DESTINATION_BASE_DIRS:
+        return True
     print("⚠️ Nenhum caminho de rede configurado no arquivo .env")
     print("   Configure pelo menos uma das variáveis:")
     print("   - NETWORK_PATH_1")
     print("   - NETWORK_PATH_2") 
     print("   - NETWORK_PATH_3")
-    sys.exit(1)
+    return False
 
 HTTP_TIMEOUT = 60
 DOWNLOAD_RETRIES = 3
@@ -71,56 +74,6 @@ RETRY_SLEEP_SECONDS = 3
 # UTILITÁRIOS
 # ============
 
-def setup_network_credentials():
-    """
-    Configura credenciais de rede se fornecidas.
-    """
-    if not NETWORK_USERNAME or not NETWORK_PASSWORD:
-        print("ℹ️ Credenciais de rede não configuradas.")
-        print("   Para configurar, defina as variáveis de ambiente:")
-        print("   - NETWORK_USERNAME")
-        print("   - NETWORK_PASSWORD") 
-        print("   - NETWORK_DOMAIN (opcional)")
-        return False
-    
-    try:
-        # Tenta configurar credenciais de rede usando net use
-        for path in DESTINATION_BASE_DIRS:
-            if not path.strip():
-                continue
-                
-            # Normaliza o caminho antes de usar
-            normalized_path = normalize_unc_path(path)
-            
-            if normalized_path.startswith("\\\\"):
-                # Limpa o formato do usuário (remove barras duplas se existirem)
-                clean_username = NETWORK_USERNAME.replace("\\\\", "\\")
-                clean_domain = NETWORK_DOMAIN.replace("\\\\", "\\") if NETWORK_DOMAIN else ""
-                
-                cmd = [
-                    "net", "use", normalized_path, 
-                    f"/user:{clean_domain}\\{clean_username}" if clean_domain else f"/user:{clean_username}",
-                    NETWORK_PASSWORD
-                ]
-                
-                result = subprocess.run(
-                    cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    print(f"✅ Credenciais configuradas para: {normalized_path}")
-                else:
-                    print(f"⚠️ Erro ao configurar credenciais para {normalized_path}: {result.stderr.strip()}")
-                    
-        return True
-        
-    except Exception as e:
-        print(f"❌ Erro ao configurar credenciais de rede: {e}")
-        return False
-
 def print_header():
     print("=" * 68)
     print("Qlik Sense Desktop - Downloader (Initial + Latest | sem cache/log)")
@@ -165,13 +118,6 @@ def parse_github_ts(ts: Optional[str]) -> Optional[datetime]:
     except Exception:
         return None
 
-def get_local_mtime(path: Path) -> Optional[datetime]:
-    try:
-        ts = path.stat().st_mtime
-        return datetime.fromtimestamp(ts, tz=timezone.utc)
-    except FileNotFoundError:
-        return None
-
 def set_local_mtime(path: Path, dt: Optional[datetime]) -> None:
     if dt is None:
         return
@@ -193,16 +139,23 @@ def build_headers() -> Dict[str, str]:
         headers["Authorization"] = f"Bearer {token}"
     return headers
 
+# Cache das respostas da API (ETag/Last-Modified) em crawler_qlik/cache/github_http.json
+GITHUB_CACHE = HttpCache()
+
+LATEST_RELEASE_URL = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/latest"
+
+def releases_url(per_page: int = 80) -> str:
+    return f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases?per_page={per_page}"
+
 def http_get_json(url: str) -> dict:
-    req = Request(url, headers=build_headers())
-    with urlopen(req, timeout=HTTP_TIMEOUT) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    """GET condicional: em 304 reaproveita o JSON do cache"""
+    return GITHUB_CACHE.get_json(url, build_headers(), HTTP_TIMEOUT)
 
 def get_latest_release() -> dict:
-    return http_get_json(f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/latest")
+    return http_get_json(LATEST_RELEASE_URL)
 
 def get_all_releases(per_page: int = 80) -> List[dict]:
-    return http_get_json(f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases?per_page={per_page}")
+    return http_get_json(releases_url(per_page))
 
 def extract_cycle_from_name(release_name: str) -> Optional[str]:
     parts = (release_name or "").split()
@@ -227,90 +180,72 @@ def find_initial_release_for_cycle(all_releases: List[dict], cycle: str) -> Opti
 # DOWNLOAD / CÓPIA DIRETOS
 # =========================
 
-def http_download_to_temp(url: str, remote_updated_at: Optional[datetime], display_name: str) -> Path:
+def asset_sha256(asset: dict) -> Optional[str]:
+    """SHA-256 publicado pelo GitHub no asset ("digest": "sha256:<hex>"), se houver"""
+    digest = asset.get("digest") or ""
+    return digest.split(":", 1)[1] if digest.startswith("sha256:") else None
+
+def http_download_to_temp(url: str, remote_updated_at: Optional[datetime], display_name: str,
+                          remote_size: Optional[int] = None) -> Path:
     """
     Baixa uma única vez para arquivo temporário e retorna o caminho.
-    Mostra porcentagem se Content-Length estiver disponível.
+    Usa faixas HTTP Range em paralelo e retoma downloads interrompidos
+    (inclusive de execuções anteriores); confere o tamanho no fim. O SHA-256
+    é conferido durante a replicação (replicate), sem reler o temporário.
     """
-    attempt = 0
-    while attempt < DOWNLOAD_RETRIES:
-        attempt += 1
-        try:
-            req = Request(url, headers=build_headers())
-            with urlopen(req, timeout=HTTP_TIMEOUT) as resp:
-                # tenta obter o tamanho total
-                length = resp.getheader("Content-Length")
-                total = int(length) if length and length.isdigit() else None
-
-                fd, tmp_path = tempfile.mkstemp(prefix="qsdl_", suffix=".bin")
-                os.close(fd)
-                tmp = Path(tmp_path)
-
-                bytes_done = 0
-                chunk_size = 1024 * 256
-                with open(tmp, "wb") as f:
-                    while True:
-                        chunk = resp.read(chunk_size)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        bytes_done += len(chunk)
-                        if total:
-                            pct = bytes_done * 100 // total
-                            sys.stdout.write(f"\r  → {display_name} [{pct}%]")
-                        else:
-                            # fallback: mostra bytes quando não há tamanho total
-                            sys.stdout.write(f"\r  → {display_name} [{bytes_done} bytes]")
-                        sys.stdout.flush()
-                # fim da linha de progresso
-                if total:
-                    sys.stdout.write(f"\r  → {display_name} [100%]\n")
-                else:
-                    sys.stdout.write("\n")
-                set_local_mtime(tmp, remote_updated_at)
-                return tmp
-        except (HTTPError, URLError, TimeoutError) as e:
-            if attempt < DOWNLOAD_RETRIES:
-                time.sleep(RETRY_SLEEP_SECONDS)
-            else:
-                raise RuntimeError(f"Falha ao baixar {url}: {e}")
-
-def files_equal_by_size_and_date(path: Path, remote_size: Optional[int], remote_updated_at: Optional[datetime]) -> bool:
-    if not path.exists():
-        return False
+    fd, tmp_path = tempfile.mkstemp(prefix="qsdl_", suffix=".bin")
+    os.close(fd)
+    tmp = Path(tmp_path)
     try:
-        if remote_size is not None and path.stat().st_size != remote_size:
-            return False
-        local_mtime = get_local_mtime(path)
-        if remote_updated_at and local_mtime and local_mtime < remote_updated_at:
-            return False
-        return True
-    except Exception:
-        return False
-
-def copy2_preserve(src: Path, dst: Path):
-    ensure_dir(dst.parent)
-    shutil.copy2(src, dst)
-
-def up_to_date_in_any(paths: List[Path], remote_size: Optional[int], remote_updated_at: Optional[datetime]) -> Optional[Path]:
-    for p in paths:
-        if files_equal_by_size_and_date(p, remote_size, remote_updated_at):
-            return p
-    return None
-
+        download(
+            url, tmp, build_headers(), display_name,
+            expected_size=remote_size,
+            version_tag=remote_updated_at.isoformat() if remote_updated_at else "",
+            timeout=HTTP_TIMEOUT, retries=DOWNLOAD_RETRIES, retry_sleep=RETRY_SLEEP_SECONDS,
+        )
+    except DownloadError as e:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(str(e))
+    set_local_mtime(tmp, remote_updated_at)
+    return tmp
 
 # =================
 # PROCESSAMENTO
 # =================
 
-def process_release_assets(release: dict, version_folder_name: str, subfolder_name: Optional[str] = None, force: bool = False):
-    """Verifica/baixa/replica os assets da release diretamente nos DESTINATION_BASE_DIRS."""
+def process_release_assets(release: dict, version_folder_name: str, subfolder_name: Optional[str] = None,
+                           force: bool = False, emit: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    Verifica/baixa/replica os assets da release diretamente nos DESTINATION_BASE_DIRS.
+
+    Returns:
+        list: Um registro por asset ({'release', 'asset', 'action', 'destinations'})
+    """
+    records: List[dict] = []
+    release_name = (release.get("name") or "").strip()
+
+    def record(asset_name: Optional[str], action: str, destinations: int = 0,
+               copies: Optional[List[dict]] = None) -> None:
+        item = {'release': release_name, 'asset': asset_name, 'action': action, 'destinations': destinations}
+        if copies:
+            # Vazão por destino da replicação ({'destination', 'bytes', 'seconds', 'mb_per_s', 'error'})
+            item['copies'] = copies
+        records.append(item)
+        if emit:
+            emit({'type': 'asset', **item})
+
     assets = release.get("assets") or []
     if not assets:
         print("Nenhum asset publicado nesta release.")
-        return
-
-    # Filtra apenas os diretórios de destino acessíveis
+        record(None, 'sem_assets')
+        return records
+
+    # Filtra apenas os diretórios de destino acessíveis (verificados juntos; o resultado fica em cache)
+    check_paths([
+        candidate
+        for base in DESTINATION_BASE_DIRS
+        for candidate in (normalize_unc_path(base), str(Path(normalize_unc_path(base)).parent))
+    ])
     accessible_dirs = []
     for base in DESTINATION_BASE_DIRS:
         # Normaliza o caminho antes de criar o Path
@@ -325,20 +260,24 @@ def process_release_assets(release: dict, version_folder_name: str, subfolder_na
     if not accessible_dirs:
         print("⚠️ Nenhum diretório de destino está acessível.")
         print("   Verifique as credenciais de rede e conectividade.")
-        return
+        record(None, 'sem_destino_acessivel')
+        return records
 
     for asset in assets:
         name = sanitize_filename(asset.get("name") or "asset.bin")
         url = asset.get("browser_download_url")
         remote_size = asset.get("size")
         remote_updated_at = parse_github_ts(asset.get("updated_at"))
+        remote_sha256 = asset_sha256(asset)
 
         if not url:
             print(f"- {name}: asset sem URL de download; pulando.")
+            record(name, 'sem_url')
             continue
 
         # Calcula destinos apenas para diretórios acessíveis
         dest_paths: List[Path] = []
+        targets = []  # (compartilhamento, destino) para o armazenamento por conteúdo
         for base in accessible_dirs:
             version_dir = base / version_folder_name
             try:
@@ -347,53 +286,86 @@ def process_release_assets(release: dict, version_folder_name: str, subfolder_na
                     version_dir = version_dir / subfolder_name
                     ensure_dir(version_dir)
                 dest_paths.append(version_dir / name)
+                targets.append((base, version_dir / name))
             except Exception as e:
                 print(f"⚠️ Erro ao preparar destino {base}: {e}")
                 continue
 
         if not dest_paths:
             print(f"⚠️ Nenhum destino válido para {name}; pulando.")
+            record(name, 'sem_destino')
+            continue
+
+        # Armazenamento por conteúdo: só trafega o que ainda não existe em cada compartilhamento
+        if DEDUP_ENABLED and remote_sha256:
+            current = check_current(dest_paths, remote_size, remote_updated_at, remote_sha256)
+            stored = store_asset(
+                remote_sha256, remote_size, targets,
+                candidates=[p for p, ok in zip(dest_paths, current) if ok],
+                download=lambda: http_download_to_temp(url, remote_updated_at, name, remote_size),
+                force=force,
+            )
+            if stored['source'] == 'download':
+                action = 'sobrescrito' if force else 'baixado'
+                print(f"• {name}: baixado uma vez e armazenado em {len(stored['copies'])} compartilhamento(s).")
+            elif stored['source'] is not None:
+                action = 'replicado'
+                print(f"• {name}: conteúdo já existente replicado para {len(stored['copies'])} compartilhamento(s).")
+            elif all(link == 'atual' for link in stored['links'].values()):
+                action = 'atualizado'
+                print(f"• {name}: já atualizado em todos os destinos.")
+            else:
+                action = 'vinculado'
+                print(f"• {name}: conteúdo idêntico já armazenado; vinculado sem novo download.")
+            for dest, link in stored['links'].items():
+                if link in ('vinculado', 'copiado'):
+                    update_manifest(Path(dest), remote_sha256, remote_updated_at)
+            link_failures = [
+                {'destination': dest, 'bytes': 0, 'seconds': 0, 'mb_per_s': 0, 'error': 'falha ao vincular'}
+                for dest, link in stored['links'].items() if link == 'falhou'
+            ]
+            record(name, action, len(dest_paths), stored['copies'] + link_failures)
             continue
 
         if force:
-            tmp = http_download_to_temp(url, remote_updated_at, name)
+            tmp = http_download_to_temp(url, remote_updated_at, name, remote_size)
             try:
-                for dp in dest_paths:
-                    copy2_preserve(tmp, dp)
+                copies = replicate(tmp, dest_paths, expected_sha256=remote_sha256)
+                record_copies(copies, remote_updated_at)
                 print(f"• {name}: rebaixado e sobrescrito em {len(dest_paths)} destino(s).")
             finally:
                 tmp.unlink(missing_ok=True)
+            record(name, 'sobrescrito', len(dest_paths), copies)
             continue
 
-        # Verifica se todos destinos já estão em dia
-        all_ok = all(files_equal_by_size_and_date(p, remote_size, remote_updated_at) for p in dest_paths)
-        if all_ok:
+        # Verifica (em paralelo, pelo manifesto ou re-hash) quais destinos já estão em dia
+        current = check_current(dest_paths, remote_size, remote_updated_at, remote_sha256)
+        if all(current):
             print(f"• {name}: já atualizado em todos os destinos.")
+            record(name, 'atualizado', len(dest_paths))
             continue
 
         # Se algum destino está OK, replica dele para os demais
-        source_ok = up_to_date_in_any(dest_paths, remote_size, remote_updated_at)
+        source_ok = next((p for p, ok in zip(dest_paths, current) if ok), None)
         if source_ok:
-            for dp in dest_paths:
-                if dp == source_ok:
-                    continue
-                if not files_equal_by_size_and_date(dp, remote_size, remote_updated_at):
-                    copy2_preserve(source_ok, dp)
+            pending = [p for p, ok in zip(dest_paths, current) if not ok]
+            copies = replicate(source_ok, pending, expected_sha256=remote_sha256)
+            record_copies(copies, remote_updated_at)
             print(f"• {name}: replicado de um destino existente para os demais.")
+            record(name, 'replicado', len(dest_paths), copies)
             continue
 
         # Nenhum destino está OK → baixa uma vez e distribui
-        tmp = http_download_to_temp(url, remote_updated_at, name)
+        tmp = http_download_to_temp(url, remote_updated_at, name, remote_size)
         try:
-            if remote_size is not None and tmp.stat().st_size != remote_size:
-                print(f"- {name}: tamanho do temporário difere do remoto; rebaixando...")
-                tmp.unlink(missing_ok=True)
-                tmp = http_download_to_temp(url, remote_updated_at, name)
-            for dp in dest_paths:
-                copy2_preserve(tmp, dp)
+            copies = replicate(tmp, dest_paths, expected_sha256=remote_sha256)
+            record_copies(copies, remote_updated_at)
             print(f"• {name}: baixado uma vez e copiado para {len(dest_paths)} destino(s).")
         finally:
             tmp.unlink(missing_ok=True)
+        record(name, 'baixado', len(dest_paths), copies)
+
+    return records
 
 
 # ============
@@ -404,95 +376,54 @@ def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Baixa/verifica Initial Release e Latest do Qlik Sense Desktop (sem cache/log).")
     p.add_argument("--initial-only", action="store_true", help="Processa apenas a Initial Release (padrão é Initial + Latest).")
     p.add_argument("--force", action="store_true", help="Rebaixa e sobrescreve todos os destinos.")
+    output = p.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="Imprime o resultado como um único documento JSON (mensagens vão para stderr).")
+    output.add_argument("--ndjson", action="store_true", help="Emite um registro JSON por linha à medida que os assets são processados.")
     return p.parse_args()
 
-def normalize_unc_path(path_str: str) -> str:
+def is_network_path_accessible(path: Path) -> bool:
     """
-    Normaliza um caminho UNC para garantir que seja interpretado corretamente.
+    Verifica se um caminho de rede é acessível sem tentar criar diretórios
+    (a própria pasta ou a pasta pai), com prazo e cache do network_config.
     
     Args:
-        path_str (str): Caminho UNC como string
+        path (Path): Caminho a ser verificado
         
     Returns:
-        str: Caminho UNC normalizado
+        bool: True se acessível, False caso contrário
     """
-    # Remove barras extras e normaliza
-    path_str = path_str.replace("\\\\", "\\").replace("//", "/")
-    
-    # Garante que caminhos UNC tenham exatamente duas barras no início
-    if path_str.startswith("\\"):
-        # Se já tem uma barra, adiciona mais uma
-        if not path_str.startswith("\\\\"):
-            path_str = "\\" + path_str
-    elif path_str.startswith("/"):
-        # Se tem barra normal, converte para barra invertida
-        path_str = "\\" + path_str.replace("/", "\\")
-    
-    return path_str
+    normalized = Path(normalize_unc_path(str(path)))
+    health = check_paths([str(normalized), str(normalized.parent)])
+    return any(h.accessible for h in health.values())
 
-def is_network_path_accessible(path: Path) -> bool:
+def sync_desktop(initial_only: bool = False, force: bool = False,
+                 emit: Optional[Callable[[dict], None]] = None) -> dict:
     """
-    Verifica se um caminho de rede é acessível sem tentar criar diretórios.
-    
+    Verifica/baixa a Initial Release e a Latest do Qlik Sense Desktop (API importável).
+
     Args:
-        path (Path): Caminho a ser verificado
-        
+        initial_only (bool): Processa apenas a Initial Release
+        force (bool): Rebaixa e sobrescreve todos os destinos
+        emit (callable): Recebe cada registro de asset assim que é processado
+
     Returns:
-        bool: True se acessível, False caso contrário
+        dict: {'status', 'error', 'latest', 'cycle', 'initial', 'assets'}
+            (+ 'unchanged': True quando a API respondeu 304 e nada precisou ser verificado)
     """
-    try:
-        # Normaliza o caminho antes de verificar
-        path_str = str(path)
-        normalized_path = normalize_unc_path(path_str)
-        path = Path(normalized_path)
-        
-        # Tenta apenas verificar se o caminho existe ou pode ser acessado
-        if path.exists():
-            return True
-        
-        # Se não existe, tenta verificar o diretório pai
-        parent = path.parent
-        if parent.exists():
-            return True
-            
-        # Para caminhos UNC, tenta verificar se o servidor responde
-        path_str = str(path)
-        if path_str.startswith("\\\\"):
-            # Tenta listar o diretório pai para verificar conectividade
-            try:
-                parent_str = str(parent)
-                if os.path.exists(parent_str):
-                    return True
-            except OSError:
-                pass
-                
-        return False
-        
-    except OSError as e:
-        if e.winerror == 1326:  # Nome de usuário ou senha incorretos
-            print(f"⚠️ Erro de autenticação ao verificar pasta: {path}")
-            return False
-        elif e.winerror == 53:  # Caminho de rede não encontrado
-            print(f"⚠️ Caminho de rede não encontrado: {path}")
-            return False
-        elif e.winerror == 5:  # Acesso negado
-            print(f"⚠️ Acesso negado ao verificar pasta: {path}")
-            return False
-        else:
-            print(f"⚠️ Erro ao verificar pasta {path}: {e}")
-            return False
-    except Exception:
-        return False
+    result = {'status': 'ok', 'error': None, 'latest': None, 'cycle': None, 'initial': None, 'assets': []}
 
-def main():
-    print_header()
+    def fail(code: int, message: str) -> dict:
+        print(message)
+        result.update(status='erro', error=message, exit_code=code)
+        return result
 
-    args = parse_args()
+    if not check_destinations_configured():
+        return fail(1, "Nenhum caminho de rede configurado no arquivo .env")
 
     # Configura credenciais de rede se disponíveis
-    if NETWORK_USERNAME and NETWORK_PASSWORD:
+    if (NETWORK_USERNAME and NETWORK_PASSWORD) or NETWORK_MOUNT_ROOT:
         print("🔐 Configurando credenciais de rede...")
-        setup_network_credentials()
+        setup_network_credentials(DESTINATION_BASE_DIRS)
     else:
         print("ℹ️ Credenciais de rede não configuradas.")
 
@@ -500,39 +431,84 @@ def main():
     latest = get_latest_release()
     latest_name = (latest.get("name") or "").strip()
     if not latest_name:
-        print("Não foi possível determinar o nome da última release.")
-        sys.exit(1)
+        return fail(1, "Não foi possível determinar o nome da última release.")
+    result['latest'] = latest_name
     print(f"Última release: {latest_name}")
 
     # 2) Ciclo (ex.: 'May 2025')
     cycle = extract_cycle_from_name(latest_name)
     if not cycle:
-        print(f"Não foi possível extrair o ciclo (Mês Ano) de: {latest_name}")
-        sys.exit(2)
+        return fail(2, f"Não foi possível extrair o ciclo (Mês Ano) de: {latest_name}")
+    result['cycle'] = cycle
     print(f"Ciclo detectado: {cycle}")
 
     # 3) Initial Release correspondente
     all_rels = get_all_releases(per_page=80)
     initial = find_initial_release_for_cycle(all_releases=all_rels, cycle=cycle)
     if not initial:
-        print(f"Initial Release do ciclo '{cycle}' não encontrada.")
-        sys.exit(3)
+        return fail(3, f"Initial Release do ciclo '{cycle}' não encontrada.")
     initial_name = (initial.get("name") or "").strip()
+    result['initial'] = initial_name
     print(f"Initial Release: {initial_name}")
 
+    # Nada mudou na API (304) desde a última sincronização completa: pula a comparação dos assets
+    api_urls = [LATEST_RELEASE_URL, releases_url(80)]
+    if not force and GITHUB_CACHE.unchanged(api_urls):
+        print("✅ Releases sem alteração desde a última sincronização; nenhuma verificação de assets necessária.")
+        result['unchanged'] = True
+        return result
+
     # 4) Pasta de versão (nome da Latest)
     version_folder_name = sanitize_filename(latest_name)
 
     # 5) Processar Initial (sempre)
     print("Processando assets da Initial Release...")
-    process_release_assets(initial, version_folder_name, subfolder_name="Initial Release", force=args.force)
+    result['assets'] += process_release_assets(initial, version_folder_name, subfolder_name="Initial Release", force=force, emit=emit)
 
     # 6) Processar Latest (por padrão SIM; só pula se --initial-only)
-    if not args.initial_only:
+    if not initial_only:
         print("Processando assets da Latest...")
-        process_release_assets(latest, version_folder_name, subfolder_name="Latest", force=args.force)
+        result['assets'] += process_release_assets(latest, version_folder_name, subfolder_name="Latest", force=force, emit=emit)
+
+    # Só marca como sincronizado se todos os destinos ficaram em dia
+    incomplete = any(
+        a['action'] in ('sem_destino', 'sem_destino_acessivel')
+        or any(c.get('error') for c in a.get('copies', []))
+        for a in result['assets']
+    )
+    if not incomplete:
+        GITHUB_CACHE.mark_synced(api_urls)
 
     print("Concluído.")
+    return result
+
+def main():
+    args = parse_args()
+
+    if not (args.json or args.ndjson):
+        print_header()
+        result = sync_desktop(initial_only=args.initial_only, force=args.force)
+        if result['status'] != 'ok':
+            sys.exit(result.get('exit_code', 1))
+        return
+
+    # Modos estruturados: stdout só com JSON; mensagens de progresso vão para stderr
+    out = sys.stdout
+
+    def emit_line(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        print_header()
+        result = sync_desktop(initial_only=args.initial_only, force=args.force,
+                              emit=emit_line if args.ndjson else None)
+    if args.ndjson:
+        emit_line({'type': 'result', **result})
+    else:
+        out.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+    if result['status'] != 'ok':
+        sys.exit(result.get('exit_code', 1))
 
 if __name__ == "__main__":
     main()
@@ -3,16 +3,27 @@
 
 import os
 import sys
+import json
 import errno
-import subprocess
+import contextlib
 from pathlib import Path
 from datetime import datetime
+from typing import Callable, List, Optional
 import argparse
 from dotenv import load_dotenv
 
-# Carrega variáveis de ambiente do arquivo .env
+# Carrega variáveis de ambiente do arquivo .env (antes dos módulos que leem ETL_*/NETWORK_* no import)
 load_dotenv()
 
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.etl_scanner import scan_directories, DEFAULT_WORKERS_PER_SHARE
+from crawler_qlik import etl_index
+from crawler_qlik.etl_sla import load_rules, evaluate as evaluate_sla
+from crawler_qlik.network_config import check_paths, is_path_accessible, normalize_unc_path, setup_network_credentials
+from crawler_qlik.network_config import NETWORK_USERNAME, NETWORK_PASSWORD, NETWORK_MOUNT_ROOT
+from crawler_qlik.etl_watch import EtlWatcher, DEFAULT_POLL_SECONDS
+
 # Configuração para Windows - suporte a UTF-8
 if os.name == 'nt':  # Windows
     try:
@@ -30,11 +41,6 @@ if os.name == 'nt':  # Windows
 # Raiz do módulo = pasta do crawler (para usar crawler_qlik/errorlogs)
 REPO_ROOT = Path(__file__).resolve().parent
 
-# Credenciais de rede (opcional)
-NETWORK_USERNAME = os.getenv("NETWORK_USERNAME", "")
-NETWORK_PASSWORD = os.getenv("NETWORK_PASSWORD", "")
-NETWORK_DOMAIN = os.getenv("NETWORK_DOMAIN", "")
-
 # Diretórios de rede — lidos do arquivo .env
 DEFAULT_DIRS = [
     os.getenv("NETWORK_PATH_1", "") + "\\ETLDesktop" if os.getenv("NETWORK_PATH_1", "") else "",
@@ -54,56 +60,6 @@ ERROR_LOG_PATH = ERROR_LOG_DIR / "ErrorUpdateETLDesktop.txt"
 # Utilitários
 # ======================
 
-def setup_network_credentials():
-    """
-    Configura credenciais de rede se fornecidas.
-    """
-    if not NETWORK_USERNAME or not NETWORK_PASSWORD:
-        print("ℹ️ Credenciais de rede não configuradas.")
-        print("   Para configurar, defina as variáveis de ambiente:")
-        print("   - NETWORK_USERNAME")
-        print("   - NETWORK_PASSWORD") 
-        print("   - NETWORK_DOMAIN (opcional)")
-        return False
-    
-    try:
-        # Tenta configurar credenciais de rede usando net use
-        for path in DEFAULT_DIRS:
-            if not path.strip():
-                continue
-                
-            # Normaliza o caminho antes de usar
-            normalized_path = normalize_unc_path(path)
-            
-            if normalized_path.startswith("\\\\"):
-                # Limpa o formato do usuário (remove barras duplas se existirem)
-                clean_username = NETWORK_USERNAME.replace("\\\\", "\\")
-                clean_domain = NETWORK_DOMAIN.replace("\\\\", "\\") if NETWORK_DOMAIN else ""
-                
-                cmd = [
-                    "net", "use", normalized_path, 
-                    f"/user:{clean_domain}\\{clean_username}" if clean_domain else f"/user:{clean_username}",
-                    NETWORK_PASSWORD
-                ]
-                
-                result = subprocess.run(
-                    cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    print(f"✅ Credenciais configuradas para: {normalized_path}")
-                else:
-                    print(f"⚠️ Erro ao configurar credenciais para {normalized_path}: {result.stderr.strip()}")
-                    
-        return True
-        
-    except Exception as e:
-        print(f"❌ Erro ao configurar credenciais de rede: {e}")
-        return False
-
 def ensure_dir(path: Path) -> None:
     try:
         path.mkdir(parents=True, exist_ok=True)
@@ -111,33 +67,9 @@ def ensure_dir(path: Path) -> None:
         if e.errno != errno.EEXIST:
             raise
 
-def normalize_unc_path(path_str: str) -> str:
-    """
-    Normaliza um caminho UNC para garantir que seja interpretado corretamente.
-    
-    Args:
-        path_str (str): Caminho UNC como string
-        
-    Returns:
-        str: Caminho UNC normalizado
-    """
-    # Remove barras extras e normaliza
-    path_str = path_str.replace("\\\\", "\\").replace("//", "/")
-    
-    # Garante que caminhos UNC tenham exatamente duas barras no início
-    if path_str.startswith("\\"):
-        # Se já tem uma barra, adiciona mais uma
-        if not path_str.startswith("\\\\"):
-            path_str = "\\" + path_str
-    elif path_str.startswith("/"):
-        # Se tem barra normal, converte para barra invertida
-        path_str = "\\" + path_str.replace("/", "\\")
-    
-    return path_str
-
 def is_network_path_accessible(path: Path) -> bool:
     """
-    Verifica se um caminho de rede é acessível.
+    Verifica se um caminho de rede é acessível (com prazo e cache do network_config).
     
     Args:
         path (Path): Caminho a ser verificado
@@ -145,91 +77,7 @@ def is_network_path_accessible(path: Path) -> bool:
     Returns:
         bool: True se acessível, False caso contrário
     """
-    try:
-        # Normaliza o caminho antes de verificar
-        path_str = str(path)
-        normalized_path = normalize_unc_path(path_str)
-        path = Path(normalized_path)
-        
-        return path.exists() and path.is_dir()
-    except OSError as e:
-        if e.winerror == 1326:  # Nome de usuário ou senha incorretos
-            print(f"⚠️ Erro de autenticação ao verificar pasta: {path}")
-            return False
-        elif e.winerror == 53:  # Caminho de rede não encontrado
-            print(f"⚠️ Caminho de rede não encontrado: {path}")
-            return False
-        elif e.winerror == 5:  # Acesso negado
-            print(f"⚠️ Acesso negado ao verificar pasta: {path}")
-            return False
-        else:
-            print(f"⚠️ Erro ao verificar pasta {path}: {e}")
-            return False
-    except Exception:
-        return False
-
-def list_files_recursive(root: Path):
-    try:
-        # Normaliza o caminho antes de verificar
-        root_str = str(root)
-        normalized_root = normalize_unc_path(root_str)
-        root = Path(normalized_root)
-        
-        if not root.exists() or not root.is_dir():
-            return None
-        return [p for p in root.rglob("*") if p.is_file()]
-    except OSError as e:
-        if e.winerror == 1326:  # Nome de usuário ou senha incorretos
-            print(f"⚠️ Erro de autenticação ao acessar pasta: {root}")
-            print("   A pasta requer credenciais específicas de rede.")
-            return None
-        elif e.winerror == 53:  # Caminho de rede não encontrado
-            print(f"⚠️ Caminho de rede não encontrado: {root}")
-            return None
-        elif e.winerror == 5:  # Acesso negado
-            print(f"⚠️ Acesso negado à pasta: {root}")
-            return None
-        else:
-            print(f"⚠️ Erro ao acessar pasta {root}: {e}")
-            return None
-    except Exception as e:
-        print(f"⚠️ Erro inesperado ao acessar pasta {root}: {e}")
-        return None
-
-def list_files_top_level(root: Path):
-    try:
-        # Normaliza o caminho antes de verificar
-        root_str = str(root)
-        normalized_root = normalize_unc_path(root_str)
-        root = Path(normalized_root)
-        
-        if not root.exists() or not root.is_dir():
-            return None
-        return [p for p in root.iterdir() if p.is_file()]
-    except OSError as e:
-        if e.winerror == 1326:  # Nome de usuário ou senha incorretos
-            print(f"⚠️ Erro de autenticação ao acessar pasta: {root}")
-            print("   A pasta requer credenciais específicas de rede.")
-            return None
-        elif e.winerror == 53:  # Caminho de rede não encontrado
-            print(f"⚠️ Caminho de rede não encontrado: {root}")
-            return None
-        elif e.winerror == 5:  # Acesso negado
-            print(f"⚠️ Acesso negado à pasta: {root}")
-            return None
-        else:
-            print(f"⚠️ Erro ao acessar pasta {root}: {e}")
-            return None
-    except Exception as e:
-        print(f"⚠️ Erro inesperado ao acessar pasta {root}: {e}")
-        return None
-
-def is_updated_today(file_path: Path, today) -> bool:
-    try:
-        mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-        return mtime.date() == today
-    except Exception:
-        return False
+    return is_path_accessible(normalize_unc_path(str(path)))
 
 # ======================
 # Execução
@@ -237,7 +85,7 @@ def is_updated_today(file_path: Path, today) -> bool:
 
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(
-        description="Verifica se arquivos de ETL foram atualizados hoje; gera log e mostra resumo por nome (deduplicado)."
+        description="Verifica se arquivos de ETL estão dentro do SLA de atualização (padrão: atualizados hoje); gera log e mostra resumo."
     )
     ap.add_argument(
         "--dirs", nargs="+", default=DEFAULT_DIRS,
@@ -247,113 +95,294 @@ def parse_args() -> argparse.Namespace:
         "--no-recursive", action="store_true",
         help="Não varrer recursivamente (apenas o nível da pasta)."
     )
+    ap.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS_PER_SHARE,
+        help="Threads de listagem por compartilhamento de rede (padrão: %(default)s)."
+    )
+    ap.add_argument(
+        "--index", action="store_true",
+        help="Usa o índice local (SQLite) e lista de novo apenas os diretórios que mudaram."
+    )
+    ap.add_argument(
+        "--full-scan", action="store_true",
+        help="Com --index, força a varredura completa das pastas."
+    )
+    ap.add_argument(
+        "--rules", default=None,
+        help="Arquivo JSON de regras de SLA (padrão: ETL_SLA_RULES ou crawler_qlik/etl_sla_rules.json)."
+    )
+    ap.add_argument(
+        "--watch", action="store_true",
+        help="Modo contínuo: observa as pastas e emite eventos de atualização/SLA à medida que acontecem."
+    )
+    ap.add_argument(
+        "--watch-backend", choices=["auto", "watchdog", "poll"], default="auto",
+        help="Com --watch: notificações nativas (watchdog) ou polling por mtime de diretório (padrão: auto; UNC usa polling)."
+    )
+    ap.add_argument(
+        "--interval", type=float, default=DEFAULT_POLL_SECONDS,
+        help="Com --watch: segundos entre ciclos de polling e reavaliações de SLA (padrão: %(default)s)."
+    )
+    output = ap.add_mutually_exclusive_group()
+    output.add_argument(
+        "--json", action="store_true",
+        help="Imprime o resultado como um único documento JSON (mensagens vão para stderr)."
+    )
+    output.add_argument(
+        "--ndjson", action="store_true",
+        help="Emite um registro JSON por linha à medida que as pastas são verificadas."
+    )
     return ap.parse_args()
 
-def main():
-    args = parse_args()
-    today = datetime.now().date()
+def check_etl(dirs: Optional[List[str]] = None, recursive: bool = True,
+              workers: int = DEFAULT_WORKERS_PER_SHARE, use_index: bool = False,
+              full_scan: bool = False, rules_path: Optional[str] = None,
+              emit: Optional[Callable[[dict], None]] = None,
+              write_log: bool = True) -> dict:
+    """
+    Verifica as pastas de ETL e retorna o resultado estruturado (API importável).
+
+    Args:
+        dirs (list): Pastas a verificar (padrão: DEFAULT_DIRS)
+        recursive (bool): Varrer subpastas
+        workers (int): Threads de listagem por compartilhamento
+        use_index (bool): Usar o índice local (etl_index)
+        full_scan (bool): Com use_index, forçar varredura completa
+        rules_path (str): Arquivo de regras de SLA
+        emit (callable): Recebe cada registro assim que é produzido
+            ({'type': 'folder' | 'violation' | 'stale', ...})
+        write_log (bool): Gravar/remover ErrorUpdateETLDesktop.txt
+
+    Returns:
+        dict: {'generated_at', 'reference_date', 'folders', 'violations', 'stale', 'missing', 'totals', 'error_log'}
+    """
+    emit = emit or (lambda record: None)
+    now = datetime.now()
+    today = now.date()
+    sla_rules = load_rules(rules_path)
 
     # Configura credenciais de rede se disponíveis
-    if NETWORK_USERNAME and NETWORK_PASSWORD:
+    if (NETWORK_USERNAME and NETWORK_PASSWORD) or NETWORK_MOUNT_ROOT:
         print("🔐 Configurando credenciais de rede...")
-        setup_network_credentials()
+        setup_network_credentials(DEFAULT_DIRS)
     else:
         print("ℹ️ Credenciais de rede não configuradas.")
 
-    all_not_updated = []   # (path_str, mtime_str)
-    totals = []            # (folder, total, ok, not_ok)
-    missing = []           # pastas inexistentes/inacessíveis
-
-    print("🔍 Verificando acessibilidade dos diretórios...")
-    
-    for d in args.dirs:
-        # Normaliza o caminho antes de criar o Path
-        normalized_d = normalize_unc_path(d)
-        folder = Path(normalized_d)
-        
-        # Verifica se o diretório é acessível antes de tentar listar arquivos
-        if not is_network_path_accessible(folder):
-            print(f"❌ Diretório inacessível: {normalized_d}")
-            missing.append(normalized_d)
-            totals.append((normalized_d, 0, 0, 0))
-            continue
-        
-        print(f"✅ Diretório acessível: {normalized_d}")
-        files = list_files_top_level(folder) if args.no_recursive else list_files_recursive(folder)
+    result = {
+        'generated_at': now.isoformat(timespec='seconds'),
+        'reference_date': today.isoformat(),
+        'folders': [],      # {'folder', 'accessible', 'total', 'ok', 'not_ok'}
+        'violations': [],   # {'path', 'mtime', 'rule'}
+        'stale': [],        # atualizados ontem, mas não hoje (apenas com índice)
+        'missing': [],      # pastas inexistentes/inacessíveis
+    }
+
+    print("🔍 Varrendo diretórios em paralelo...")
+
+    # Normaliza os caminhos e varre todas as pastas de uma vez (um pool por compartilhamento)
+    folders = [normalize_unc_path(d) for d in (dirs if dirs is not None else DEFAULT_DIRS)]
+
+    # Verifica todas as pastas em paralelo (com prazo); servidores fora do ar não travam a varredura
+    health = check_paths(folders)
+    reachable = [f for f in folders if health[f].accessible]
+    for folder in folders:
+        if not health[folder].accessible:
+            print(f"⚠️ {folder}: {health[folder].error}")
+
+    index_conn = None
+    if use_index:
+        # Índice local: só os diretórios cujo mtime mudou são listados de novo
+        index_conn = etl_index.connect()
+        scanned = {}
+        for folder in reachable:
+            stats = etl_index.refresh_root(
+                index_conn, folder, recursive=recursive, workers=workers, full=full_scan
+            )
+            scanned[folder] = etl_index.files_under(index_conn, folder) if stats is not None else None
+            if stats is not None:
+                print(f"🗂️ Índice ({stats['mode']}): {stats['dirs_rescanned']}/{stats['dirs_checked']} diretórios listados, "
+                      f"{stats['files_updated']} arquivo(s) sobrescrito(s) em {folder}")
+    else:
+        scanned = scan_directories(reachable, recursive=recursive, workers_per_share=workers)
 
+    for folder in folders:
+        files = scanned.get(folder)
         if files is None:
-            missing.append(str(folder))
-            totals.append((str(folder), 0, 0, 0))
+            print(f"❌ Diretório inacessível: {folder}")
+            result['missing'].append(folder)
+            record = {'folder': folder, 'accessible': False, 'total': 0, 'ok': 0, 'not_ok': 0}
+            result['folders'].append(record)
+            emit({'type': 'folder', **record})
             continue
 
-        total = len(files)
-        ok = 0
-        not_ok = 0
-
-        for f in files:
-            if is_updated_today(f, today):
-                ok += 1
-            else:
-                not_ok += 1
-                try:
-                    mtime_str = datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    mtime_str = "desconhecida"
-                all_not_updated.append((str(f), mtime_str))
-
-        totals.append((str(folder), total, ok, not_ok))
-
-    # Resumo em tela
+        print(f"✅ Diretório acessível: {folder}")
+
+        # stat já veio da listagem (DirEntry); as regras de SLA são avaliadas de uma vez
+        ok_mask, violations = evaluate_sla(files, sla_rules, now)
+        ok = int(ok_mask.sum())
+        for v in violations:
+            record = {
+                'path': v.path,
+                'mtime': datetime.fromtimestamp(v.mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                'rule': v.rule,
+            }
+            result['violations'].append(record)
+            emit({'type': 'violation', 'folder': folder, **record})
+
+        record = {'folder': folder, 'accessible': True, 'total': len(files), 'ok': ok, 'not_ok': len(files) - ok}
+        result['folders'].append(record)
+        emit({'type': 'folder', **record})
+
+    if index_conn is not None:
+        indexed_roots = [folder for folder in folders if scanned.get(folder) is not None]
+        stale = etl_index.stale_since_yesterday(index_conn, indexed_roots, today) if indexed_roots else []
+        for entry in stale:
+            result['stale'].append(entry.path)
+            emit({'type': 'stale', 'path': entry.path})
+        index_conn.close()
+
+    result['totals'] = {
+        'files': sum(f['total'] for f in result['folders']),
+        'ok': sum(f['ok'] for f in result['folders']),
+        'not_ok': sum(f['not_ok'] for f in result['folders']),
+        'missing': len(result['missing']),
+    }
+    result['error_log'] = write_error_log(result) if write_log else None
+    return result
+
+def write_error_log(result: dict) -> Optional[str]:
+    """Grava o ErrorUpdateETLDesktop.txt com as violações (ou remove o anterior se não houver)"""
+    if result['violations']:
+        ensure_dir(ERROR_LOG_DIR)
+        with open(ERROR_LOG_PATH, "w", encoding="utf-8") as f:
+            f.write(f"Log gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Data de referência: {result['reference_date']}\n")
+            f.write("=" * 50 + "\n")
+            for v in result['violations']:
+                f.write(f"{v['path']} | {v['mtime']} | {v['rule']}\n")
+        print(f"📄 Log de erro salvo em: {ERROR_LOG_PATH}")
+        return str(ERROR_LOG_PATH)
+    # Remove log anterior se não há erros
+    if ERROR_LOG_PATH.exists():
+        ERROR_LOG_PATH.unlink()
+        print("✅ Log de erro anterior removido (não há arquivos desatualizados).")
+    return None
+
+def print_report(result: dict) -> None:
+    """Relatório legível no console (modo padrão da linha de comando)"""
     print("=" * 64)
-    print("Status de atualização (data de hoje):", today.strftime("%Y-%m-%d"))
+    print("Status de atualização (data de hoje):", result['reference_date'])
     print("=" * 64)
-    for folder, total, ok, not_ok in totals:
-        print(f"Pasta: {folder}")
-        print(f"  Arquivos encontrados : {total}")
-        print(f"  Atualizados hoje     : {ok}")
-        print(f"  Não atualizados      : {not_ok}")
+    for folder in result['folders']:
+        print(f"Pasta: {folder['folder']}")
+        print(f"  Arquivos encontrados : {folder['total']}")
+        print(f"  Dentro do SLA        : {folder['ok']}")
+        print(f"  Fora do SLA          : {folder['not_ok']}")
         print()
 
-    if missing:
+    if result['missing']:
         print("⚠️ Pastas inacessíveis:")
-        for m in missing:
+        for m in result['missing']:
             print(f"  - {m}")
         print()
 
-    if all_not_updated:
-        print("📋 Arquivos não atualizados hoje:")
-        for path, mtime in all_not_updated:
-            print(f"  - {path} (última modificação: {mtime})")
+    if result['stale']:
+        print("🕒 Atualizados ontem, mas não hoje:")
+        for path in result['stale']:
+            print(f"  - {path}")
         print()
 
-    # Gera log de erro se necessário
-    if all_not_updated:
-        ensure_dir(ERROR_LOG_DIR)
-        with open(ERROR_LOG_PATH, "w", encoding="utf-8") as f:
-            f.write(f"Log gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Data de referência: {today.strftime('%Y-%m-%d')}\n")
-            f.write("=" * 50 + "\n")
-            for path, mtime in all_not_updated:
-                f.write(f"{path} | {mtime}\n")
-        print(f"📄 Log de erro salvo em: {ERROR_LOG_PATH}")
-    else:
-        # Remove log anterior se não há erros
-        if ERROR_LOG_PATH.exists():
-            ERROR_LOG_PATH.unlink()
-            print("✅ Log de erro anterior removido (não há arquivos desatualizados).")
-
-    # Resumo final
-    total_files = sum(t[1] for t in totals)
-    total_ok = sum(t[2] for t in totals)
-    total_not_ok = sum(t[3] for t in totals)
-    
+    if result['violations']:
+        print("📋 Arquivos fora do SLA de atualização:")
+        for v in result['violations']:
+            print(f"  - {v['path']} (última modificação: {v['mtime']}, regra: {v['rule']})")
+        print()
+
+    totals = result['totals']
     print("=" * 64)
     print("RESUMO FINAL:")
-    print(f"  Total de arquivos verificados: {total_files}")
-    print(f"  Arquivos atualizados hoje: {total_ok}")
-    print(f"  Arquivos não atualizados: {total_not_ok}")
-    print(f"  Pastas inacessíveis: {len(missing)}")
+    print(f"  Total de arquivos verificados: {totals['files']}")
+    print(f"  Arquivos dentro do SLA: {totals['ok']}")
+    print(f"  Arquivos fora do SLA: {totals['not_ok']}")
+    print(f"  Pastas inacessíveis: {totals['missing']}")
     print("=" * 64)
 
+WATCH_EVENT_LABELS = {
+    'created': "🆕 Novo arquivo",
+    'updated': "🔄 Atualizado",
+    'deleted': "🗑️ Removido",
+    'violation': "❌ Fora do SLA",
+    'recovered': "✅ Voltou ao SLA",
+    'unreachable': "⚠️ Pasta inacessível",
+}
+
+def print_watch_event(event: dict) -> None:
+    label = WATCH_EVENT_LABELS.get(event['type'], event['type'])
+    target = event.get('path') or event.get('folder', '')
+    when = f" ({event['mtime']})" if event.get('mtime') else ""
+    print(f"[{event['at']}] {label}: {target}{when}")
+
+def watch_etl(dirs: Optional[List[str]] = None, workers: int = DEFAULT_WORKERS_PER_SHARE,
+              rules_path: Optional[str] = None, backend: str = "auto",
+              interval: float = DEFAULT_POLL_SECONDS,
+              emit: Optional[Callable[[dict], None]] = None) -> EtlWatcher:
+    """
+    Cria o observador contínuo das pastas de ETL (API importável).
+
+    O chamador decide entre start()/stop() (segundo plano) e run_forever();
+    snapshot(), status(path) e violations() consultam o estado em memória.
+    """
+    if (NETWORK_USERNAME and NETWORK_PASSWORD) or NETWORK_MOUNT_ROOT:
+        print("🔐 Configurando credenciais de rede...")
+        setup_network_credentials(DEFAULT_DIRS)
+    folders = [normalize_unc_path(d) for d in (dirs if dirs is not None else DEFAULT_DIRS)]
+    return EtlWatcher(folders, emit=emit or print_watch_event, rules_path=rules_path,
+                      backend=backend, interval=interval, workers=workers)
+
+def main():
+    args = parse_args()
+    if args.watch:
+        out = sys.stdout
+
+        def emit_event(record):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        structured = args.json or args.ndjson
+        watch_options = dict(
+            dirs=args.dirs, workers=args.workers, rules_path=args.rules,
+            backend=args.watch_backend, interval=args.interval,
+            emit=emit_event if structured else None,
+        )
+        if structured:
+            with contextlib.redirect_stdout(sys.stderr):
+                watch_etl(**watch_options).run_forever()
+        else:
+            watch_etl(**watch_options).run_forever()
+        return
+
+    options = dict(
+        dirs=args.dirs, recursive=not args.no_recursive, workers=args.workers,
+        use_index=args.index, full_scan=args.full_scan, rules_path=args.rules,
+    )
+
+    if not (args.json or args.ndjson):
+        print_report(check_etl(**options))
+        return
+
+    # Modos estruturados: stdout só com JSON; mensagens de progresso vão para stderr
+    out = sys.stdout
+
+    def emit_line(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        result = check_etl(**options, emit=emit_line if args.ndjson else None)
+    if args.ndjson:
+        emit_line({'type': 'result', **result})
+    else:
+        out.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,8 @@
 import os
+import sys
 import time
-import locale
-from datetime import datetime, date
+import requests
+from datetime import date
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -11,24 +12,22 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from colorama import init, Fore, Style
-from xhtml2pdf import pisa
-from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from selenium.webdriver.remote.webelement import WebElement
 from bs4 import BeautifulSoup
 
-# Inicialização
-init(autoreset=True)
+# Carrega o .env antes dos módulos que leem REPORT_*/NPRINTING_* no import
 load_dotenv()
 
-# Locale para datas em português
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'pt_BR')
-    except:
-        print("⚠️ Locale 'pt_BR' não disponível. Datas podem não ser interpretadas corretamente.")
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.status_report import ReportPipeline
+from crawler_qlik.date_parser import parse_column, parse_pt_datetime, parse_qmc_datetime
+from crawler_qlik.nprinting_api import (NPrintingApiClient, NPrintingApiError, api_base_url,
+                                        execution_id_from_href, save_failure_logs)
+
+# Inicialização
+init(autoreset=True)
 
 # Variáveis de ambiente
 usuario = os.getenv("QLIK_USUARIO")
@@ -36,6 +35,11 @@ senha = os.getenv("QLIK_SENHA")
 email = os.getenv("QLIK_EMAIL")
 CAMINHO_CHROMEDRIVER = os.getenv("CHROMEDRIVER")
 
+# Coleta do NPrinting: "navegador" (raspagem com Selenium) ou "api" (REST, com volta ao navegador em caso de falha)
+NPRINTING_COLETA = os.getenv("NPRINTING_COLETA", "navegador").strip().lower()
+# Limite de páginas da tela de execuções percorridas pelo navegador
+NPRINTING_MAX_PAGINAS = int(os.getenv("NPRINTING_MAX_PAGINAS", "20"))
+
 def _resolve_chromedriver_path() -> str | None:
     """Resolve o caminho do ChromeDriver com base em variáveis e fallbacks locais."""
     try:
@@ -115,6 +119,21 @@ status_map_nprinting = {
     "label label-info blink": "Em execução"
 }
 
+# Lê numa única chamada as células de todas as linhas da página de execuções
+# (a decisão sobre datas fica no Python, com a tabela de meses do date_parser)
+JS_LINHAS_NPRINTING = """
+const linhas = [];
+for (const tr of document.querySelectorAll("table.table tbody tr.ng-scope")) {
+    const td = tr.querySelectorAll("td");
+    if (td.length < 6) continue;
+    const a = td[0].querySelector("a");
+    const span = td[2].querySelector("span");
+    linhas.push([td[0].innerText.trim(), a ? a.href : null, td[1].innerText.trim(), td[2].innerText.trim(),
+                 span ? span.className : "", td[3].innerText.trim(), td[4].innerText.trim(), td[5].innerText.trim()]);
+}
+return linhas;
+"""
+
 cores = {
     "Success": Fore.GREEN,
     "Concluída": Fore.GREEN,
@@ -143,8 +162,10 @@ def esperar_popover_abrir(icone, max_tentativas=10):
         time.sleep(1)
     return False
 
-def coletar_status_qmc():
+def coletar_status_qmc(formatos=None):
     resumos = {}
+    # formatos: saídas do relatório (pdf, texto, png); None = só PDF, vazio = nenhuma
+    pipeline = ReportPipeline(formatos=formatos)
     # resolve errorlogs sempre em crawler_qlik/errorlogs
     errorlogs_dir = Path(__file__).resolve().parent / "errorlogs"
     os.makedirs(errorlogs_dir, exist_ok=True)
@@ -195,11 +216,8 @@ def coletar_status_qmc():
                     classe_status = next((cls for cls in icone_status.get_attribute("class").split() if cls.startswith("icon-qmc-task")), "")
                     status = status_map_qmc.get(classe_status, "Outros")
                     if status == "Success":
-                        try:
-                            data_execucao = datetime.strptime(ultima_execucao[:16], "%Y-%m-%d %H:%M").date()
-                            if data_execucao != hoje:
-                                status = "Em rota de atualização"
-                        except:
+                        data_execucao = parse_qmc_datetime(ultima_execucao)
+                        if data_execucao is None or data_execucao.date() != hoje:
                             status = "Em rota de atualização"
                     tarefas_por_status.setdefault(status, []).append([nome, status, ultima_execucao])
                     
@@ -386,23 +404,170 @@ def coletar_status_qmc():
             resumos[nome_sufixo] = resumo_str
             registros = [tarefa for tarefas in tarefas_por_status.values() for tarefa in tarefas]
             nome_arquivo = f"status_qlik_{nome_sufixo}_{hoje.strftime('%Y-%m-%d')}.pdf"
-            caminho_pdf = os.path.join(TASKS_DIR, nome_arquivo)
-            templates_dir = Path(__file__).resolve().parent / "teamplate"
-            env = Environment(loader=FileSystemLoader(str(templates_dir)))
-            template = env.get_template("template.html")
-            html_renderizado = template.render(
-                nome_sufixo=nome_sufixo,
-                tarefas=registros
-            )
-            with open(caminho_pdf, "wb") as saida_pdf:
-                pisa.CreatePDF(html_renderizado, dest=saida_pdf)
-            print(f"\n✅ PDF gerado com xhtml2pdf: {caminho_pdf}")
+            relatorio = {
+                "template": "template.html",
+                "nome_sufixo": nome_sufixo,
+                "tarefas": registros,
+                "caminho_pdf": os.path.join(TASKS_DIR, nome_arquivo),
+            }
         finally:
+            # Navegador liberado assim que a coleta termina, antes da renderização
             driver.quit()
+        pipeline.submit(relatorio)
+    # Aguarda os PDFs que ainda estão sendo gerados no pool de processos
+    pipeline.close()
     return resumos
 
-def coletar_status_nprinting():
+def _raspar_nprinting(url_login, url_tasks, errorlogs_dir, hoje):
+    """Coleta pelo navegador (Selenium) as execuções de hoje do NPrinting."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--incognito")
+    options.add_experimental_option("prefs", {
+        "download.default_directory": str(errorlogs_dir.resolve()),
+    })
+    driver_path = _resolve_chromedriver_path()
+    if driver_path:
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    else:
+        # fallback: deixa o Selenium Manager resolver
+        driver = webdriver.Chrome(options=options)
+    tarefas_por_status = {}
+    falhas = []
+    try:
+        driver.get(url_login)
+        wait = WebDriverWait(driver, 10)
+        campo_email = wait.until(EC.presence_of_element_located((By.ID, "email")))
+        campo_email.send_keys(email)
+        campo_senha = wait.until(EC.presence_of_element_located((By.ID, "password")))
+        campo_senha.send_keys(senha)
+        campo_senha.send_keys(Keys.ENTER)
+        print("✅ Login enviado.")
+        time.sleep(5)
+        driver.get(url_tasks)
+        print("📄 Carregando tarefas...")
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.table tbody tr.ng-scope")))
+        time.sleep(1)
+        for pagina in range(1, NPRINTING_MAX_PAGINAS + 1):
+            linhas = driver.execute_script(JS_LINHAS_NPRINTING)
+            datas = parse_column([linha[6] for linha in linhas], parse_pt_datetime)
+            # A página inteira já veio numa chamada; as datas só decidem se vale ir à próxima,
+            # o que exige a grade de fato da execução mais recente para a mais antiga
+            antigas = False
+            ordem_decrescente = True
+            anterior = None
+            for linha, data_execucao in zip(linhas, datas):
+                nome, href, tipo, status_texto, classe_status, progresso, criado, atualizado = linha
+                if data_execucao is None:
+                    print(f"⚠️ Erro ao converter data '{criado}'")
+                    continue
+                if anterior is not None and data_execucao > anterior:
+                    ordem_decrescente = False
+                anterior = data_execucao
+                if data_execucao.date() < hoje:
+                    antigas = True
+                if data_execucao.date() != hoje:
+                    continue  # ignora tarefas que não são de hoje
+                status = status_map_nprinting.get(classe_status.strip(), status_texto)
+                tarefas_por_status.setdefault(status, []).append([
+                    nome, tipo, status, progresso, criado, atualizado
+                ])
+                if status == "Falha":
+                    # Logs baixados depois da varredura, todos ao mesmo tempo
+                    falhas.append((nome, href))
+            if not ordem_decrescente:
+                # Grade sem ordem por criação: lê só a página atual
+                break
+            if antigas:
+                print(f"⏹️ Execuções anteriores a hoje alcançadas na página {pagina}; varredura encerrada.")
+                break
+            if not _proxima_pagina_nprinting(driver):
+                break
+        if falhas:
+            _salvar_logs_nprinting(driver, url_login, falhas, errorlogs_dir)
+    finally:
+        # Navegador liberado assim que a coleta termina, antes da renderização
+        driver.quit()
+    return tarefas_por_status
+
+def _proxima_pagina_nprinting(driver):
+    """Avança a paginação da tela de execuções; False quando já está na última página."""
+    proxima = driver.find_elements(By.CSS_SELECTOR, "ul.pagination li.pagination-next:not(.disabled) a")
+    if not proxima:
+        return False
+    primeira = driver.find_element(By.CSS_SELECTOR, "table.table tbody tr.ng-scope")
+    proxima[0].click()
+    try:
+        WebDriverWait(driver, 10).until(EC.staleness_of(primeira))
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table.table tbody tr.ng-scope"))
+        )
+    except TimeoutException:
+        return False
+    return True
+
+def _salvar_log_pela_tela(driver, nome, href, errorlogs_dir):
+    """Abre a execução numa nova janela e grava a tabela de log (caminho antigo, sequencial)."""
+    print(f"\n⚠️ Tentando baixar log da tarefa '{nome}' pela tela...")
+    driver.execute_script("window.open(arguments[0]);", href)
+    driver.switch_to.window(driver.window_handles[-1])
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "table#executionsLogTable tbody tr"))
+        )
+    except TimeoutException:
+        pass
+    soup = BeautifulSoup(driver.page_source, "html.parser")
+    log_linhas = soup.select("table#executionsLogTable tbody tr")
+    if log_linhas:
+        log_path = str(errorlogs_dir / f"{nome}_log.txt")
+        with open(log_path, "w", encoding="utf-8") as f:
+            for linha_log in log_linhas:
+                tds = linha_log.find_all("td")
+                if len(tds) == 3:
+                    f.write(f"[{tds[0].text.strip()}] {tds[1].text.strip()} - {tds[2].text.strip()}\n")
+        print(f"📁 Log salvo: {log_path}")
+    driver.close()
+    driver.switch_to.window(driver.window_handles[0])
+
+def _salvar_logs_nprinting(driver, url_login, falhas, errorlogs_dir):
+    """
+    Baixa em paralelo os logs das tarefas com falha pela API, com os cookies da
+    sessão do navegador; só as que a API não devolver passam pela tela.
+    """
+    print(f"\n📥 Baixando {len(falhas)} log(s) de falha em paralelo...")
+    pendentes = falhas
+    try:
+        cliente = NPrintingApiClient.from_cookies(api_base_url(url_login), driver.get_cookies())
+        ids = [(nome, execution_id_from_href(href)) for nome, href in falhas]
+        salvos = save_failure_logs(cliente, [(nome, i) for nome, i in ids if i], errorlogs_dir)
+        pendentes = [(nome, href) for nome, href in falhas if not salvos.get(nome)]
+    except NPrintingApiError as e:
+        print(f"⚠️ API do NPrinting indisponível para os logs ({e})")
+    for nome, href in pendentes:
+        try:
+            _salvar_log_pela_tela(driver, nome, href, errorlogs_dir)
+        except Exception as e:
+            print(f"⚠️ Erro ao baixar log da tarefa '{nome}': {e}")
+
+def _coletar_nprinting_api(url_login, hoje, errorlogs_dir):
+    """Coleta pela API do NPrinting; None se a API falhar (volta ao navegador)."""
+    try:
+        cliente = NPrintingApiClient(api_base_url(url_login))
+        cliente.login(email, senha, usuario)
+        tarefas_por_status = cliente.tarefas_por_status(hoje, status_map_nprinting)
+        if cliente.falhas:
+            print(f"\n📥 Baixando {len(cliente.falhas)} log(s) de falha em paralelo...")
+            save_failure_logs(cliente, cliente.falhas, errorlogs_dir)
+        return tarefas_por_status
+    except (NPrintingApiError, requests.RequestException) as e:
+        print(f"⚠️ Falha na coleta pela API do NPrinting ({e}); usando o navegador")
+        return None
+
+def coletar_status_nprinting(formatos=None):
     resumos = {}
+    # formatos: saídas do relatório (pdf, texto, png); None = só PDF, vazio = nenhuma
+    pipeline = ReportPipeline(formatos=formatos)
     errorlogs_dir = Path(__file__).resolve().parent / "errorlogs"
     os.makedirs(errorlogs_dir, exist_ok=True)
     os.makedirs(TASKS_DIR, exist_ok=True)
@@ -410,114 +575,43 @@ def coletar_status_nprinting():
         nome_sufixo = nprinting["nome"]
         url_login = nprinting["url_login"]
         url_tasks = nprinting["url_tasks"]
-        print(f"\n🌐 Iniciando sessão em: {url_login}")
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--incognito")
-        options.add_experimental_option("prefs", {
-            "download.default_directory": str(errorlogs_dir.resolve()),
+        hoje = date.today()
+        tarefas_por_status = None
+        if NPRINTING_COLETA == "api":
+            print(f"\n🔌 Consultando a API do NPrinting: {api_base_url(url_login)}")
+            tarefas_por_status = _coletar_nprinting_api(url_login, hoje, errorlogs_dir)
+        if tarefas_por_status is None:
+            print(f"\n🌐 Iniciando sessão em: {url_login}")
+            tarefas_por_status = _raspar_nprinting(url_login, url_tasks, errorlogs_dir, hoje)
+        print(f"\n📋 Tarefas no QMC '{nome_sufixo}':")
+        for status, tarefas in sorted(tarefas_por_status.items()):
+            print(colorir(status, f"\n🔸 Status: {status} ({len(tarefas)} tarefa(s))"))
+            for tarefa in tarefas:
+                print(f" - {tarefa[0]} | Última Execução: {tarefa[4]}")
+        print("\n📊 Resumo:")
+        resumo_linhas = []
+        for status, tarefas in sorted(tarefas_por_status.items()):
+            linha = f" - {status}: {len(tarefas)}"
+            print(colorir(status, linha))
+            resumo_linhas.append(linha)
+        resumo_str = f"Resumo das tarefas QMC '{nome_sufixo}'\n" + "\n".join(resumo_linhas)
+        resumos[nome_sufixo] = resumo_str
+        registros = [tarefa for tarefas in tarefas_por_status.values() for tarefa in tarefas]
+        nome_arquivo = f"status_nprinting_{nome_sufixo}_{hoje.strftime('%Y-%m-%d')}.pdf"
+        pipeline.submit({
+            "template": "template_nprinting.html",
+            "nome_sufixo": nome_sufixo,
+            "tarefas": registros,
+            "caminho_pdf": os.path.join(TASKS_DIR, nome_arquivo),
         })
-        driver_path = _resolve_chromedriver_path()
-        if driver_path:
-            driver = webdriver.Chrome(service=Service(driver_path), options=options)
-        else:
-            # fallback: deixa o Selenium Manager resolver
-            driver = webdriver.Chrome(options=options)
-        try:
-            driver.get(url_login)
-            wait = WebDriverWait(driver, 10)
-            campo_email = wait.until(EC.presence_of_element_located((By.ID, "email")))
-            campo_email.send_keys(email)
-            campo_senha = wait.until(EC.presence_of_element_located((By.ID, "password")))
-            campo_senha.send_keys(senha)
-            campo_senha.send_keys(Keys.ENTER)
-            print("✅ Login enviado.")
-            time.sleep(5)
-            driver.get(url_tasks)
-            print("📄 Carregando tarefas...")
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.table tbody tr.ng-scope")))
-            time.sleep(1)
-            hoje = date.today()
-            tarefas_por_status = {}
-            linhas = driver.find_elements(By.CSS_SELECTOR, "table.table tbody tr.ng-scope")
-            for linha in linhas:
-                try:
-                    colunas = linha.find_elements(By.TAG_NAME, "td")
-                    if len(colunas) < 6:
-                        continue
-                    nome = colunas[0].text.strip()
-                    a_tag = colunas[0].find_element(By.TAG_NAME, "a")
-                    href = a_tag.get_attribute("href")
-                    tipo = colunas[1].text.strip()
-                    status_texto = colunas[2].text.strip()
-                    classe_status = colunas[2].find_element(By.TAG_NAME, "span").get_attribute("class")
-                    status = status_map_nprinting.get(classe_status.strip(), status_texto)
-                    progresso = colunas[3].text.strip()
-                    criado = colunas[4].text.strip()
-                    atualizado = colunas[5].text.strip()
-                    try:
-                        data_execucao = datetime.strptime(criado, "%d de %B de %Y às %H:%M").date()
-                    except Exception as e:
-                        print(f"⚠️ Erro ao converter data '{criado}': {e}")
-                        continue
-                    if data_execucao != hoje:
-                        continue  # ignora tarefas que não são de hoje
-                    tarefas_por_status.setdefault(status, []).append([
-                        nome, tipo, status, progresso, criado, atualizado
-                    ])
-                    if status == "Falha":
-                        print(f"\n⚠️ Tentando baixar log da tarefa '{nome}'...")
-                        driver.execute_script("window.open(arguments[0]);", href)
-                        driver.switch_to.window(driver.window_handles[-1])
-                        time.sleep(3)
-                        soup = BeautifulSoup(driver.page_source, "html.parser")
-                        log_linhas = soup.select("table#executionsLogTable tbody tr")
-                        if log_linhas:
-                            log_path = str(errorlogs_dir / f"{nome}_log.txt")
-                            with open(log_path, "w", encoding="utf-8") as f:
-                                for linha_log in log_linhas:
-                                    tds = linha_log.find_all("td")
-                                    if len(tds) == 3:
-                                        f.write(f"[{tds[0].text.strip()}] {tds[1].text.strip()} - {tds[2].text.strip()}\n")
-                            print(f"📁 Log salvo: {log_path}")
-                        driver.close()
-                        driver.switch_to.window(driver.window_handles[0])
-                except Exception as e:
-                    print(f"⚠️ Erro ao processar linha: {e}")
-            print(f"\n📋 Tarefas no QMC '{nome_sufixo}':")
-            for status, tarefas in sorted(tarefas_por_status.items()):
-                print(colorir(status, f"\n🔸 Status: {status} ({len(tarefas)} tarefa(s))"))
-                for tarefa in tarefas:
-                    print(f" - {tarefa[0]} | Última Execução: {tarefa[4]}")
-            print("\n📊 Resumo:")
-            resumo_linhas = []
-            for status, tarefas in sorted(tarefas_por_status.items()):
-                linha = f" - {status}: {len(tarefas)}"
-                print(colorir(status, linha))
-                resumo_linhas.append(linha)
-            resumo_str = f"Resumo das tarefas QMC '{nome_sufixo}'\n" + "\n".join(resumo_linhas)
-            resumos[nome_sufixo] = resumo_str
-            registros = [tarefa for tarefas in tarefas_por_status.values() for tarefa in tarefas]
-            nome_arquivo = f"status_nprinting_{nome_sufixo}_{hoje.strftime('%Y-%m-%d')}.pdf"
-            caminho_pdf = os.path.join(TASKS_DIR, nome_arquivo)
-            templates_dir = Path(__file__).resolve().parent / "teamplate"
-            env = Environment(loader=FileSystemLoader(str(templates_dir)))
-            template = env.get_template("template_nprinting.html")
-            html_renderizado = template.render(
-                nome_sufixo=nome_sufixo,
-                tarefas=registros
-            )
-            with open(caminho_pdf, "wb") as saida_pdf:
-                pisa.CreatePDF(html_renderizado, dest=saida_pdf)
-            print(f"\n✅ PDF gerado com xhtml2pdf: {caminho_pdf}")
-        finally:
-            driver.quit()
+    # Aguarda os PDFs que ainda estão sendo gerados no pool de processos
+    pipeline.close()
     return resumos
 
-def coletar_status():
+def coletar_status(formatos=None):
     resumos = {}
-    resumos.update(coletar_status_qmc())
-    resumos.update(coletar_status_nprinting())
+    resumos.update(coletar_status_qmc(formatos))
+    resumos.update(coletar_status_nprinting(formatos))
     return resumos
 
 if __name__ == "__main__":
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Renderização dos relatórios de status (QMC e NPrinting)
+Um único Environment do Jinja por processo, com os templates compilados
+guardados em disco (FileSystemBytecodeCache): template.html e
+template_nprinting.html são interpretados uma vez, e não a cada QMC/NPrinting
+
+O gerador de PDF é configurável (REPORT_PDF_BACKEND):
+- xhtml2pdf (padrão): converte o HTML do template
+- weasyprint: converte o HTML do template, mais rápido em tabelas longas
+- fpdf / reportlab: desenham a tabela direto dos registros, sem HTML
+
+Coleta e renderização são etapas separadas: cada alvo raspado entra na
+fila do ReportPipeline, cujos PDFs são gerados num pool de processos
+enquanto o navegador do alvo seguinte já trabalha
+
+Além do PDF, os mesmos registros podem sair como texto compacto (.md,
+enviado como mensagens paginadas) ou como uma tabela em PNG; o envio
+escolhe o formato por destino
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "teamplate"
+
+# Templates compilados (bytecode) reaproveitados entre execuções
+BYTECODE_CACHE_DIR = Path(os.getenv("REPORT_TEMPLATE_CACHE_DIR", "").strip() or
+                          Path(__file__).resolve().parent / "cache" / "jinja")
+
+# Gerador de PDF: xhtml2pdf, weasyprint, fpdf ou reportlab
+PDF_BACKEND = os.getenv("REPORT_PDF_BACKEND", "xhtml2pdf").strip().lower() or "xhtml2pdf"
+
+# Processos que geram os PDFs em paralelo à coleta (0 = no próprio processo, ao fechar o pipeline)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+
+# Colunas de cada template (título, largura relativa) e posição do status no registro
+LAYOUTS = {
+    "template.html": {
+        "colunas": [("Nome da Tarefa", 65), ("Status", 15), ("Última Execução", 20)],
+        "status": 1,
+        "data": 2,
+        "fonte": 9,
+    },
+    "template_nprinting.html": {
+        "colunas": [("Nome da Tarefa", 30), ("Tipo", 15), ("Status", 10), ("Progresso", 10),
+                    ("Criado", 17.5), ("Última Atualização", 17.5)],
+        "status": 2,
+        "data": 4,
+        "fonte": 8,
+    },
+}
+
+# Cores das linhas por status (as mesmas classes CSS dos templates)
+CORES_STATUS = {
+    "Success": (212, 237, 218),
+    "Concluída": (212, 237, 218),
+    "Failed": (248, 215, 218),
+    "Error": (248, 215, 218),
+    "Falha": (248, 215, 218),
+    "Em rota de atualização": (209, 236, 241),
+    "Aviso": (255, 243, 205),
+    "Outros": (255, 243, 205),
+}
+COR_CABECALHO = (240, 240, 240)
+COR_BORDA = (204, 204, 204)
+
+# Formatos de saída: pdf, texto (mensagem paginada para o WhatsApp) e png (tabela em imagem)
+FORMATOS_SAIDA = ("pdf", "texto", "png")
+EXTENSOES = {"pdf": ".pdf", "texto": ".md", "png": ".png"}
+
+# Limite de caracteres por mensagem de texto e de linhas na imagem
+TEXTO_LIMITE_PAGINA = int(os.getenv("REPORT_TEXT_PAGE_CHARS", "3500"))
+PNG_MAX_LINHAS = int(os.getenv("REPORT_PNG_MAX_ROWS", "80"))
+
+# Status de sucesso (no texto compacto aparecem só na contagem)
+STATUS_OK = {"Success", "Concluída"}
+STATUS_FALHA = {"Failed", "Error", "Falha"}
+EMOJI_STATUS = {
+    "Success": "✅", "Concluída": "✅",
+    "Failed": "❌", "Error": "❌", "Falha": "❌",
+    "Aviso": "⚠️", "Em rota de atualização": "🔄", "Em execução": "🔄", "Em fila": "⏳",
+}
+
+_environment: Optional[Environment] = None
+
+
+def get_environment() -> Environment:
+    """Environment compartilhado (criado na primeira chamada)"""
+    global _environment
+    if _environment is None:
+        bytecode_cache = None
+        try:
+            BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR))
+        except OSError as e:
+            print(f"⚠️ Cache de templates indisponível em {BYTECODE_CACHE_DIR}: {e}")
+        # auto_reload=False: o template carregado não é reconferido no disco a cada get_template
+        _environment = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)),
+                                   bytecode_cache=bytecode_cache, auto_reload=False)
+    return _environment
+
+
+def render_html(template_name: str, nome_sufixo: str, tarefas: List[list]) -> str:
+    """Renderiza o HTML de um alvo com o template (já compilado) informado"""
+    return get_environment().get_template(template_name).render(nome_sufixo=nome_sufixo, tarefas=tarefas)
+
+
+def render_all(relatorios: List[Dict]) -> List[Dict]:
+    """
+    Renderiza o HTML de todos os alvos antes da geração dos PDFs.
+
+    Args:
+        relatorios (list): Dicts com 'template', 'nome_sufixo', 'tarefas' e 'caminho_pdf'
+
+    Returns:
+        list: Os mesmos dicts com a chave 'html' preenchida
+    """
+    for relatorio in relatorios:
+        relatorio['html'] = render_html(relatorio['template'], relatorio['nome_sufixo'], relatorio['tarefas'])
+    return relatorios
+
+
+# ======================
+# Geradores de PDF
+# ======================
+
+def _titulo(relatorio: Dict) -> str:
+    return f"Status das Tarefas - {relatorio['nome_sufixo'].capitalize()}"
+
+
+def _pdf_xhtml2pdf(relatorio: Dict) -> bool:
+    from xhtml2pdf import pisa
+    with open(relatorio['caminho_pdf'], "wb") as saida_pdf:
+        resultado = pisa.CreatePDF(relatorio['html'], dest=saida_pdf)
+    return not resultado.err
+
+
+def _pdf_weasyprint(relatorio: Dict) -> bool:
+    from weasyprint import HTML
+    HTML(string=relatorio['html'], base_url=str(TEMPLATES_DIR)).write_pdf(relatorio['caminho_pdf'])
+    return True
+
+
+def _pdf_fpdf(relatorio: Dict) -> bool:
+    from fpdf import FPDF
+
+    layout = LAYOUTS[relatorio['template']]
+
+    def latin1(texto) -> str:
+        # fpdf 1.7 escreve só Latin-1 (acentos ok; emojis viram "?")
+        return str(texto).encode("latin-1", "replace").decode("latin-1")
+
+    pdf = FPDF(orientation="L", unit="mm", format="A4")
+    pdf.set_margins(20, 20, 20)
+    pdf.set_auto_page_break(False)
+    pdf.add_page()
+    pdf.set_draw_color(*COR_BORDA)
+
+    util = pdf.w - pdf.l_margin - pdf.r_margin
+    total = sum(largura for _, largura in layout['colunas'])
+    larguras = [util * largura / total for _, largura in layout['colunas']]
+    altura = layout['fonte'] * 0.55
+
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 12, latin1(_titulo(relatorio)), 0, 1, "C")
+
+    def cabecalho():
+        pdf.set_font("Arial", "B", layout['fonte'])
+        pdf.set_fill_color(*COR_CABECALHO)
+        for (titulo, _), largura in zip(layout['colunas'], larguras):
+            pdf.cell(largura, altura, latin1(titulo), 1, 0, "L", True)
+        pdf.ln()
+        pdf.set_font("Arial", "", layout['fonte'])
+
+    def ajustar(texto: str, largura: float) -> str:
+        # Equivalente ao overflow: hidden dos templates
+        if pdf.get_string_width(texto) <= largura - 2:
+            return texto
+        while texto and pdf.get_string_width(texto + "...") > largura - 2:
+            texto = texto[:-1]
+        return texto + "..."
+
+    cabecalho()
+    for tarefa in relatorio['tarefas']:
+        if pdf.get_y() + altura > pdf.h - pdf.b_margin:
+            pdf.add_page()
+            cabecalho()
+        pdf.set_fill_color(*CORES_STATUS.get(tarefa[layout['status']], (255, 255, 255)))
+        for valor, largura in zip(tarefa, larguras):
+            pdf.cell(largura, altura, ajustar(latin1(valor), largura), 1, 0, "L", True)
+        pdf.ln()
+    pdf.output(relatorio['caminho_pdf'], "F")
+    return True
+
+
+def _pdf_reportlab(relatorio: Dict) -> bool:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    layout = LAYOUTS[relatorio['template']]
+
+    def cor(rgb) -> "colors.Color":
+        return colors.Color(*(c / 255 for c in rgb))
+
+    doc = SimpleDocTemplate(relatorio['caminho_pdf'], pagesize=landscape(A4), leftMargin=2 * cm,
+                            rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+                            title=_titulo(relatorio))
+    total = sum(largura for _, largura in layout['colunas'])
+    larguras = [doc.width * largura / total for _, largura in layout['colunas']]
+
+    dados = [[titulo for titulo, _ in layout['colunas']]] + [[str(v) for v in t] for t in relatorio['tarefas']]
+    estilo = [
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), layout['fonte']),
+        ("GRID", (0, 0), (-1, -1), 0.5, cor(COR_BORDA)),
+        ("BACKGROUND", (0, 0), (-1, 0), cor(COR_CABECALHO)),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+    for i, tarefa in enumerate(relatorio['tarefas'], start=1):
+        rgb = CORES_STATUS.get(tarefa[layout['status']])
+        if rgb:
+            estilo.append(("BACKGROUND", (0, i), (-1, i), cor(rgb)))
+
+    titulo = Paragraph(_titulo(relatorio), getSampleStyleSheet()["Title"])
+    tabela = Table(dados, colWidths=larguras, repeatRows=1)
+    tabela.setStyle(TableStyle(estilo))
+    doc.build([titulo, tabela])
+    return True
+
+
+PDF_BACKENDS: Dict[str, Callable[[Dict], bool]] = {
+    "xhtml2pdf": _pdf_xhtml2pdf,
+    "weasyprint": _pdf_weasyprint,
+    "fpdf": _pdf_fpdf,
+    "reportlab": _pdf_reportlab,
+}
+
+# Geradores que convertem o HTML do template (os demais usam só os registros)
+HTML_BACKENDS = {"xhtml2pdf", "weasyprint"}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = (backend or PDF_BACKEND).lower()
+    if backend not in PDF_BACKENDS:
+        print(f"⚠️ Gerador de PDF desconhecido '{backend}'; usando xhtml2pdf")
+        return "xhtml2pdf"
+    return backend
+
+
+def write_pdf(relatorio: Dict, backend: Optional[str] = None) -> bool:
+    """Grava o PDF de um alvo com o gerador escolhido; True se não houve erro"""
+    backend = resolve_backend(backend)
+    if backend in HTML_BACKENDS and 'html' not in relatorio:
+        relatorio['html'] = render_html(relatorio['template'], relatorio['nome_sufixo'], relatorio['tarefas'])
+    try:
+        return PDF_BACKENDS[backend](relatorio)
+    except ImportError as e:
+        print(f"⚠️ Gerador de PDF '{backend}' indisponível ({e}); usando xhtml2pdf")
+        return write_pdf(relatorio, "xhtml2pdf") if backend != "xhtml2pdf" else False
+
+
+# ======================
+# Saídas compactas (WhatsApp)
+# ======================
+
+def _contagem(relatorio: Dict) -> List[Tuple[str, int]]:
+    layout = LAYOUTS[relatorio['template']]
+    contagem: Dict[str, int] = {}
+    for tarefa in relatorio['tarefas']:
+        contagem[tarefa[layout['status']]] = contagem.get(tarefa[layout['status']], 0) + 1
+    return sorted(contagem.items())
+
+
+def render_text(relatorio: Dict) -> str:
+    """
+    Mensagem compacta (formatação do WhatsApp) com os mesmos registros do PDF:
+    contagem por status e, para os status que não são de sucesso, as tarefas
+    com a data da execução.
+    """
+    layout = LAYOUTS[relatorio['template']]
+    linhas = [f"*{_titulo(relatorio)}*", f"_{len(relatorio['tarefas'])} tarefa(s)_", ""]
+    for status, quantidade in _contagem(relatorio):
+        linhas.append(f"{EMOJI_STATUS.get(status, '🔸')} {status}: {quantidade}")
+    # Falhas primeiro, depois os demais status que pedem atenção
+    for status, _ in sorted(_contagem(relatorio), key=lambda item: (item[0] not in STATUS_FALHA, item[0])):
+        if status in STATUS_OK:
+            continue
+        linhas.extend(["", f"*{status}*"])
+        for tarefa in relatorio['tarefas']:
+            if tarefa[layout['status']] == status:
+                linhas.append(f"• {tarefa[0]} — {tarefa[layout['data']]}")
+    return "\n".join(linhas)
+
+
+def paginate_text(texto: str, limite: int = TEXTO_LIMITE_PAGINA) -> List[str]:
+    """Divide o texto em mensagens de até `limite` caracteres (em quebras de linha), numeradas (1/N)"""
+    paginas, atual = [], ""
+    for linha in texto.split("\n"):
+        linha = linha if len(linha) <= limite else linha[:limite - 1] + "…"
+        if atual and len(atual) + 1 + len(linha) > limite:
+            paginas.append(atual)
+            atual = linha
+        else:
+            atual = f"{atual}\n{linha}" if atual else linha
+    if atual:
+        paginas.append(atual)
+    if len(paginas) > 1:
+        paginas = [f"{pagina}\n\n_({i}/{len(paginas)})_" for i, pagina in enumerate(paginas, 1)]
+    return paginas
+
+
+def write_text(relatorio: Dict, caminho: str) -> bool:
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(render_text(relatorio))
+    return True
+
+
+def _fonte_png(tamanho: int, negrito: bool = False):
+    from PIL import ImageFont
+    nomes = ("DejaVuSans-Bold.ttf", "arialbd.ttf") if negrito else ("DejaVuSans.ttf", "arial.ttf")
+    for nome in nomes:
+        try:
+            return ImageFont.truetype(nome, tamanho)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def write_png(relatorio: Dict, caminho: str) -> bool:
+    """
+    Tabela em uma única imagem PNG (Pillow). Acima de PNG_MAX_LINHAS tarefas, as
+    que não são de sucesso vêm primeiro e as demais são resumidas no rodapé.
+    """
+    from PIL import Image, ImageDraw
+
+    layout = LAYOUTS[relatorio['template']]
+    tarefas = relatorio['tarefas']
+    omitidas = 0
+    if len(tarefas) > PNG_MAX_LINHAS:
+        tarefas = sorted(tarefas, key=lambda t: t[layout['status']] in STATUS_OK)[:PNG_MAX_LINHAS]
+        omitidas = len(relatorio['tarefas']) - len(tarefas)
+
+    largura_total, altura_linha, margem = 1400, 26, 20
+    fonte, fonte_negrito, fonte_titulo = _fonte_png(14), _fonte_png(14, True), _fonte_png(22, True)
+    total = sum(largura for _, largura in layout['colunas'])
+    larguras = [(largura_total - 2 * margem) * largura / total for _, largura in layout['colunas']]
+    altura = margem * 2 + 40 + altura_linha * (len(tarefas) + 1) + (altura_linha if omitidas else 0)
+
+    imagem = Image.new("RGB", (largura_total, int(altura)), "white")
+    desenho = ImageDraw.Draw(imagem)
+    desenho.text((largura_total / 2, margem), _titulo(relatorio), fill=(51, 51, 51), font=fonte_titulo, anchor="mt")
+
+    def ajustar(texto: str, largura: float, f) -> str:
+        if f.getlength(texto) <= largura - 8:
+            return texto
+        while texto and f.getlength(texto + "…") > largura - 8:
+            texto = texto[:-1]
+        return texto + "…"
+
+    def linha(y: float, valores, cor, f) -> None:
+        x = margem
+        for valor, largura in zip(valores, larguras):
+            desenho.rectangle([x, y, x + largura, y + altura_linha], fill=cor, outline=COR_BORDA)
+            desenho.text((x + 4, y + altura_linha / 2), ajustar(str(valor), largura, f), fill=(51, 51, 51), font=f, anchor="lm")
+            x += largura
+
+    y = margem + 40
+    linha(y, [titulo for titulo, _ in layout['colunas']], COR_CABECALHO, fonte_negrito)
+    for tarefa in tarefas:
+        y += altura_linha
+        linha(y, tarefa, CORES_STATUS.get(tarefa[layout['status']], (255, 255, 255)), fonte)
+    if omitidas:
+        desenho.text((margem, y + altura_linha + altura_linha / 2), f"+ {omitidas} tarefa(s) com sucesso não listada(s)",
+                     fill=(102, 102, 102), font=fonte, anchor="lm")
+    imagem.save(caminho, "PNG", optimize=True)
+    return True
+
+
+# ======================
+# Pipeline coleta → renderização
+# ======================
+
+def output_path(relatorio: Dict, formato: str) -> str:
+    """Arquivo de um formato de saída (mesmo nome do PDF, outra extensão)"""
+    return os.path.splitext(relatorio['caminho_pdf'])[0] + EXTENSOES[formato]
+
+
+def write_outputs(relatorio: Dict, formatos: Iterable[str], backend: Optional[str] = None) -> List[Tuple[str, str, bool, Optional[str]]]:
+    """
+    Grava os formatos de saída pedidos para um alvo.
+
+    Returns:
+        list: (formato, caminho, sucesso, erro) por formato
+    """
+    resultados = []
+    for formato in formatos:
+        caminho = output_path(relatorio, formato)
+        erro = None
+        try:
+            if formato == "pdf":
+                ok = write_pdf(relatorio, backend)
+            elif formato == "texto":
+                ok = write_text(relatorio, caminho)
+            else:
+                ok = write_png(relatorio, caminho)
+        except Exception as e:
+            ok, erro = False, str(e)
+        resultados.append((formato, caminho, ok, erro))
+    return resultados
+
+
+class ReportPipeline:
+    """
+    Fila de renderização dos relatórios de status.
+
+    submit() recebe os registros de um alvo assim que a coleta termina (com o
+    navegador já encerrado) e agenda os formatos pedidos (pdf, texto, png) num
+    pool de processos; close() aguarda todos e retorna os caminhos gerados.
+    O HTML dos geradores baseados em HTML é renderizado aqui, com o Environment
+    já compilado deste processo, e só a conversão em PDF vai para o pool.
+    Sem formatos (destinos que só recebem o resumo), nada é renderizado.
+    """
+
+    def __init__(self, backend: Optional[str] = None, workers: int = REPORT_WORKERS,
+                 formatos: Optional[Iterable[str]] = None):
+        self.backend = resolve_backend(backend)
+        self.workers = max(0, workers)
+        self.formatos = [f for f in FORMATOS_SAIDA if f in set(formatos if formatos is not None else ("pdf",))]
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pendentes: List[Future] = []
+        self._em_fila: List[Dict] = []
+
+    def submit(self, relatorio: Dict) -> None:
+        if not self.formatos:
+            return
+        if self.workers == 0:
+            self._em_fila.append(relatorio)
+            return
+        if "pdf" in self.formatos and self.backend in HTML_BACKENDS:
+            render_all([relatorio])
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        print(f"🖨️ Relatório na fila de renderização: {os.path.basename(relatorio['caminho_pdf'])} "
+              f"({', '.join(self.formatos)})")
+        self._pendentes.append(self._pool.submit(write_outputs, relatorio, self.formatos, self.backend))
+
+    def _relatar(self, resultados: List[Tuple[str, str, bool, Optional[str]]], gerados: List[str]) -> None:
+        for formato, caminho, ok, erro in resultados:
+            if ok:
+                origem = f"PDF gerado com {self.backend}" if formato == "pdf" else f"Relatório ({formato}) gerado"
+                print(f"\n✅ {origem}: {caminho}")
+                gerados.append(caminho)
+            else:
+                print(f"\n⚠️ Falha ao gerar {formato}: {caminho}" + (f" ({erro})" if erro else ""))
+
+    def close(self) -> List[str]:
+        gerados: List[str] = []
+        if self._em_fila:
+            if "pdf" in self.formatos and self.backend in HTML_BACKENDS:
+                render_all(self._em_fila)
+            for relatorio in self._em_fila:
+                self._relatar(write_outputs(relatorio, self.formatos, self.backend), gerados)
+            self._em_fila = []
+            return gerados
+        try:
+            for futuro in self._pendentes:
+                try:
+                    resultados = futuro.result()
+                except Exception as e:
+                    # Ex.: processo do pool encerrado de forma inesperada
+                    print(f"\n⚠️ Falha no processo de renderização: {e}")
+                    continue
+                self._relatar(resultados, gerados)
+        finally:
+            self._pendentes = []
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+        return gerados
+
+    def __enter__(self) -> "ReportPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
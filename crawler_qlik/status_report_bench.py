@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark dos geradores de PDF dos relatórios de status
+Renderiza um conjunto fictício de tarefas (1.000 por padrão) com cada
+gerador de status_report e compara tempo, páginas/tamanho do arquivo e
+memória: pico do heap Python (tracemalloc) e aumento do RSS do processo.
+Cada gerador roda num processo próprio para que um não afete a memória do outro
+
+Uso:
+    python -m crawler_qlik.status_report_bench --tarefas 1000
+    python -m crawler_qlik.status_report_bench --template template_nprinting.html --backends fpdf reportlab
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List
+
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.status_report import LAYOUTS, PDF_BACKENDS, HTML_BACKENDS, render_html
+
+STATUS_QMC = ["Success"] * 8 + ["Failed", "Em rota de atualização", "Started", "Outros"]
+STATUS_NPRINTING = ["Concluída"] * 8 + ["Falha", "Aviso", "Em fila", "Em execução"]
+
+
+def fixture(template: str, quantidade: int, semente: int = 42) -> List[list]:
+    """Tarefas fictícias no formato dos coletores (mesmas colunas do template)"""
+    rnd = random.Random(semente)
+    tarefas = []
+    for i in range(quantidade):
+        nome = f"Reload {rnd.choice(['Painel', 'Extrator', 'Transformação', 'Carga'])} {i:04d} - " \
+               f"{rnd.choice(['Segurança Pública', 'Ocorrências', 'Homicídios', 'Efetivo'])}"
+        horario = f"2025-03-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}"
+        if template == "template.html":
+            tarefas.append([nome, rnd.choice(STATUS_QMC), horario])
+        else:
+            tarefas.append([nome, "Publicação", rnd.choice(STATUS_NPRINTING), f"{rnd.randint(0, 100)}%",
+                            f"{rnd.randint(1, 28)} de março de 2025 às 08:{rnd.randint(0, 59):02d}",
+                            f"{rnd.randint(1, 28)} de março de 2025 às 09:{rnd.randint(0, 59):02d}"])
+    return tarefas
+
+
+def _rss_mb() -> float:
+    try:
+        import resource
+        # ru_maxrss: KB no Linux, bytes no macOS
+        fator = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / fator
+    except ImportError:
+        return 0.0
+
+
+def _medir(backend: str, template: str, quantidade: int, saida: str, fila) -> None:
+    relatorio = {"template": template, "nome_sufixo": "benchmark",
+                 "tarefas": fixture(template, quantidade), "caminho_pdf": saida}
+    rss_inicial = _rss_mb()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        if backend in HTML_BACKENDS:
+            relatorio['html'] = render_html(template, relatorio['nome_sufixo'], relatorio['tarefas'])
+        PDF_BACKENDS[backend](relatorio)
+        erro = None
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    fila.put({
+        "backend": backend,
+        "segundos": segundos,
+        "pico_python_mb": pico / (1024 * 1024),
+        "rss_mb": max(_rss_mb() - rss_inicial, 0.0),
+        "tamanho_kb": os.path.getsize(saida) / 1024 if erro is None and os.path.exists(saida) else 0.0,
+        "erro": erro,
+    })
+
+
+def run(backends: List[str], template: str, quantidade: int) -> List[Dict]:
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as pasta:
+        for backend in backends:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir, args=(backend, template, quantidade,
+                                                               os.path.join(pasta, f"{backend}.pdf"), fila))
+            processo.start()
+            processo.join()
+            resultados.append(fila.get() if not fila.empty() else
+                              {"backend": backend, "erro": f"processo terminou com código {processo.exitcode}"})
+    return resultados
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Compara os geradores de PDF dos relatórios de status.")
+    p.add_argument("--tarefas", type=int, default=1000, help="Quantidade de tarefas no relatório fictício (padrão: 1000).")
+    p.add_argument("--template", choices=sorted(LAYOUTS), default="template.html", help="Layout do relatório.")
+    p.add_argument("--backends", nargs="+", choices=sorted(PDF_BACKENDS), default=list(PDF_BACKENDS),
+                   help="Geradores a comparar (padrão: todos).")
+    args = p.parse_args()
+
+    print(f"📊 {args.tarefas} tarefas, {args.template}\n")
+    print(f"{'Gerador':<12} {'Tempo (s)':>10} {'Pico Python (MB)':>17} {'RSS (MB)':>9} {'PDF (KB)':>9}")
+    for r in run(args.backends, args.template, args.tarefas):
+        if r.get("erro"):
+            print(f"{r['backend']:<12} ❌ {r['erro']}")
+            continue
+        print(f"{r['backend']:<12} {r['segundos']:>10.2f} {r['pico_python_mb']:>17.1f} {r['rss_mb']:>9.1f} {r['tamanho_kb']:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
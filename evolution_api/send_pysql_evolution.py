@@ -27,6 +27,9 @@ sys.path.insert(0, project_root)
 try:
     from evolutionapi.client import EvolutionClient
     from evolutionapi.models.message import TextMessage, MediaMessage
+    from pysql.historico_tempos import (
+        ARQUIVO_HISTORICO, carregar_series, estatisticas_consultas, listar_scripts, tendencia_total
+    )
 except ImportError as e:
     print(f"❌ Erro ao importar módulos: {e}")
     print("💡 Certifique-se de que todas as dependências estão instaladas:")
@@ -246,7 +249,7 @@ def executar_scripts_pysql():
 
 def analisar_tempos_execucao():
     """
-    Analisa os arquivos JSON de tempos de execução e gera resumos.
+    Analisa o histórico de tempos de execução (SQLite) e gera resumos.
     
     Returns:
         dict: Dicionário com resumos de tempos organizados por script
@@ -255,50 +258,45 @@ def analisar_tempos_execucao():
     
     resumos = {}
     
-    if not os.path.exists(reports_pysql_dir):
-        print(f"⚠️ Pasta de relatórios não encontrada: {reports_pysql_dir}")
+    if not os.path.exists(ARQUIVO_HISTORICO):
+        print(f"📂 Nenhum histórico de tempos de execução encontrado: {ARQUIVO_HISTORICO}")
         return resumos
     
-    # Busca arquivos JSON de tempos de execução
-    arquivos_json = [
-        f for f in os.listdir(reports_pysql_dir) 
-        if f.endswith('_tempos_execucao.json')
-    ]
-    
-    if not arquivos_json:
-        print(f"📂 Nenhum arquivo de tempos de execução encontrado")
+    try:
+        scripts = listar_scripts()
+    except Exception as e:
+        print(f"❌ Erro ao abrir histórico de tempos: {e}")
         return resumos
     
-    print(f"📄 Encontrados {len(arquivos_json)} arquivos de tempos de execução")
+    print(f"📄 Encontrados {len(scripts)} scripts no histórico de tempos")
     
-    # Analisa cada arquivo JSON
-    for arquivo_json in arquivos_json:
+    # Analisa cada script registrado no histórico
+    for nome_script in scripts:
         try:
-            caminho_completo = os.path.join(reports_pysql_dir, arquivo_json)
-            
-            with open(caminho_completo, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-            
-            # Extrai o nome do script do nome do arquivo
-            nome_script = arquivo_json.replace('_tempos_execucao.json', '')
+            # Mantém o formato {timestamp: {consulta: tempo}} da última execução
+            dados = dict(carregar_series(nome_script, limite=1))
+            estatisticas = estatisticas_consultas(nome_script)
+            tendencia = tendencia_total(nome_script)
             
             # Gera resumo dos tempos
-            resumo = gerar_resumo_tempos(dados, nome_script)
+            resumo = gerar_resumo_tempos(dados, nome_script, estatisticas, tendencia)
             resumos[nome_script] = resumo
             
         except Exception as e:
-            print(f"❌ Erro ao analisar {arquivo_json}: {e}")
-            resumos[arquivo_json.replace('_tempos_execucao.json', '')] = f"Erro na análise: {str(e)}"
+            print(f"❌ Erro ao analisar {nome_script}: {e}")
+            resumos[nome_script] = f"Erro na análise: {str(e)}"
     
     return resumos
 
-def gerar_resumo_tempos(dados, nome_script):
+def gerar_resumo_tempos(dados, nome_script, estatisticas=None, tendencia=None):
     """
     Gera um resumo formatado dos tempos de execução.
     
     Args:
-        dados (dict): Dados JSON dos tempos de execução
+        dados (dict): Tempos da última execução no formato {timestamp: {consulta: tempo}}
         nome_script (str): Nome do script analisado
+        estatisticas (dict): Estatísticas históricas por consulta (p50, p95, ewma, regressao)
+        tendencia (tuple): Tempo total médio (recente, anterior) das últimas execuções
         
     Returns:
         str: Resumo formatado dos tempos
@@ -313,6 +311,7 @@ def gerar_resumo_tempos(dados, nome_script):
             return f"Nenhum timestamp disponível para {nome_script}"
         
         execucao_recente = dados[timestamps[0]]
+        estatisticas = estatisticas or {}
         
         # Calcula estatísticas
         tempos = list(execucao_recente.values())
@@ -329,10 +328,29 @@ def gerar_resumo_tempos(dados, nome_script):
         resumo += f"Tempo máximo: {tempo_max:.2f}s\n"
         resumo += f"Tempo mínimo: {tempo_min:.2f}s\n"
         
+        # Tendência do tempo total (últimas execuções vs. período anterior)
+        if tendencia:
+            media_recente, media_anterior = tendencia
+            variacao = ((media_recente - media_anterior) / media_anterior * 100) if media_anterior else 0
+            seta = "📈" if variacao > 0 else "📉"
+            resumo += f"Tendência do total: {seta} {variacao:+.1f}% ({media_anterior:.2f}s → {media_recente:.2f}s)\n"
+        
+        # Consultas acima do p95 histórico
+        regressoes = [consulta for consulta, dados_consulta in estatisticas.items() if dados_consulta.get('regressao')]
+        if regressoes:
+            resumo += "\n⚠️ **Regressões (acima do p95):**\n"
+            for consulta in regressoes:
+                dados_consulta = estatisticas[consulta]
+                resumo += f"• {consulta}: {dados_consulta['ultimo']:.2f}s (p95: {dados_consulta['p95_anterior']:.2f}s)\n"
+        
         # Detalhes por consulta
         resumo += "\n**Tempos por consulta:**\n"
         for consulta, tempo in execucao_recente.items():
-            resumo += f"• {consulta}: {tempo:.2f}s\n"
+            dados_consulta = estatisticas.get(consulta)
+            if dados_consulta:
+                resumo += f"• {consulta}: {tempo:.2f}s (p50 {dados_consulta['p50']:.2f}s · p95 {dados_consulta['p95']:.2f}s)\n"
+            else:
+                resumo += f"• {consulta}: {tempo:.2f}s\n"
         
         return resumo
         
@@ -722,7 +740,7 @@ def enviar_logs_erro():
 # =============================================================================
 
 def limpar_pastas_apos_envio():
-    """Limpa as pastas após o envio bem-sucedido dos arquivos, preservando arquivos JSON."""
+    """Limpa as pastas após o envio bem-sucedido dos arquivos, preservando o histórico (JSON/SQLite)."""
     print("🧹 Limpando pastas após envio...")
     
     for pasta in pastas_envio:
@@ -746,8 +764,8 @@ def limpar_pastas_apos_envio():
         for arquivo in arquivos:
             nome_arquivo = os.path.basename(arquivo)
             
-            # Preserva arquivos JSON para manter série histórica
-            if nome_arquivo.endswith('.json'):
+            # Preserva arquivos JSON e o banco SQLite para manter série histórica
+            if nome_arquivo.endswith(('.json', '.sqlite3')):
                 print(f"💾 Preservando arquivo histórico: {nome_arquivo}")
                 continue
             
@@ -1,13 +1,17 @@
 """
 Script para envio de relatórios e status Qlik via Evolution API
-Executa scripts de status Qlik, coleta resumos e envia relatórios PDF e logs de erro
+Executa scripts de status Qlik, coleta resumos e envia relatórios (PDF, texto
+compacto ou imagem PNG, conforme o destino) e logs de erro
 """
 
 import os
 import sys
+import json
 import shutil
+import threading
+import contextlib
 import subprocess
-import json
+from collections import deque
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -29,7 +33,8 @@ try:
     from evolutionapi.client import EvolutionClient
     from evolutionapi.models.message import TextMessage, MediaMessage
     from crawler_qlik.status_qlik_task import (coletar_status_nprinting, coletar_status_qmc)
-    from crawler_qlik.network_config import setup_network_credentials, get_accessible_paths
+    from crawler_qlik.status_report import EXTENSOES, paginate_text
+    from crawler_qlik.network_config import setup_network_credentials, is_path_accessible
 except ImportError as e:
     print(f"❌ Erro ao importar módulos: {e}")
     print("💡 Certifique-se de que todas as dependências estão instaladas:")
@@ -37,6 +42,19 @@ except ImportError as e:
     print("   E que o módulo crawler_qlik está acessível")
     sys.exit(1)
 
+# Verificações de ETL e Desktop no próprio processo (sem subprocess); se a
+# importação falhar, os scripts são executados em modo --ndjson
+try:
+    from crawler_qlik.status_qlik_etl import check_etl
+except ImportError as e:
+    print(f"⚠️ API de status das ETLs indisponível ({e}); usando o script em modo --ndjson")
+    check_etl = None
+try:
+    from crawler_qlik.status_qlik_desktop import sync_desktop
+except ImportError as e:
+    print(f"⚠️ API do Qlik Sense Desktop indisponível ({e}); usando o script em modo --ndjson")
+    sync_desktop = None
+
 # =============================================================================
 # CONFIGURAÇÃO E VARIÁVEIS DE AMBIENTE
 # =============================================================================
@@ -77,6 +95,32 @@ if evo_destino_raw:
 evo_grupo = evo_grupos[0] if evo_grupos else ""
 evo_destino = evo_destinos[0] if evo_destinos else ""
 
+# Formato dos relatórios de status por destino:
+#   pdf    - arquivos PDF (padrão)
+#   texto  - mensagem compacta paginada (mesmos registros do PDF)
+#   png    - tabela em uma imagem
+#   resumo - só o resumo de contagens (nenhum relatório é gerado para ele)
+FORMATOS_DESTINO = ("pdf", "texto", "png", "resumo")
+evo_formato_padrao = os.getenv("EVO_FORMATO_PADRAO", "pdf").strip().lower() or "pdf"
+if evo_formato_padrao not in FORMATOS_DESTINO:
+    print(f"⚠️ EVO_FORMATO_PADRAO inválido: {evo_formato_padrao} (usando pdf)")
+    evo_formato_padrao = "pdf"
+
+# Exceções por destino: "destino=formato" (separados por quebra de linha ou vírgula)
+evo_formatos_destino = {}
+for linha in os.getenv("EVO_FORMATO_DESTINOS", "").replace('\n', ',').split(','):
+    linha = linha.strip().split('#')[0].strip()  # Remove comentários
+    if '=' not in linha:
+        continue
+    destino, formato = (parte.strip() for parte in linha.split('=', 1))
+    if formato.lower() in FORMATOS_DESTINO:
+        evo_formatos_destino[destino] = formato.lower()
+    else:
+        print(f"⚠️ Formato inválido para {destino}: {formato} (usando {evo_formato_padrao})")
+
+# Tempo máximo (segundos) de cada verificação de status (Desktop no processo ou script --ndjson)
+evo_timeout_status = int(os.getenv("EVO_TIMEOUT_STATUS", "300"))
+
 # =============================================================================
 # CONFIGURAÇÃO DOS DIRETÓRIOS
 # =============================================================================
@@ -157,6 +201,27 @@ client = EvolutionClient(
 # FUNÇÕES DE NORMALIZAÇÃO E UTILITÁRIOS
 # =============================================================================
 
+def formato_destino(destino):
+    """
+    Formato dos relatórios de status para um destino.
+    
+    Args:
+        destino (str): Número ou ID do grupo
+        
+    Returns:
+        str: 'pdf', 'texto', 'png' ou 'resumo'
+    """
+    return evo_formatos_destino.get(destino, evo_formato_padrao)
+
+def formatos_relatorio():
+    """
+    Formatos de relatório que algum destino recebe (destinos só com resumo não pedem nenhum).
+    
+    Returns:
+        set: Subconjunto de {'pdf', 'texto', 'png'}
+    """
+    return {formato_destino(d) for d in evo_destinos + evo_grupos} - {"resumo"}
+
 def to_whatsapp_jid(raw_number: str) -> str:
     """
     Normaliza número de telefone para formato JID do WhatsApp (E.164).
@@ -251,55 +316,218 @@ def warmup_group_session(group_jid, warmup_text="⏳ Preparando envio de relató
 # COLETA DE DADOS DE STATUS
 # =============================================================================
 
-def executar_script_status(script_path, descricao):
+def executar_script_status(script_path, descricao, timeout=None):
     """
-    Executa um script de status e captura sua saída.
+    Executa um script de status em modo --ndjson e lê os registros à medida que são emitidos.
+    Usado apenas quando a API do script não pode ser importada.
     
     Args:
         script_path (str): Caminho para o script a ser executado
         descricao (str): Descrição do script para logs
+        timeout (int): Tempo máximo de execução em segundos (padrão: EVO_TIMEOUT_STATUS)
         
     Returns:
-        str: Saída do script ou mensagem de erro
+        dict | str: Registro final ('result') do script ou mensagem de erro
     """
+    timeout = timeout or evo_timeout_status
     try:
-        print(f"🔄 Executando {descricao}...")
+        print(f"🔄 Executando {descricao} (--ndjson)...")
         
         # Configura ambiente com codificação UTF-8
         env = os.environ.copy()
         env['PYTHONIOENCODING'] = 'utf-8'
         env['PYTHONUTF8'] = '1'
         
-        # Executa o script e captura a saída
-        resultado = subprocess.run(
-            [sys.executable, script_path],
-            capture_output=True,
+        processo = subprocess.Popen(
+            [sys.executable, script_path, "--ndjson"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
             encoding='utf-8',
-            errors='replace',  # Substitui caracteres problemáticos
+            errors='replace',
             cwd=project_root,
-            env=env,
-            timeout=300  # 5 minutos de timeout
+            env=env
+        )
+        # Guarda só o final do stderr (para o resumo de erro), lido em paralelo ao stdout
+        stderr_final = deque(maxlen=5)
+        leitor_stderr = threading.Thread(
+            target=lambda: stderr_final.extend(l.rstrip() for l in processo.stderr if l.strip()), daemon=True
         )
+        leitor_stderr.start()
+
+        # Encerra o script se passar do tempo limite
+        expirado = threading.Event()
+
+        def encerrar():
+            expirado.set()
+            processo.kill()
+
+        limite = threading.Timer(timeout, encerrar)
+        limite.start()
+        resultado = None
+        try:
+            for linha in processo.stdout:
+                try:
+                    registro = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+                if registro.get('type') == 'result':
+                    resultado = registro
+            processo.wait()
+        finally:
+            limite.cancel()
+        leitor_stderr.join(timeout=5)
+        detalhe = f"\n{chr(10).join(stderr_final)}" if stderr_final else ""
         
-        if resultado.returncode == 0:
-            print(f"✅ {descricao} executado com sucesso")
-            # Verifica se stdout não é None antes de chamar strip()
-            stdout_output = resultado.stdout.strip() if resultado.stdout else ""
-            return stdout_output
-        else:
-            print(f"⚠️ {descricao} retornou código {resultado.returncode}")
-            # Verifica se stderr não é None antes de chamar strip()
-            stderr_output = resultado.stderr.strip() if resultado.stderr else "Erro desconhecido"
-            return f"Erro na execução de {descricao}: {stderr_output}"
+        if expirado.is_set():
+            print(f"⏰ Timeout ao executar {descricao}")
+            return f"Timeout ao executar {descricao}{detalhe}"
+        if resultado is None:
+            print(f"⚠️ {descricao} retornou código {processo.returncode} sem resultado")
+            return f"Erro na execução de {descricao}: código {processo.returncode}{detalhe}"
+        print(f"✅ {descricao} executado com sucesso")
+        return resultado
             
-    except subprocess.TimeoutExpired:
-        print(f"⏰ Timeout ao executar {descricao}")
-        return f"Timeout ao executar {descricao}"
     except Exception as e:
         print(f"❌ Erro ao executar {descricao}: {e}")
         return f"Erro ao executar {descricao}: {str(e)}"
 
+@contextlib.contextmanager
+def saida_silenciosa():
+    """Descarta as mensagens de console das verificações executadas no próprio processo."""
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+def resumir_status_etl(resultado, max_itens=10):
+    """
+    Monta o resumo compacto do status das ETLs a partir do resultado estruturado.
+    
+    Args:
+        resultado (dict | str): Retorno de check_etl (ou mensagem de erro)
+        max_itens (int): Máximo de arquivos fora do SLA listados
+        
+    Returns:
+        str: Resumo em texto
+    """
+    if not isinstance(resultado, dict):
+        return str(resultado)
+    
+    totais = resultado.get('totals', {})
+    linhas = [f"📅 Referência: {resultado.get('reference_date', '')}"]
+    for pasta in resultado.get('folders', []):
+        if pasta.get('accessible'):
+            icone = "✅" if not pasta['not_ok'] else "⚠️"
+            linhas.append(f"{icone} {pasta['folder']}: {pasta['ok']}/{pasta['total']} dentro do SLA")
+        else:
+            linhas.append(f"❌ {pasta['folder']}: inacessível")
+    
+    violacoes = resultado.get('violations', [])
+    if violacoes:
+        linhas.append(f"📋 {len(violacoes)} arquivo(s) fora do SLA:")
+        for v in violacoes[:max_itens]:
+            linhas.append(f"  - {os.path.basename(v['path'].replace(chr(92), '/'))} ({v['mtime']}, {v['rule']})")
+        if len(violacoes) > max_itens:
+            linhas.append(f"  ... e mais {len(violacoes) - max_itens} (ver ErrorUpdateETLDesktop.txt)")
+    else:
+        linhas.append(f"✅ Todos os {totais.get('files', 0)} arquivos dentro do SLA")
+    return "\n".join(linhas)
+
+def resumir_status_desktop(resultado):
+    """
+    Monta o resumo compacto do Qlik Sense Desktop a partir do resultado estruturado.
+    
+    Args:
+        resultado (dict | str): Retorno de sync_desktop (ou mensagem de erro)
+        
+    Returns:
+        str: Resumo em texto
+    """
+    if not isinstance(resultado, dict):
+        return str(resultado)
+    if resultado.get('status') != 'ok':
+        return f"⚠️ {resultado.get('error') or 'Erro ao verificar o Qlik Sense Desktop'}"
+    
+    descricoes = {
+        'atualizado': 'já atualizado',
+        'replicado': 'replicado entre destinos',
+        'vinculado': 'vinculado a conteúdo já armazenado',
+        'baixado': 'baixado',
+        'sobrescrito': 'rebaixado e sobrescrito',
+        'sem_url': 'sem URL de download',
+        'sem_destino': 'sem destino válido',
+        'sem_destino_acessivel': 'nenhum destino acessível',
+        'sem_assets': 'sem assets publicados',
+    }
+    linhas = [
+        f"🆕 Última release: {resultado.get('latest')}",
+        f"📦 Initial Release: {resultado.get('initial')}",
+    ]
+    if resultado.get('unchanged'):
+        linhas.append("✅ Sem alterações nas releases desde a última sincronização")
+    for asset in resultado.get('assets', []):
+        nome = asset.get('asset') or asset.get('release')
+        destinos = f" ({asset['destinations']} destino(s))" if asset.get('destinations') else ""
+        falhas = [c for c in asset.get('copies', []) if c.get('error')]
+        erro_copia = f" ⚠️ falha em {len(falhas)} cópia(s)" if falhas else ""
+        linhas.append(f"• {nome}: {descricoes.get(asset['action'], asset['action'])}{destinos}{erro_copia}")
+    return "\n".join(linhas)
+
+def executar_com_prazo(func, descricao, timeout=None):
+    """
+    Executa func em uma thread daemon e espera no máximo timeout segundos.
+    Uma verificação travada (ex.: download parado) não bloqueia o envio; a
+    thread é abandonada e termina sozinha ou junto com o processo.
+    
+    Returns:
+        Retorno de func ou mensagem de erro/timeout
+    """
+    timeout = timeout or evo_timeout_status
+    saida = {}
+
+    def alvo():
+        try:
+            saida['resultado'] = func()
+        except Exception as e:
+            saida['erro'] = e
+
+    trabalho = threading.Thread(target=alvo, name=descricao, daemon=True)
+    # O stdout é redirecionado só enquanto a thread principal espera
+    with saida_silenciosa():
+        trabalho.start()
+        trabalho.join(timeout)
+    if trabalho.is_alive():
+        print(f"⏰ Timeout ao executar {descricao} ({timeout}s)")
+        return f"Timeout ao executar {descricao}"
+    if 'erro' in saida:
+        print(f"⚠️ Erro ao executar {descricao}: {saida['erro']}")
+        return f"Erro ao executar {descricao}: {saida['erro']}"
+    return saida.get('resultado')
+
+def coletar_status_desktop():
+    """Executa a verificação do Qlik Sense Desktop no próprio processo com prazo (ou via --ndjson como fallback)."""
+    if sync_desktop is not None:
+        return executar_com_prazo(sync_desktop, "Status Qlik Desktop")
+    script_desktop = os.path.join(project_root, "crawler_qlik", "status_qlik_desktop.py")
+    if not os.path.exists(script_desktop):
+        print(f"⚠️ Script não encontrado: {script_desktop}")
+        return "Script de status do Desktop não encontrado"
+    return executar_script_status(script_desktop, "Status Qlik Desktop")
+
+def coletar_status_etl():
+    """Executa a verificação das ETLs no próprio processo (ou via --ndjson como fallback)."""
+    if check_etl is not None:
+        try:
+            with saida_silenciosa():
+                return check_etl()
+        except Exception as e:
+            print(f"⚠️ Erro ao verificar as ETLs: {e}")
+            return f"Erro ao verificar as ETLs: {e}"
+    script_etl = os.path.join(project_root, "crawler_qlik", "status_qlik_etl.py")
+    if not os.path.exists(script_etl):
+        print(f"⚠️ Script não encontrado: {script_etl}")
+        return "Script de status das ETLs não encontrado"
+    return executar_script_status(script_etl, "Status ETLs")
+
 def coletar_resumos_status():
     """
     Coleta resumos de status do NPrinting, QMC, Desktop e ETL.
@@ -312,33 +540,24 @@ def coletar_resumos_status():
         
         # 1. Coleta status do NPrinting (relatórios)
         print("📊 Coletando status do NPrinting...")
-        resumos_nprinting = coletar_status_nprinting()
+        formatos = formatos_relatorio()
+        if not formatos:
+            print("ℹ️ Todos os destinos recebem só o resumo; relatórios não serão gerados")
+        resumos_nprinting = coletar_status_nprinting(formatos)
         resumos['nprinting'] = resumos_nprinting
         
         # 2. Coleta status do QMC (estatísticas e painéis)
         print("📊 Coletando status do QMC...")
-        resumos_qmc = coletar_status_qmc()
+        resumos_qmc = coletar_status_qmc(formatos)
         resumos['qmc'] = resumos_qmc
         
-        # 3. Coleta status do Qlik Sense Desktop
+        # 3. Coleta status do Qlik Sense Desktop (resultado estruturado → resumo compacto)
         print("🖥️ Coletando status do Qlik Sense Desktop...")
-        script_desktop = os.path.join(project_root, "crawler_qlik", "status_qlik_desktop.py")
-        if os.path.exists(script_desktop):
-            resumo_desktop = executar_script_status(script_desktop, "Status Qlik Desktop")
-            resumos['desktop'] = resumo_desktop
-        else:
-            print(f"⚠️ Script não encontrado: {script_desktop}")
-            resumos['desktop'] = "Script de status do Desktop não encontrado"
+        resumos['desktop'] = resumir_status_desktop(coletar_status_desktop())
         
-        # 4. Coleta status das ETLs
+        # 4. Coleta status das ETLs (resultado estruturado → resumo compacto)
         print("⚙️ Coletando status das ETLs...")
-        script_etl = os.path.join(project_root, "crawler_qlik", "status_qlik_etl.py")
-        if os.path.exists(script_etl):
-            resumo_etl = executar_script_status(script_etl, "Status ETLs")
-            resumos['etl'] = resumo_etl
-        else:
-            print(f"⚠️ Script não encontrado: {script_etl}")
-            resumos['etl'] = "Script de status das ETLs não encontrado"
+        resumos['etl'] = resumir_status_etl(coletar_status_etl())
         
         return resumos
         
@@ -589,13 +808,16 @@ def enviar_resumos_status():
     return stats_resumos
 
 # =============================================================================
-# ENVIO DE ARQUIVOS PDF DE STATUS
+# ENVIO DOS RELATÓRIOS DE STATUS (PDF, TEXTO OU PNG POR DESTINO)
 # =============================================================================
 
-def enviar_pdfs_status():
-    """Envia arquivos PDF de status das ETLs na ordem especificada."""
-    print("📄 Enviando arquivos PDF de status...")
+def localizar_relatorios_status():
+    """
+    Localiza o relatório mais recente de cada categoria em cada formato gerado.
     
+    Returns:
+        list: [(sufixo, {formato: caminho})] na ordem relatórios, estatísticas, painéis
+    """
     # Ordem desejada: relatórios, estatísticas, painéis
     ordem = [
         ("reports_qlik", "relatorios"),
@@ -603,41 +825,76 @@ def enviar_pdfs_status():
         ("reports_qlik", "paineis"),
     ]
     
-    arquivos_pdf = []
-    
-    # Busca arquivos PDF em cada categoria
+    encontrados = []
     for pasta, sufixo in ordem:
         pasta_completa = os.path.join(project_root, "crawler_qlik", pasta)
         
         if not os.path.exists(pasta_completa):
             print(f"⚠️ Pasta não encontrada: {pasta_completa}")
             continue
-            
-        arquivos = [
-            f for f in os.listdir(pasta_completa) 
-            if f.endswith(".pdf") and f"_{sufixo}_" in f
-        ]
+        
+        arquivos = {}
+        for formato, extensao in EXTENSOES.items():
+            candidatos = [
+                f for f in os.listdir(pasta_completa) 
+                if f.endswith(extensao) and f"_{sufixo}_" in f
+            ]
+            if not candidatos:
+                continue
+            # Pega o arquivo mais recente
+            candidatos.sort(key=lambda n: os.path.getctime(os.path.join(pasta_completa, n)), reverse=True)
+            arquivos[formato] = os.path.join(pasta_completa, candidatos[0])
+            print(f"📄 Relatório ({formato}) encontrado para {sufixo}: {candidatos[0]}")
         
         if not arquivos:
-            print(f"📂 Nenhum arquivo PDF encontrado para {sufixo} em {pasta_completa}")
+            print(f"📂 Nenhum relatório encontrado para {sufixo} em {pasta_completa}")
             continue
-            
-        # Pega o arquivo mais recente
-        arquivos.sort(key=lambda n: os.path.getctime(os.path.join(pasta_completa, n)), reverse=True)
-        arq = os.path.join(pasta_completa, arquivos[0])
-        arquivos_pdf.append(arq)
-        print(f"📄 Arquivo PDF encontrado para {sufixo}: {arquivos[0]}")
-    
-    # Envia cada arquivo PDF
-    stats_pdfs = {'sucessos': 0, 'falhas': 0, 'total': 0}
-    for arquivo in arquivos_pdf:
-        stats_arquivo = enviar_para_todos_destinos(enviar_arquivo_para, arquivo)
-        # Acumula estatísticas
-        stats_pdfs['sucessos'] += stats_arquivo['sucessos']
-        stats_pdfs['falhas'] += stats_arquivo['falhas']
-        stats_pdfs['total'] += stats_arquivo['total']
+        encontrados.append((sufixo, arquivos))
+    return encontrados
+
+def enviar_relatorio_texto(destinatario, caminho_texto):
+    """
+    Envia o relatório compacto como mensagens de texto paginadas.
+    
+    Args:
+        destinatario (str): Número ou ID do destinatário
+        caminho_texto (str): Arquivo .md gerado pelo status_report
+    """
+    with open(caminho_texto, "r", encoding="utf-8") as f:
+        paginas = paginate_text(f.read())
+    return all([enviar_mensagem_texto(destinatario, pagina) for pagina in paginas])
+
+def enviar_relatorios_status():
+    """Envia os relatórios de status a cada destino no formato configurado para ele."""
+    print("📄 Enviando relatórios de status...")
+    
+    relatorios = localizar_relatorios_status()
+    todos_destinos = evo_destinos + evo_grupos
+    
+    stats_relatorios = {'sucessos': 0, 'falhas': 0, 'total': 0}
+    for sufixo, arquivos in relatorios:
+        for destino in todos_destinos:
+            formato = formato_destino(destino)
+            if formato == "resumo":
+                continue
+            caminho = arquivos.get(formato)
+            stats_relatorios['total'] += 1
+            if not caminho:
+                print(f"⚠️ Relatório {sufixo} em {formato} não foi gerado para {destino}")
+                stats_relatorios['falhas'] += 1
+                continue
+            try:
+                if formato == "texto":
+                    ok = enviar_relatorio_texto(destino, caminho)
+                else:
+                    ok = enviar_arquivo_para(destino, caminho)
+            except Exception as e:
+                print(f"❌ Erro ao enviar relatório {sufixo} para {destino}: {e}")
+                ok = False
+            stats_relatorios['sucessos' if ok is not False else 'falhas'] += 1
     
-    return stats_pdfs
+    print(f"📊 Estatísticas: {stats_relatorios['sucessos']} sucessos, {stats_relatorios['falhas']} falhas de {stats_relatorios['total']} envios")
+    return stats_relatorios
 
 # =============================================================================
 # ENVIO DE LOGS DE ERRO
@@ -684,7 +941,8 @@ def enviar_relatorios_compartilhados():
     """Envia relatórios da pasta compartilhada NPrinting."""
     print("📁 Enviando relatórios da pasta compartilhada...")
     
-    if not os.path.exists(pasta_compartilhada):
+    # Verificação com prazo e cache (servidor fora do ar não trava o envio)
+    if not is_path_accessible(pasta_compartilhada):
         print(f"⚠️ Pasta compartilhada não encontrada: {pasta_compartilhada}")
         return
     
@@ -790,10 +1048,10 @@ def main():
             stats_resumos = {'sucessos': 0, 'falhas': 1, 'total': 1}
         
         print("\n" + "="*60)
-        print("📄 ENVIO DE ARQUIVOS PDF DE STATUS")
+        print("📄 ENVIO DOS RELATÓRIOS DE STATUS")
         print("="*60)
         try:
-            stats_pdfs = enviar_pdfs_status()
+            stats_pdfs = enviar_relatorios_status()
         except KeyboardInterrupt:
             print("⚠️ Envio interrompido - continuando...")
             stats_pdfs = {'sucessos': 0, 'falhas': 1, 'total': 1}
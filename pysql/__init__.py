@@ -0,0 +1 @@
+# Makes pysql a package
@@ -0,0 +1,240 @@
+"""
+Diagnóstico de consultas lentas dos relatórios PySQL (opt-in)
+Captura plano de execução (EXPLAIN PLAN / DBMS_XPLAN), tempo decorrido vs. CPU,
+linhas retornadas e round-trips, e compara o plano com o último plano bom
+quando a consulta regride
+
+Ativação: PYSQL_DIAGNOSTICO=1 no .env (ou no ambiente)
+"""
+
+import os
+import re
+import sys
+import uuid
+import difflib
+from datetime import datetime
+
+from historico_tempos import conectar, estatisticas_consultas
+
+
+SCHEMA_DIAGNOSTICO = '''
+CREATE TABLE IF NOT EXISTS diagnosticos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    consulta TEXT NOT NULL,
+    registrado_em TEXT NOT NULL,
+    decorrido REAL,
+    cpu REAL,
+    linhas INTEGER,
+    buscas INTEGER,
+    round_trips INTEGER,
+    plan_hash TEXT,
+    plano TEXT,
+    regressao INTEGER NOT NULL DEFAULT 0,
+    diff_plano TEXT
+);
+CREATE TABLE IF NOT EXISTS planos_referencia (
+    script TEXT NOT NULL,
+    consulta TEXT NOT NULL,
+    plan_hash TEXT,
+    plano TEXT,
+    registrado_em TEXT NOT NULL,
+    PRIMARY KEY (script, consulta)
+);
+'''
+
+# Estatísticas da sessão Oracle (V$MYSTAT) usadas no diagnóstico
+ESTATISTICAS_SESSAO = {
+    'CPU used by this session': 'cpu',  # centésimos de segundo
+    'SQL*Net roundtrips to/from client': 'round_trips',
+}
+
+# Round-trips gastos pela própria leitura de V$MYSTAT entre os dois snapshots
+ROUND_TRIPS_SNAPSHOT = 1
+
+
+def capturar_plano(cursor, consulta_sql, parametros=None):
+    """
+    Gera o plano estimado da consulta com EXPLAIN PLAN e formata com DBMS_XPLAN.
+
+    Usa um cursor separado para não interferir no cursor das consultas.
+
+    Returns:
+        tuple: (plan_hash, texto_plano) ou (None, None) se não for possível
+    """
+    statement_id = f"pysql_{uuid.uuid4().hex[:20]}"
+    cur = cursor.connection.cursor()
+    try:
+        cur.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {consulta_sql}", parametros or {})
+        cur.execute(
+            "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :sid, 'TYPICAL'))",
+            sid=statement_id
+        )
+        texto = "\n".join(linha[0] or '' for linha in cur.fetchall())
+        cur.execute("DELETE FROM plan_table WHERE statement_id = :sid", sid=statement_id)
+        encontrado = re.search(r'Plan hash value:\s*(\d+)', texto)
+        return (encontrado.group(1) if encontrado else None), texto
+    except Exception as e:
+        print(f"⚠️ Não foi possível capturar o plano de execução: {e}")
+        return None, None
+    finally:
+        cur.close()
+
+
+def estatisticas_sessao(cursor):
+    """
+    Lê as estatísticas da sessão atual em V$MYSTAT.
+
+    Returns:
+        dict: {'cpu': segundos, 'round_trips': n} ou None sem privilégio de leitura
+    """
+    cur = cursor.connection.cursor()
+    try:
+        marcadores = ', '.join(f':n{i}' for i in range(len(ESTATISTICAS_SESSAO)))
+        cur.execute(
+            f"SELECT n.name, s.value FROM v$mystat s "
+            f"JOIN v$statname n ON n.statistic# = s.statistic# WHERE n.name IN ({marcadores})",
+            {f'n{i}': nome for i, nome in enumerate(ESTATISTICAS_SESSAO)}
+        )
+        valores = {ESTATISTICAS_SESSAO[nome]: valor for nome, valor in cur.fetchall()}
+        if 'cpu' in valores:
+            valores['cpu'] = valores['cpu'] / 100.0
+        return valores
+    except Exception:
+        return None
+    finally:
+        cur.close()
+
+
+def diagnostico_ativo():
+    """PYSQL_DIAGNOSTICO lido na hora do uso; desligado por padrão, pois acrescenta consultas extras"""
+    return os.getenv('PYSQL_DIAGNOSTICO', '').strip().lower() in ('1', 'true', 'sim', 'yes')
+
+
+def iniciar_diagnostico(cursor, consulta_sql, parametros=None):
+    """Captura o plano e o snapshot inicial da sessão antes de executar a consulta"""
+    plan_hash, plano = capturar_plano(cursor, consulta_sql, parametros)
+    return {
+        'plan_hash': plan_hash,
+        'plano': plano,
+        'sessao_antes': estatisticas_sessao(cursor),
+    }
+
+
+def finalizar_diagnostico(cursor, estado, metricas):
+    """
+    Fecha o diagnóstico após o fetch, calculando CPU e round-trips da consulta.
+
+    Args:
+        cursor: Cursor usado na consulta (para a conexão)
+        estado (dict): Retorno de iniciar_diagnostico
+        metricas (dict): Métricas do executor ('decorrido', 'linhas', 'lotes' lidos no fetchmany)
+
+    Returns:
+        dict: Métricas da consulta
+    """
+    antes = estado.get('sessao_antes')
+    depois = estatisticas_sessao(cursor) if antes is not None else None
+    cpu = round_trips = None
+    if antes and depois:
+        cpu = depois.get('cpu', 0) - antes.get('cpu', 0)
+        round_trips = max(depois.get('round_trips', 0) - antes.get('round_trips', 0) - ROUND_TRIPS_SNAPSHOT, 0)
+    return {
+        'decorrido': metricas['decorrido'],
+        'cpu': cpu,
+        'linhas': metricas['linhas'],
+        'buscas': metricas['lotes'],
+        'round_trips': round_trips,
+        'plan_hash': estado.get('plan_hash'),
+        'plano': estado.get('plano'),
+    }
+
+
+def diff_planos(plano_referencia, plano_atual):
+    """Diff unificado entre o último plano bom e o plano atual"""
+    return "\n".join(difflib.unified_diff(
+        (plano_referencia or '').splitlines(),
+        (plano_atual or '').splitlines(),
+        fromfile='plano_referencia',
+        tofile='plano_atual',
+        lineterm=''
+    ))
+
+
+def registrar_diagnosticos(script, diagnosticos, arquivo=None):
+    """
+    Grava os diagnósticos da execução ao lado do histórico de tempos.
+
+    Consultas sem regressão atualizam o plano de referência (último plano bom);
+    consultas que regrediram são comparadas com ele e o diff é registrado.
+    Deve ser chamada após salvar os tempos da execução.
+    """
+    if not diagnosticos:
+        return
+    estatisticas = estatisticas_consultas(script, arquivo)
+    registrado_em = datetime.now().isoformat()
+    conn = conectar(arquivo)
+    try:
+        conn.executescript(SCHEMA_DIAGNOSTICO)
+        with conn:
+            for consulta, dados in diagnosticos.items():
+                regressao = bool(estatisticas.get(consulta, {}).get('regressao'))
+                referencia = conn.execute(
+                    'SELECT plan_hash, plano FROM planos_referencia WHERE script = ? AND consulta = ?',
+                    (script, consulta)
+                ).fetchone()
+                diff = None
+                if regressao and referencia and dados.get('plano') and referencia[0] != dados.get('plan_hash'):
+                    diff = diff_planos(referencia[1], dados['plano'])
+                    print(f"⚠️ Plano de '{consulta}' mudou desde o último plano bom ({referencia[0]} → {dados.get('plan_hash')}):")
+                    print(diff)
+                elif regressao:
+                    print(f"⚠️ '{consulta}' regrediu sem mudança de plano (hash {dados.get('plan_hash')})")
+                if not regressao and dados.get('plano'):
+                    conn.execute(
+                        'INSERT OR REPLACE INTO planos_referencia (script, consulta, plan_hash, plano, registrado_em) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (script, consulta, dados.get('plan_hash'), dados['plano'], registrado_em)
+                    )
+                conn.execute(
+                    'INSERT INTO diagnosticos (script, consulta, registrado_em, decorrido, cpu, linhas, buscas, '
+                    'round_trips, plan_hash, plano, regressao, diff_plano) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (script, consulta, registrado_em, dados.get('decorrido'), dados.get('cpu'), dados.get('linhas'),
+                     dados.get('buscas'), dados.get('round_trips'), dados.get('plan_hash'), dados.get('plano'),
+                     int(regressao), diff)
+                )
+        print(f"Diagnóstico de {len(diagnosticos)} consulta(s) registrado para '{script}'")
+    finally:
+        conn.close()
+
+
+def imprimir_ultimo_diagnostico(script, arquivo=None):
+    """Mostra as métricas do diagnóstico mais recente do script"""
+    conn = conectar(arquivo)
+    try:
+        conn.executescript(SCHEMA_DIAGNOSTICO)
+        ultimo = conn.execute(
+            'SELECT MAX(registrado_em) FROM diagnosticos WHERE script = ?', (script,)
+        ).fetchone()[0]
+        if not ultimo:
+            print(f"Nenhum diagnóstico registrado para '{script}'")
+            return
+        print(f"Diagnóstico de '{script}' em {ultimo[:19].replace('T', ' ')}")
+        for consulta, decorrido, cpu, linhas, buscas, round_trips, plan_hash, regressao, diff in conn.execute(
+            'SELECT consulta, decorrido, cpu, linhas, buscas, round_trips, plan_hash, regressao, diff_plano '
+            'FROM diagnosticos WHERE script = ? AND registrado_em = ? ORDER BY decorrido DESC',
+            (script, ultimo)
+        ):
+            cpu_txt = f"{cpu:.2f}s" if cpu is not None else "n/d"
+            rt_txt = str(round_trips) if round_trips is not None else "n/d"
+            marca = "⚠️ " if regressao else ""
+            print(f"{marca}{consulta}: {decorrido:.2f}s (CPU {cpu_txt}) | {linhas} linha(s) em {buscas} busca(s) | "
+                  f"round-trips {rt_txt} | plano {plan_hash}")
+            if diff:
+                print(diff)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    imprimir_ultimo_diagnostico(sys.argv[1] if len(sys.argv) > 1 else 'homicidios')
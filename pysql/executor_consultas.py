@@ -0,0 +1,243 @@
+"""
+Execução das consultas PySQL com progresso real
+Busca os resultados em lotes (fetchmany) e publica eventos de progresso
+(linhas, lotes e bytes lidos) em destinos plugáveis: console, log ou métricas
+
+Destinos: PYSQL_PROGRESSO=console,log,metricas no .env (padrão: console).
+Os destinos são criados uma vez por execução (destinos_configurados) e passados
+a cada consulta; finalizar_destinos encerra a execução (ex.: resumo das métricas).
+O destino log grava em PYSQL_LOG_ARQUIVO (padrão: errorlogs/consultas.log) se o
+chamador não tiver configurado um handler para o logger 'pysql.consultas'
+"""
+
+import os
+import sys
+import time
+import logging
+
+# Intervalo mínimo entre atualizações no console (segundos)
+INTERVALO_CONSOLE = 0.5
+
+logger = logging.getLogger('pysql.consultas')
+
+# Arquivo padrão do destino log
+ARQUIVO_LOG_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'errorlogs', 'consultas.log')
+
+
+def tamanho_lote_configurado():
+    """Linhas por lote no fetchmany (também usado como arraysize do cursor), de PYSQL_TAMANHO_LOTE"""
+    return int(os.getenv('PYSQL_TAMANHO_LOTE', '1000'))
+
+
+def tamanho_linha(linha):
+    """Estimativa dos bytes lidos de uma linha (texto pelo tamanho, demais tipos 8 bytes)"""
+    total = 0
+    for valor in linha:
+        if valor is None:
+            continue
+        if isinstance(valor, str):
+            total += len(valor.encode('utf-8', 'replace'))
+        elif isinstance(valor, (bytes, bytearray)):
+            total += len(valor)
+        else:
+            total += 8
+    return total
+
+
+def formatar_bytes(quantidade):
+    """Formata bytes em B/KB/MB"""
+    for unidade in ('B', 'KB', 'MB'):
+        if quantidade < 1024 or unidade == 'MB':
+            return f"{quantidade:.0f}{unidade}" if unidade == 'B' else f"{quantidade:.1f}{unidade}"
+        quantidade /= 1024.0
+
+
+class ProgressoConsole:
+    """Uma linha por consulta no console, reescrita no máximo a cada INTERVALO_CONSOLE"""
+
+    def __init__(self, saida=None):
+        self.saida = saida or sys.stdout
+        self._ultima = 0.0
+        self._largura = 0
+
+    def _escrever(self, texto):
+        try:
+            self.saida.write(texto)
+        except UnicodeEncodeError:
+            self.saida.write(texto.encode('ascii', 'replace').decode('ascii'))
+        self.saida.flush()
+
+    def inicio(self, nome, esperado):
+        self._ultima = 0.0
+        self._largura = 0
+        estimativa = f" (esperado: {esperado:.1f}s)" if esperado else ""
+        self._escrever(f"\nExecutando: {nome}{estimativa}\n")
+
+    def _linha(self, nome, metricas, final=False):
+        texto = (
+            f"{nome}: {metricas['linhas']} linha(s) | {metricas['lotes']} lote(s) | "
+            f"{formatar_bytes(metricas['bytes'])} | {metricas['decorrido']:.2f}s"
+        )
+        # Completa com espaços para apagar o restante da atualização anterior
+        self._escrever('\r' + texto.ljust(self._largura) + ('\n' if final else ''))
+        self._largura = 0 if final else len(texto)
+
+    def lote(self, nome, metricas):
+        agora = time.time()
+        if agora - self._ultima < INTERVALO_CONSOLE:
+            return
+        self._ultima = agora
+        self._linha(nome, metricas)
+
+    def fim(self, nome, metricas):
+        self._linha(nome, metricas, final=True)
+
+
+class ProgressoLog:
+    """Eventos de progresso no logging (nível INFO no fim, DEBUG por lote)"""
+
+    def __init__(self):
+        # Sem handler próprio o INFO seria descartado pela configuração padrão do logging
+        if not logger.handlers:
+            arquivo = os.getenv('PYSQL_LOG_ARQUIVO', '').strip() or ARQUIVO_LOG_PADRAO
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            handler = logging.FileHandler(arquivo, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+            logger.addHandler(handler)
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+
+    def inicio(self, nome, esperado):
+        logger.info("Executando %s (esperado: %.1fs)", nome, esperado or 0)
+
+    def lote(self, nome, metricas):
+        logger.debug("%s: %d linha(s), %d lote(s), %d bytes em %.2fs", nome,
+                     metricas['linhas'], metricas['lotes'], metricas['bytes'], metricas['decorrido'])
+
+    def fim(self, nome, metricas):
+        logger.info("%s concluída: %d linha(s), %d lote(s), %d bytes em %.2fs", nome,
+                    metricas['linhas'], metricas['lotes'], metricas['bytes'], metricas['decorrido'])
+
+
+class ProgressoMetricas:
+    """Acumula as métricas finais de cada consulta (ex.: para exportar ou registrar)"""
+
+    def __init__(self):
+        self.consultas = {}
+
+    def inicio(self, nome, esperado):
+        self.consultas[nome] = {'esperado': esperado}
+
+    def lote(self, nome, metricas):
+        pass
+
+    def fim(self, nome, metricas):
+        self.consultas.setdefault(nome, {}).update(metricas)
+
+    def finalizar(self):
+        """Resumo das consultas da execução no console"""
+        if not self.consultas:
+            return
+        print("\n📊 Métricas das consultas:")
+        totais = {'linhas': 0, 'lotes': 0, 'bytes': 0, 'decorrido': 0.0}
+        for nome, dados in self.consultas.items():
+            print(f" - {nome}: {dados.get('linhas', 0)} linha(s) | {dados.get('lotes', 0)} lote(s) | "
+                  f"{formatar_bytes(dados.get('bytes', 0))} | {dados.get('decorrido', 0.0):.2f}s")
+            for chave in totais:
+                totais[chave] += dados.get(chave, 0)
+        print(f" Total: {totais['linhas']} linha(s) | {totais['lotes']} lote(s) | "
+              f"{formatar_bytes(totais['bytes'])} | {totais['decorrido']:.2f}s em {len(self.consultas)} consulta(s)")
+
+
+DESTINOS_PROGRESSO = {
+    'console': ProgressoConsole,
+    'log': ProgressoLog,
+    'metricas': ProgressoMetricas,
+}
+
+
+def destinos_configurados(valor=None):
+    """Cria os destinos de progresso listados em PYSQL_PROGRESSO (ex.: 'console,log')"""
+    if valor is None:
+        valor = os.getenv('PYSQL_PROGRESSO', 'console')
+    destinos = []
+    for nome in (parte.strip().lower() for parte in valor.split(',')):
+        if not nome:
+            continue
+        if nome not in DESTINOS_PROGRESSO:
+            print(f"⚠️ Destino de progresso desconhecido ignorado: '{nome}'")
+            continue
+        destinos.append(DESTINOS_PROGRESSO[nome]())
+    return destinos
+
+
+def finalizar_destinos(destinos):
+    """Encerra a execução nos destinos que acumulam dados (ex.: resumo das métricas)"""
+    for destino in destinos:
+        if hasattr(destino, 'finalizar'):
+            try:
+                destino.finalizar()
+            except Exception as e:
+                logger.warning("Destino de progresso %s falhou ao finalizar: %s", type(destino).__name__, e)
+
+
+def _notificar(destinos, evento, *args):
+    """Repassa o evento aos destinos; falha em um destino não interrompe a consulta"""
+    for destino in destinos:
+        try:
+            getattr(destino, evento)(*args)
+        except Exception as e:
+            logger.warning("Destino de progresso %s falhou em '%s': %s", type(destino).__name__, evento, e)
+
+
+def executar_consulta(nome, query, cursor, parametros=None, tabela=True, esperado=0,
+                      destinos=None, tamanho_lote=None):
+    """
+    Executa a consulta e lê o resultado em lotes, publicando o progresso.
+
+    Args:
+        nome (str): Nome da consulta (usado nos eventos de progresso)
+        query (str): Texto SQL
+        cursor: Cursor Oracle
+        parametros (dict): Bind variables da consulta
+        tabela (bool): True retorna (colunas, linhas); False retorna só a primeira linha
+        esperado (float): Tempo esperado em segundos (apenas informativo)
+        destinos (list): Destinos de progresso da execução (padrão: destinos_configurados(),
+            criados só para esta consulta)
+        tamanho_lote (int): Linhas por fetchmany (padrão: PYSQL_TAMANHO_LOTE)
+
+    Returns:
+        tuple: (resultado, metricas) com metricas = {'linhas', 'lotes', 'bytes', 'decorrido'}
+    """
+    if destinos is None:
+        destinos = destinos_configurados()
+    if tamanho_lote is None:
+        tamanho_lote = tamanho_lote_configurado()
+    cursor.arraysize = tamanho_lote
+    inicio = time.time()
+    metricas = {'linhas': 0, 'lotes': 0, 'bytes': 0, 'decorrido': 0.0}
+    _notificar(destinos, 'inicio', nome, esperado)
+
+    cursor.execute(query, parametros or {})
+    linhas = []
+    while True:
+        lote = cursor.fetchmany(tamanho_lote)
+        if not lote:
+            break
+        linhas.extend(lote)
+        metricas['linhas'] += len(lote)
+        metricas['lotes'] += 1
+        metricas['bytes'] += sum(tamanho_linha(linha) for linha in lote)
+        metricas['decorrido'] = time.time() - inicio
+        _notificar(destinos, 'lote', nome, metricas)
+        if not tabela:
+            # Consultas de totalizadores: só a primeira linha interessa
+            break
+
+    metricas['decorrido'] = time.time() - inicio
+    _notificar(destinos, 'fim', nome, metricas)
+
+    if tabela:
+        colunas = [str(coluna[0]) for coluna in cursor.description]
+        return (colunas, [list(linha) for linha in linhas]), metricas
+    return (linhas[0] if linhas else None), metricas
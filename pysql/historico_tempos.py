@@ -0,0 +1,232 @@
+"""
+Histórico de tempos de execução das consultas PySQL
+Armazena todas as execuções em SQLite (append-only) e calcula percentis,
+média móvel exponencial e regressões por consulta
+"""
+
+import os
+import json
+import sqlite3
+from datetime import datetime
+
+# Diretório base do módulo (pysql/)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Banco de histórico, ao lado dos relatórios (preservado na limpeza pós-envio)
+ARQUIVO_HISTORICO = os.path.join(SCRIPT_DIR, 'reports_pysql', 'historico_tempos.sqlite3')
+
+# Peso da execução mais recente na média móvel exponencial
+ALFA_EWMA = 0.3
+
+# Número de execuções anteriores usadas no cálculo dos percentis
+JANELA_PERCENTIS = 60
+
+# Mínimo de execuções anteriores para considerar uma regressão
+MINIMO_AMOSTRAS_REGRESSAO = 5
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    executado_em TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tempos_consulta (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    consulta TEXT NOT NULL,
+    segundos REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_script ON execucoes(script, executado_em);
+CREATE INDEX IF NOT EXISTS idx_tempos_consulta ON tempos_consulta(consulta, execucao_id);
+'''
+
+
+def conectar(arquivo=None):
+    """Abre o banco de histórico, criando o esquema se necessário"""
+    if arquivo is None:
+        arquivo = ARQUIVO_HISTORICO
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    conn = sqlite3.connect(arquivo)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def registrar_execucao(script, tempos_execucao, arquivo=None, executado_em=None):
+    """
+    Acrescenta uma execução completa ao histórico.
+
+    Args:
+        script (str): Nome do script (ex.: 'homicidios')
+        tempos_execucao (dict): Tempo em segundos de cada consulta
+        arquivo (str): Caminho do banco (padrão: ARQUIVO_HISTORICO)
+        executado_em (str): Timestamp ISO da execução (padrão: agora)
+
+    Returns:
+        int: Identificador da execução registrada
+    """
+    if executado_em is None:
+        executado_em = datetime.now().isoformat()
+    conn = conectar(arquivo)
+    try:
+        with conn:
+            cur = conn.execute(
+                'INSERT INTO execucoes (script, executado_em) VALUES (?, ?)',
+                (script, executado_em)
+            )
+            execucao_id = cur.lastrowid
+            conn.executemany(
+                'INSERT INTO tempos_consulta (execucao_id, consulta, segundos) VALUES (?, ?, ?)',
+                [(execucao_id, consulta, float(segundos)) for consulta, segundos in tempos_execucao.items()]
+            )
+        return execucao_id
+    finally:
+        conn.close()
+
+
+def importar_json_legado(script, arquivo_json, arquivo=None):
+    """
+    Importa o antigo '<script>_tempos_execucao.json' (últimas 10 execuções)
+    quando o script ainda não tem histórico no banco.
+
+    Returns:
+        int: Quantidade de execuções importadas
+    """
+    if not os.path.exists(arquivo_json):
+        return 0
+    conn = conectar(arquivo)
+    try:
+        existentes = conn.execute('SELECT COUNT(*) FROM execucoes WHERE script = ?', (script,)).fetchone()[0]
+    finally:
+        conn.close()
+    if existentes:
+        return 0
+    try:
+        with open(arquivo_json, 'r', encoding='utf-8') as f:
+            tempos_historicos = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return 0
+    for timestamp in sorted(tempos_historicos):
+        registrar_execucao(script, tempos_historicos[timestamp], arquivo, executado_em=timestamp)
+    return len(tempos_historicos)
+
+
+def listar_scripts(arquivo=None):
+    """Retorna os scripts que possuem execuções registradas"""
+    conn = conectar(arquivo)
+    try:
+        return [linha[0] for linha in conn.execute('SELECT DISTINCT script FROM execucoes ORDER BY script')]
+    finally:
+        conn.close()
+
+
+def carregar_series(script, arquivo=None, limite=None):
+    """
+    Carrega as execuções do script em ordem cronológica.
+
+    Returns:
+        list: Lista de (executado_em, {consulta: segundos})
+    """
+    conn = conectar(arquivo)
+    try:
+        sql = 'SELECT id, executado_em FROM execucoes WHERE script = ? ORDER BY executado_em DESC, id DESC'
+        parametros = [script]
+        if limite:
+            sql += ' LIMIT ?'
+            parametros.append(limite)
+        execucoes = list(reversed(conn.execute(sql, parametros).fetchall()))
+        if not execucoes:
+            return []
+        tempos = {execucao_id: {} for execucao_id, _ in execucoes}
+        marcadores = ', '.join('?' for _ in execucoes)
+        for execucao_id, consulta, segundos in conn.execute(
+            f'SELECT execucao_id, consulta, segundos FROM tempos_consulta WHERE execucao_id IN ({marcadores})',
+            list(tempos)
+        ):
+            tempos[execucao_id][consulta] = segundos
+        return [(executado_em, tempos[execucao_id]) for execucao_id, executado_em in execucoes]
+    finally:
+        conn.close()
+
+
+def percentil(valores, p):
+    """Percentil com interpolação linear (p entre 0 e 100)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    if len(ordenados) == 1:
+        return float(ordenados[0])
+    posicao = (len(ordenados) - 1) * p / 100.0
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fracao = posicao - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fracao
+
+
+def media_exponencial(valores, alfa=ALFA_EWMA):
+    """Média móvel exponencial em ordem cronológica"""
+    estimativa = None
+    for valor in valores:
+        estimativa = valor if estimativa is None else alfa * valor + (1 - alfa) * estimativa
+    return estimativa or 0.0
+
+
+def estatisticas_consultas(script, arquivo=None, janela=JANELA_PERCENTIS):
+    """
+    Calcula as estatísticas de cada consulta do script.
+
+    Os percentis da última execução são comparados com as execuções
+    anteriores (sem incluir a própria), para sinalizar regressões.
+
+    Returns:
+        dict: {consulta: {'amostras', 'ultimo', 'p50', 'p95', 'p95_anterior', 'ewma', 'regressao'}}
+    """
+    series = carregar_series(script, arquivo, limite=janela + 1)
+    if not series:
+        return {}
+
+    por_consulta = {}
+    for _, tempos in series:
+        for consulta, segundos in tempos.items():
+            por_consulta.setdefault(consulta, []).append(segundos)
+
+    _, ultima_execucao = series[-1]
+    estatisticas = {}
+    for consulta, valores in por_consulta.items():
+        ultimo = ultima_execucao.get(consulta)
+        anteriores = valores[:-1] if ultimo is not None else valores
+        anteriores = anteriores[-janela:]
+        p95_anterior = percentil(anteriores, 95)
+        estatisticas[consulta] = {
+            'amostras': len(valores),
+            'ultimo': ultimo,
+            'p50': percentil(valores[-janela:], 50),
+            'p95': percentil(valores[-janela:], 95),
+            'p95_anterior': p95_anterior,
+            'ewma': media_exponencial(valores),
+            'regressao': (
+                ultimo is not None
+                and len(anteriores) >= MINIMO_AMOSTRAS_REGRESSAO
+                and ultimo > p95_anterior
+            ),
+        }
+    return estatisticas
+
+
+def tempos_esperados(script, arquivo=None):
+    """Retorna a estimativa (EWMA) de duração de cada consulta do script"""
+    return {consulta: dados['ewma'] for consulta, dados in estatisticas_consultas(script, arquivo).items()}
+
+
+def tendencia_total(script, arquivo=None, janela=7):
+    """
+    Compara o tempo total médio das últimas execuções com o período anterior.
+
+    Returns:
+        tuple: (media_recente, media_anterior) ou None se não houver dados suficientes
+    """
+    series = carregar_series(script, arquivo, limite=janela * 2)
+    totais = [sum(tempos.values()) for _, tempos in series]
+    if len(totais) <= janela:
+        return None
+    recentes = totais[-janela:]
+    anteriores = totais[:-janela]
+    return sum(recentes) / len(recentes), sum(anteriores) / len(anteriores)
@@ -0,0 +1,73 @@
+"""
+Parâmetros (bind variables) das consultas PySQL
+Centraliza a data de referência e os valores fixos (UF, naturezas) enviados
+ao Oracle como bind variables, para que o texto das consultas seja sempre o
+mesmo (cursor compartilhado, sem hard parse a cada execução)
+
+Data de referência: --data AAAA-MM-DD na linha de comando ou
+PYSQL_DATA_REFERENCIA no .env (padrão: agora). Permite regerar o relatório
+de um dia anterior como se tivesse sido executado ao fim daquele dia
+"""
+
+import os
+import re
+import argparse
+from datetime import datetime, time
+
+# UF dos relatórios (ende.estado_sigla / cid.uf)
+UF_PADRAO = 'GO'
+
+# Marcadores :nome no texto SQL (ignora '::' e dígitos após ':')
+PADRAO_BIND = re.compile(r'(?<![:\w]):([A-Za-z_]\w*)')
+
+
+def converter_data_referencia(valor):
+    """
+    Converte 'AAAA-MM-DD' (ou 'DD/MM/AAAA') na data de referência da execução.
+
+    Datas passadas são fechadas às 23:59:59, como se o relatório tivesse sido
+    gerado ao fim daquele dia; o dia atual usa o horário corrente.
+
+    Returns:
+        datetime: Data/hora de referência
+    """
+    agora = datetime.now()
+    if not valor:
+        return agora
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            data = datetime.strptime(valor.strip(), formato).date()
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"Data de referência inválida: '{valor}' (use AAAA-MM-DD ou DD/MM/AAAA)")
+    if data > agora.date():
+        raise ValueError(f"Data de referência no futuro: {data.strftime('%d/%m/%Y')}")
+    if data == agora.date():
+        return agora
+    return datetime.combine(data, time(23, 59, 59))
+
+
+def ler_data_referencia(argv=None):
+    """Lê a data de referência de --data ou de PYSQL_DATA_REFERENCIA"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--data', default=os.getenv('PYSQL_DATA_REFERENCIA', ''))
+    argumentos, _ = parser.parse_known_args(argv)
+    return converter_data_referencia(argumentos.data)
+
+
+def parametros_base(data_ref, uf=UF_PADRAO):
+    """Bind variables comuns a todas as consultas"""
+    return {'data_ref': data_ref, 'uf': uf}
+
+
+def parametros_da_consulta(consulta_sql, parametros):
+    """
+    Filtra os parâmetros usados no texto da consulta.
+
+    O driver rejeita bind variables que não aparecem no SQL, e cada consulta
+    usa apenas parte delas.
+    """
+    usados = set(PADRAO_BIND.findall(consulta_sql))
+    return {nome: valor for nome, valor in parametros.items() if nome in usados}
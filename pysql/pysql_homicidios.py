@@ -8,11 +8,23 @@ import numpy as np
 import seaborn as sns
 from fpdf import FPDF
 from dotenv import load_dotenv
-from tqdm import tqdm
 from datetime import datetime, timedelta
-import json
 import sys
-import threading
+
+# Carrega o .env antes dos módulos auxiliares, que leem PYSQL_* ao serem importados
+load_dotenv()
+
+# Módulos auxiliares ficam na mesma pasta (execução direta ou via python -m pysql.<script>)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from historico_tempos import (
+    ARQUIVO_HISTORICO, registrar_execucao, importar_json_legado, tempos_esperados, estatisticas_consultas
+)
+from staging_consultas import preparar_staging, montar_consulta, parametros_vitimas
+from executor_consultas import executar_consulta, destinos_configurados, finalizar_destinos
+from parametros_consultas import ler_data_referencia, parametros_base, parametros_da_consulta
+from diagnostico_consultas import (
+    diagnostico_ativo, iniciar_diagnostico, finalizar_diagnostico, registrar_diagnosticos
+)
 
 # Define o diretório base do script
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -39,181 +51,68 @@ if sys.platform.startswith('win'):
         # Se falhar, mantém o stdout original
         pass
 
-load_dotenv()
 matplotlib.use('Agg')  # Configura o backend antes de importar pyplot
 
+# Nome do script no histórico de tempos de execução
+NOME_HISTORICO = 'homicidios'
+
+# Data de referência do relatório (--data AAAA-MM-DD ou PYSQL_DATA_REFERENCIA; padrão: agora)
+DATA_REFERENCIA = ler_data_referencia()
+if DATA_REFERENCIA.date() != datetime.now().date():
+    print(f"📅 Gerando relatório com data de referência {DATA_REFERENCIA.strftime('%d/%m/%Y')}")
+
 def safe_str(item):
     return str(item) if item is not None else ''
 
-def safe_print_progress(text):
-    """Função segura para imprimir progresso no Windows"""
-    try:
-        # Tenta imprimir com UTF-8
-        sys.stdout.write(text)
-        sys.stdout.flush()
-    except UnicodeEncodeError:
-        # Fallback para ASCII se UTF-8 falhar
-        try:
-            safe_text = text.encode('ascii', 'replace').decode('ascii')
-            sys.stdout.write(safe_text)
-            sys.stdout.flush()
-        except:
-            # Último fallback - apenas mostra uma mensagem simples
-            sys.stdout.write('\rProgresso...')
-            sys.stdout.flush()
-    except Exception as e:
-        # Fallback genérico para qualquer erro
-        try:
-            # Remove caracteres problemáticos
-            safe_text = text.replace('█', '#').replace('░', '-').replace('í', 'i').replace('ó', 'o')
-            sys.stdout.write(safe_text)
-            sys.stdout.flush()
-        except:
-            sys.stdout.write('\rProgresso...')
-            sys.stdout.flush()
-
 def salvar_tempos_execucao(tempos_execucao, arquivo=None):
-    """Salva os tempos de execução em um arquivo JSON"""
-    if arquivo is None:
-        arquivo = os.path.join(PROJECT_ROOT, 'pysql', 'reports_pysql', 'homicidios_tempos_execucao.json')
+    """Acrescenta os tempos desta execução ao histórico (SQLite, append-only)"""
     try:
-        # Cria o diretório se não existir
-        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
-        
-        # Carrega tempos existentes se o arquivo existir
-        tempos_historicos = {}
-        if os.path.exists(arquivo):
-            try:
-                with open(arquivo, 'r', encoding='utf-8') as f:
-                    tempos_historicos = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                tempos_historicos = {}
-        
-        # Adiciona a nova execução com timestamp
-        timestamp = datetime.now().isoformat()
-        tempos_historicos[timestamp] = tempos_execucao
-        
-        # Mantém apenas as últimas 10 execuções para calcular a média
-        if len(tempos_historicos) > 10:
-            # Remove as execuções mais antigas
-            timestamps_ordenados = sorted(tempos_historicos.keys())
-            for ts in timestamps_ordenados[:-10]:
-                del tempos_historicos[ts]
-        
-        # Salva o arquivo atualizado
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(tempos_historicos, f, indent=2, ensure_ascii=False)
-            
-        print(f"Tempos de execução salvos em: {arquivo}")
-        
+        registrar_execucao(NOME_HISTORICO, tempos_execucao, arquivo)
+        print(f"Tempos de execução registrados em: {arquivo or ARQUIVO_HISTORICO}")
+
+        # Sinaliza consultas que ultrapassaram o p95 das execuções anteriores
+        for consulta, dados in estatisticas_consultas(NOME_HISTORICO, arquivo).items():
+            if dados['regressao']:
+                print(f"⚠️ Regressão: {consulta} levou {dados['ultimo']:.2f}s (p95 anterior: {dados['p95_anterior']:.2f}s)")
     except Exception as e:
         print(f"Erro ao salvar tempos de execução: {e}")
 
 def carregar_tempos_execucao(arquivo=None):
-    """Carrega os tempos de execução históricos e calcula a média"""
-    if arquivo is None:
-        arquivo = os.path.join(PROJECT_ROOT, 'pysql', 'reports_pysql', 'homicidios_tempos_execucao.json')
+    """Carrega a estimativa de tempo (média exponencial) de cada consulta a partir do histórico"""
     try:
-        if not os.path.exists(arquivo):
-            return {}
-        
-        with open(arquivo, 'r', encoding='utf-8') as f:
-            tempos_historicos = json.load(f)
-        
-        if not tempos_historicos:
-            return {}
-        
-        # Calcula a média dos tempos para cada consulta
-        tempos_medios = {}
-        consultas = list(next(iter(tempos_historicos.values())).keys())
-        
-        for consulta in consultas:
-            tempos_consulta = []
-            for execucao in tempos_historicos.values():
-                if consulta in execucao:
-                    tempos_consulta.append(execucao[consulta])
-            
-            if tempos_consulta:
-                tempos_medios[consulta] = sum(tempos_consulta) / len(tempos_consulta)
-        
-        return tempos_medios
-        
+        # Migra o JSON antigo (últimas 10 execuções) na primeira execução com o histórico novo
+        arquivo_json = os.path.join(PROJECT_ROOT, 'pysql', 'reports_pysql', 'homicidios_tempos_execucao.json')
+        importados = importar_json_legado(NOME_HISTORICO, arquivo_json, arquivo)
+        if importados:
+            print(f"Histórico legado importado: {importados} execuções de {arquivo_json}")
+        return tempos_esperados(NOME_HISTORICO, arquivo)
     except Exception as e:
         print(f"Erro ao carregar tempos de execução: {e}")
         return {}
 
-def mostrar_progresso_tempo(nome_consulta, tempo_inicio, tempo_medio_esperado):
-    """Mostra uma barra de progresso baseada no tempo médio esperado"""
-    if tempo_medio_esperado <= 0:
-        return
-    
-    tempo_atual = time.time() - tempo_inicio
-    progresso = min(tempo_atual / tempo_medio_esperado, 1.0)
-    
-    # Cria uma barra de progresso simples
-    largura_barra = 50
-    posicao = int(progresso * largura_barra)
-    barra = '█' * posicao + '░' * (largura_barra - posicao)
-    percentual = progresso * 100
-    
-    # Limpa a linha atual e mostra o progresso
-    progress_text = f'\r{nome_consulta}: [{barra}] {percentual:.1f}% ({tempo_atual:.1f}s/{tempo_medio_esperado:.1f}s)'
-    safe_print_progress(progress_text)
-    
-    if progresso >= 1.0:
-        print()  # Nova linha quando terminar
+def executar_com_progresso(nome, query, cursor, tempos_medios, diagnosticos=None, parametros=None, destinos=None):
+    """
+    Executa uma query lendo o resultado em lotes (fetchmany) e publicando o progresso
+    real (linhas, lotes e bytes) nos destinos de PYSQL_PROGRESSO ('destinos', criados
+    uma vez por execução).
+    'parametros' são as bind variables da consulta (data de referência, UF, naturezas).
+    Se 'diagnosticos' for um dicionário, registra nele o diagnóstico da consulta
+    (plano, CPU, linhas e round-trips).
+    """
+    # O plano é capturado antes de iniciar a contagem do tempo da consulta
+    estado_diagnostico = iniciar_diagnostico(cursor, query, parametros) if diagnosticos is not None else None
+
+    # Consultas tabulares retornam (colunas, linhas); as demais, apenas a linha de totais
+    tabela = nome in ["Homicídios Comparativo por Município", "Homicídios Comparativo por 2 Anos","Homicídios Comparativo por Todos os Anos","Homicídios Comparativo por Regiões dia anterior","Homicídios Comparativo por Regiões dia atual","Homicídios Comparativo por Dia","Homicídios Comparativo por Dia por Regiões","Homicídios Comparativo por Mes por Regiões","Homicídios Comparativo por Semana por Regiões","Homicídios em Presídios","Homicídios Comparativo por Município Top 20","Homicídios Comparativo por Risp","Homicídios Comparativo por Aisp"]
+    resultado, metricas = executar_consulta(
+        nome, query, cursor, parametros, tabela=tabela, esperado=tempos_medios.get(nome, 0),
+        destinos=destinos
+    )
+    tempo_execucao = metricas['decorrido']
+
+    if estado_diagnostico is not None:
+        diagnosticos[nome] = finalizar_diagnostico(cursor, estado_diagnostico, metricas)
 
-def executar_com_progresso(nome, query, cursor, tempos_medios):
-    """Executa uma query com barra de progresso baseada no tempo médio esperado"""
-    start = time.time()
-    tempo_medio_esperado = tempos_medios.get(nome, 0)
-    
-    if tempo_medio_esperado > 0:
-        print(f"\nExecutando: {nome}")
-        # Inicia um thread para mostrar o progresso
-        import time as time_module
-        
-        def mostrar_progresso():
-            while True:
-                tempo_atual = time.time() - start
-                progresso = min(tempo_atual / tempo_medio_esperado, 1.0)
-                
-                largura_barra = 50
-                posicao = int(progresso * largura_barra)
-                barra = '█' * posicao + '░' * (largura_barra - posicao)
-                percentual = progresso * 100
-                
-                progress_text = f'\r{nome}: [{barra}] {percentual:.1f}% ({tempo_atual:.1f}s/{tempo_medio_esperado:.1f}s)'
-                safe_print_progress(progress_text)
-                
-                if progresso >= 1.0:
-                    break
-                time_module.sleep(0.1)
-        
-        # Inicia o thread de progresso
-        progresso_thread = threading.Thread(target=mostrar_progresso)
-        progresso_thread.daemon = True
-        progresso_thread.start()
-    
-    # Executa a query
-    cursor.execute(query)
-    
-    # Processa o resultado
-    if nome in ["Homicídios Comparativo por Município", "Homicídios Comparativo por 2 Anos","Homicídios Comparativo por Todos os Anos","Homicídios Comparativo por Regiões dia anterior","Homicídios Comparativo por Regiões dia atual","Homicídios Comparativo por Dia","Homicídios Comparativo por Dia por Regiões","Homicídios Comparativo por Mes por Regiões","Homicídios Comparativo por Semana por Regiões","Homicídios em Presídios","Homicídios Comparativo por Município Top 20","Homicídios Comparativo por Risp","Homicídios Comparativo por Aisp"]:
-        columns = [str(col[0]) for col in cursor.description]
-        rows = [list(row) for row in cursor.fetchall()]
-        resultado = (columns, rows)
-    else:
-        resultado = cursor.fetchone()
-    
-    end = time.time()
-    tempo_execucao = end - start
-    
-    # Aguarda o thread de progresso terminar
-    if tempo_medio_esperado > 0:
-        progresso_thread.join(timeout=0.5)
-        print()  # Nova linha
-    
     return resultado, tempo_execucao
 
 # Cria a pasta pysql/img_reports se não existir
@@ -291,16 +190,16 @@ cursor = conn.cursor()
 # Query principal de homicídio
 query_homicidios = '''
 SELECT
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(SYSDATE) THEN pes.id END) AS homicidios_hoje,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(SYSDATE - 1) THEN pes.id END) AS homicidios_ontem,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'MM') THEN pes.id END) AS homicidios_mes,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'MM') AND TRUNC(oc.datafato) < TRUNC(SYSDATE) THEN pes.id END) AS homicidios_mes_ontem,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'YYYY') THEN pes.id END) AS homicidios_ano,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'YYYY') AND TRUNC(oc.datafato) < TRUNC(SYSDATE) THEN pes.id END) AS homicidios_ano_ontem
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(:data_ref) THEN pes.id END) AS homicidios_hoje,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(:data_ref - 1) THEN pes.id END) AS homicidios_ontem,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'MM') THEN pes.id END) AS homicidios_mes,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'MM') AND TRUNC(oc.datafato) < TRUNC(:data_ref) THEN pes.id END) AS homicidios_mes_ontem,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'YYYY') THEN pes.id END) AS homicidios_ano,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'YYYY') AND TRUNC(oc.datafato) < TRUNC(:data_ref) THEN pes.id END) AS homicidios_ano_ontem
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -325,28 +224,25 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
+WHERE ende.estado_sigla = :uf
+  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
+  AND {vitimas_homicidio}
 '''
 
 # Query principal de feminicídio
 query_feminicidios = '''
 SELECT
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(SYSDATE) THEN pes.id END) AS feminicidios_hoje,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(SYSDATE - 1) THEN pes.id END) AS feminicidios_ontem,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'MM') THEN pes.id END) AS feminicidios_mes,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'MM') AND TRUNC(oc.datafato) < TRUNC(SYSDATE) THEN pes.id END) AS feminicidios_mes_ontem,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'YYYY') THEN pes.id END) AS feminicidios_ano,
-  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(SYSDATE, 'YYYY') AND TRUNC(oc.datafato) < TRUNC(SYSDATE) THEN pes.id END) AS feminicidios_ano_ontem
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(:data_ref) THEN pes.id END) AS feminicidios_hoje,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) = TRUNC(:data_ref - 1) THEN pes.id END) AS feminicidios_ontem,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'MM') THEN pes.id END) AS feminicidios_mes,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'MM') AND TRUNC(oc.datafato) < TRUNC(:data_ref) THEN pes.id END) AS feminicidios_mes_ontem,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'YYYY') THEN pes.id END) AS feminicidios_ano,
+  COUNT(DISTINCT CASE WHEN TRUNC(oc.datafato) >= TRUNC(:data_ref, 'YYYY') AND TRUNC(oc.datafato) < TRUNC(:data_ref) THEN pes.id END) AS feminicidios_ano_ontem
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -371,13 +267,10 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
+WHERE ende.estado_sigla = :uf
+  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'FEMINICÍDIO' OR nat_pes.naturezaid IN ('501138', '501139', '501199', '501201', '501204', '520269', '520323','523011','523006'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
+  AND {vitimas_feminicidio}
 '''
 
 # Query de homicídio por município (tabela)
@@ -395,13 +288,7 @@ SELECT
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -422,13 +309,10 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-  AND TRUNC(oc.datafato) IN(TRUNC(SYSDATE-1),TRUNC(SYSDATE))
+WHERE ende.estado_sigla = :uf
+  AND TRUNC(oc.datafato) IN(TRUNC(:data_ref-1),TRUNC(:data_ref))
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND ( UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011','400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202','501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140','501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262','523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
+  AND {vitimas_homicidio}
 GROUP BY
   cid.nome, oc.id, oc.datafato,oc.dataultimaatualizacao
 ORDER BY
@@ -464,13 +348,10 @@ LEFT JOIN bu.ocorrenciapessoa ope
     ON opnq.ocorrenciapessoanatureza_id = opn.id 
   ON opn.ocorrenciapessoa_id = ope.id
 ON oc.id = ope.ocorrencia_id 
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)AND TRUNC(oc.datafato) <= TRUNC(SYSDATE)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)AND TRUNC(oc.datafato) <= TRUNC(:data_ref)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 ) PIVOT (
   COUNT(pessoa_id)
   FOR mes_fato IN (01 AS "JAN", 02 AS "FEV", 03 AS "MAR", 04 AS "ABR", 05 AS "MAI", 06 AS "JUN", 07 AS "JUL", 08 AS "AGO", 09 AS "SET", 10 AS "OUT", 11 AS "NOV", 12 AS "DEZ")
@@ -512,15 +393,12 @@ LEFT JOIN bu.ocorrenciapessoa ope
   ON opn.ocorrenciapessoa_id = ope.id
 ON oc.id = ope.ocorrencia_id 
 WHERE
-ende.estado_sigla = 'GO'
-AND TRUNC(oc.datafato) BETWEEN TO_DATE('01/01/2016', 'DD/MM/YYYY') AND TRUNC(SYSDATE)
---AND oc.datafato >= TRUNC(SYSDATE - 1)
+ende.estado_sigla = :uf
+AND TRUNC(oc.datafato) BETWEEN TO_DATE('01/01/2016', 'DD/MM/YYYY') AND TRUNC(:data_ref)
+--AND oc.datafato >= TRUNC(:data_ref - 1)
 AND oc.statusocorrencia = 'OCORRENCIA'
 --FILTRO
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA' 
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 ) PIVOT (
   COUNT(pessoa_id)
   FOR mes_fato IN (01 AS "JAN", 02 AS "FEV", 03 AS "MAR", 04 AS "ABR", 05 AS "MAI", 06 AS "JUN", 07 AS "JUL", 08 AS "AGO", 09 AS "SET", 10 AS "OUT", 11 AS "NOV", 12 AS "DEZ")
@@ -532,29 +410,23 @@ ORDER BY
 query_homicidios_comparativo_regioes_dia_anterior ='''
 SELECT
 CASE
-    WHEN cid.uf <> 'GO' THEN NULL
+    WHEN cid.uf <> :uf THEN NULL
     WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
     WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
     ELSE 'INTERIOR'
 END AS regiao_observatorio,
-COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(SYSDATE, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(SYSDATE, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE -1 )THEN pes.id END) AS periodo_ano_atual,
-ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS acumulado_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) AS acumulado_ano_atual,
-ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(:data_ref, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(:data_ref, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref -1 )THEN pes.id END) AS periodo_ano_atual,
+ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS acumulado_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) AS acumulado_ano_atual,
+ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
 SUM(cib.populacao) AS populacao_total
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -575,24 +447,13 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (
-    UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN (
-      '500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011',
-      '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202',
-      '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140',
-      '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262',
-      '523006', '523007', '523008', '523009', '523010', '523011', '522745'
-    )
-  )
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 GROUP BY
 CASE
-	WHEN cid.uf <> 'GO' THEN NULL
+	WHEN cid.uf <> :uf THEN NULL
 	WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 ELSE 'INTERIOR'
@@ -602,29 +463,23 @@ END
 query_homicidios_comparativo_regioes_dia_atual ='''
 SELECT
 CASE
-    WHEN cid.uf <> 'GO' THEN NULL
+    WHEN cid.uf <> :uf THEN NULL
     WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
     WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
     ELSE 'INTERIOR'
 END AS regiao_observatorio,
-COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(SYSDATE, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(SYSDATE, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS periodo_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE , 'MM') AND TRUNC(SYSDATE + 1) THEN pes.id END) AS periodo_ano_atual,
-ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE , 'MM') AND TRUNC(SYSDATE) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS acumulado_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) AS acumulado_ano_atual,
-ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE, 'YYYY') AND TRUNC(SYSDATE) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(:data_ref, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(:data_ref, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS periodo_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref , 'MM') AND TRUNC(:data_ref + 1) THEN pes.id END) AS periodo_ano_atual,
+ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref , 'MM') AND TRUNC(:data_ref) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS acumulado_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) AS acumulado_ano_atual,
+ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref, 'YYYY') AND TRUNC(:data_ref) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
 SUM(cib.populacao) AS populacao_total
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -645,16 +500,13 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE) AND TRUNC(oc.datafato) <= TRUNC(SYSDATE)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref) AND TRUNC(oc.datafato) <= TRUNC(:data_ref)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011','400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202','501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140','501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262','523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 GROUP BY
 CASE
-	WHEN cid.uf <> 'GO' THEN NULL
+	WHEN cid.uf <> :uf THEN NULL
 	WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 ELSE 'INTERIOR'
@@ -669,7 +521,7 @@ SELECT
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -694,17 +546,14 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
+WHERE ende.estado_sigla = :uf
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
+  AND {vitimas_homicidio}
   AND ( /* Mês atual até ontem */
-  ( oc.datafato >= TRUNC(SYSDATE, 'MM')AND oc.datafato <  TRUNC(SYSDATE) )
+  ( oc.datafato >= TRUNC(:data_ref, 'MM')AND oc.datafato <  TRUNC(:data_ref) )
   OR
   /* Mesmo mês do ano passado, até a 'data equivalente a ontem' de 1 ano atrás */
-  ( oc.datafato >= ADD_MONTHS(TRUNC(SYSDATE, 'MM'), -12) AND oc.datafato <  ADD_MONTHS(TRUNC(SYSDATE), -12) ))
+  ( oc.datafato >= ADD_MONTHS(TRUNC(:data_ref, 'MM'), -12) AND oc.datafato <  ADD_MONTHS(TRUNC(:data_ref), -12) ))
   GROUP BY
   TO_CHAR(oc.datafato, 'DD'),
   TO_CHAR(oc.datafato, 'Mon', 'NLS_DATE_LANGUAGE=PORTUGUESE'),
@@ -716,7 +565,7 @@ WHERE ende.estado_sigla = 'GO'
 query_homicidios_comparativo_regioes_dia ='''
 SELECT
   CASE
-	  WHEN cid.uf <> 'GO' THEN NULL
+	  WHEN cid.uf <> :uf THEN NULL
 	  WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	  WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 	  ELSE 'INTERIOR'
@@ -727,7 +576,7 @@ SELECT
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -752,18 +601,15 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
+WHERE ende.estado_sigla = :uf
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
-  AND EXTRACT(MONTH FROM oc.datafato) = EXTRACT(MONTH FROM SYSDATE)
-  AND EXTRACT(DAY FROM oc.datafato) <= EXTRACT(DAY FROM SYSDATE - 1)
-  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
+  AND {vitimas_homicidio}
+  AND EXTRACT(MONTH FROM oc.datafato) = EXTRACT(MONTH FROM :data_ref)
+  AND EXTRACT(DAY FROM oc.datafato) <= EXTRACT(DAY FROM :data_ref - 1)
+  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
 GROUP BY
   CASE
-	  WHEN cid.uf <> 'GO' THEN NULL
+	  WHEN cid.uf <> :uf THEN NULL
 	  WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	  WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 	  ELSE 'INTERIOR'
@@ -778,7 +624,7 @@ ORDER BY
 query_homicidios_comparativo_regioes_mes ='''
 SELECT
   CASE
-	  WHEN cid.uf <> 'GO' THEN NULL
+	  WHEN cid.uf <> :uf THEN NULL
 	  WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	  WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 	  ELSE 'INTERIOR'
@@ -789,7 +635,7 @@ SELECT
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -814,17 +660,14 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
+WHERE ende.estado_sigla = :uf
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
-  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
-  AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)
+  AND {vitimas_homicidio}
+  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
+  AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)
 GROUP BY
   CASE
-	  WHEN cid.uf <> 'GO' THEN NULL
+	  WHEN cid.uf <> :uf THEN NULL
 	  WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	  WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 	  ELSE 'INTERIOR'
@@ -838,7 +681,7 @@ ORDER BY
 query_homicidios_comparativo_regioes_semana ='''
 SELECT
   CASE
-	  WHEN cid.uf <> 'GO' THEN NULL
+	  WHEN cid.uf <> :uf THEN NULL
 	  WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
 	  WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
 	  ELSE 'INTERIOR'
@@ -849,7 +692,7 @@ SELECT
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas FROM sicad.circunscricao circ INNER JOIN sicad.estrutura_organizacional_real eor ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional GROUP BY cod_bairro) area
+      LEFT JOIN {area_bairro} area
       ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris
@@ -874,17 +717,14 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
+WHERE ende.estado_sigla = :uf
   AND oc.statusocorrencia = 'OCORRENCIA'
-  AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-  AND nat_pes.consumacaoenum = 'CONSUMADO'
-  AND ope.tipopessoaenum = 'FISICA'
-  AND qcap.nome = 'VÍTIMA'
-  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
-  AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)
+  AND {vitimas_homicidio}
+  AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
+  AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)
 GROUP BY
   CASE
-    WHEN cid.uf <> 'GO' THEN NULL
+    WHEN cid.uf <> :uf THEN NULL
     WHEN cid.cidade = 25300 THEN 'GOIÂNIA'
     WHEN cid.microrregiao = 520012 THEN 'ENTORNO DO DF'
     ELSE 'INTERIOR'
@@ -908,13 +748,7 @@ FROM bu.ocorrencia oc
 --ENDERECO/AMBIENTE
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -948,14 +782,11 @@ LEFT JOIN bu.ocorrenciapessoa ope
 	 ON opn.ocorrenciapessoa_id = ope.id
 ON oc.id = ope.ocorrencia_id 
 WHERE
-ende.estado_sigla = 'GO'
-AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)
+ende.estado_sigla = :uf
+AND EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)
 AND oc.statusocorrencia = 'OCORRENCIA'
 --FILTRO 
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011', '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202', '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140', '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262', '523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA' 
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 AND oco_a.tipoestabelecimento_nome = 'PRESÍDIO'
 GROUP BY
   cid.nome, oc.id, oc.datafato
@@ -966,24 +797,18 @@ ORDER BY
 query_homicidios_comparativo_municipios_top_20 = '''
 SELECT
 NVL(cid.nome, 'NÃO INFORMADO') AS municipio_nome,
-COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(SYSDATE, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(SYSDATE, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE -1 )THEN pes.id END) AS periodo_ano_atual,
-ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS acumulado_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) AS acumulado_ano_atual,
-ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(:data_ref, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(:data_ref, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref -1 )THEN pes.id END) AS periodo_ano_atual,
+ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS acumulado_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) AS acumulado_ano_atual,
+ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
 SUM(cib.populacao) AS populacao_total
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -1004,13 +829,10 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011','400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202','501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140','501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262','523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 GROUP BY NVL(cid.nome, 'NÃO INFORMADO')
 ORDER BY 7 DESC
 FETCH FIRST 38 ROWS ONLY
@@ -1019,24 +841,18 @@ FETCH FIRST 38 ROWS ONLY
 query_homicidios_comparativo_risp = '''
 SELECT
 ris.nome AS risp,
-COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(SYSDATE, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(SYSDATE, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE -1 )THEN pes.id END) AS periodo_ano_atual,
-ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS acumulado_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) AS acumulado_ano_atual,
-ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(:data_ref, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(:data_ref, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref -1 )THEN pes.id END) AS periodo_ano_atual,
+ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS acumulado_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) AS acumulado_ano_atual,
+ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
 SUM(cib.populacao) AS populacao_total
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -1057,13 +873,10 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011','400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202','501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140','501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262','523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 AND ris.nome IS NOT NULL
 GROUP BY ris.nome
 ORDER BY 7 DESC
@@ -1081,24 +894,18 @@ CASE
     WHEN ais.aisp = 48 THEN '48ª AISP - ÁREA DE SL DE MONTES BELOS'
     ELSE ais.nome
 END AS aisp,
-COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(SYSDATE, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(SYSDATE, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE -1 )THEN pes.id END) AS periodo_ano_atual,
-ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'MM') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(SYSDATE - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE, -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE), -12) THEN pes.id END) AS acumulado_ano_anterior,
-COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) AS acumulado_ano_atual,
-ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(SYSDATE - 1 , 'YYYY') AND TRUNC(SYSDATE - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(SYSDATE - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(SYSDATE - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato >= TRUNC(ADD_MONTHS(:data_ref, -12), 'MM') AND oc.datafato <  TRUNC(ADD_MONTHS(:data_ref, -11), 'MM') THEN pes.id END) AS mes_anterior_fechado,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1, 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END) AS periodo_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref -1 )THEN pes.id END) AS periodo_ano_atual,
+ROUND((COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'MM') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE  WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN ADD_MONTHS(TRUNC(:data_ref - 1 , 'MM'), -12) AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END), 0), 2) AS variacao_percentual,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref, -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref), -12) THEN pes.id END) AS acumulado_ano_anterior,
+COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) AS acumulado_ano_atual,
+ROUND(( COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(:data_ref - 1 , 'YYYY') AND TRUNC(:data_ref - 1 ) THEN pes.id END) - COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1 ), -12) THEN pes.id END)) * 100.0 / NULLIF(COUNT(DISTINCT CASE WHEN oc.datafato BETWEEN TRUNC(ADD_MONTHS(:data_ref - 1 , -12), 'YYYY') AND ADD_MONTHS(TRUNC(:data_ref - 1), -12)THEN pes.id END), 0), 2) AS variacao_acumulado_percentual,
 SUM(cib.populacao) AS populacao_total
 FROM bu.ocorrencia oc
 LEFT JOIN bu.endereco ende
 INNER JOIN sspj.bairros bai
-      LEFT JOIN (
-        SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas
-        FROM sicad.circunscricao circ
-        INNER JOIN sicad.estrutura_organizacional_real eor
-          ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional
-        GROUP BY cod_bairro
-      ) area ON area.cod_bairro = bai.bairro
+      LEFT JOIN {area_bairro} area ON area.cod_bairro = bai.bairro
       LEFT JOIN sspj.aisps ais
       LEFT JOIN sspj.risps ris ON ris.risp = ais.risp
 ON ais.aisp = bai.aisp
@@ -1119,13 +926,10 @@ LEFT JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_
 LEFT JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
 INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
 INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
-WHERE ende.estado_sigla = 'GO'
-AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(SYSDATE, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM SYSDATE)AND TRUNC(oc.datafato) <= TRUNC(SYSDATE - 1)))
+WHERE ende.estado_sigla = :uf
+AND (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM ADD_MONTHS(:data_ref, -12)) OR (EXTRACT(YEAR FROM oc.datafato) = EXTRACT(YEAR FROM :data_ref)AND TRUNC(oc.datafato) <= TRUNC(:data_ref - 1)))
 AND oc.statusocorrencia = 'OCORRENCIA'
-AND (UPPER(nat_tip_pes.GRUPO) = 'HOMICÍDIO' OR nat_pes.naturezaid IN ('500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011','400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202','501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140','501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262','523006', '523007', '523008', '523009', '523010', '523011', '522745'))
-AND nat_pes.consumacaoenum = 'CONSUMADO'
-AND ope.tipopessoaenum = 'FISICA'
-AND qcap.nome = 'VÍTIMA'
+AND {vitimas_homicidio}
 AND ais.nome IS NOT NULL
 GROUP BY ais.aisp,ais.nome
 ORDER BY 7 DESC
@@ -1152,12 +956,26 @@ queries = [
 # Carrega tempos médios de execução históricos
 tempos_medios = carregar_tempos_execucao()
 
+# Materializa uma vez as subconsultas compartilhadas (áreas por bairro e vítimas filtradas)
+fontes_staging = preparar_staging(cursor, grupos=('homicidio', 'feminicidio'))
+
+# Bind variables das consultas (texto SQL fixo entre execuções)
+binds_consultas = {**parametros_base(DATA_REFERENCIA), **parametros_vitimas(('homicidio', 'feminicidio'))}
+
 resultados = {}
 tempos_execucao = {}
+# Diagnóstico das consultas (opt-in via PYSQL_DIAGNOSTICO=1)
+diagnosticos = {} if diagnostico_ativo() else None
+# Destinos de progresso (PYSQL_PROGRESSO) compartilhados por todas as consultas da execução
+destinos_progresso = destinos_configurados()
 
 for nome, query in queries:
     # Executa a query com barra de progresso
-    resultado, tempo_execucao = executar_com_progresso(nome, query, cursor, tempos_medios)
+    consulta_sql = montar_consulta(query, fontes_staging)
+    resultado, tempo_execucao = executar_com_progresso(
+        nome, consulta_sql, cursor, tempos_medios, diagnosticos,
+        parametros_da_consulta(consulta_sql, binds_consultas), destinos_progresso
+    )
     resultados[nome] = resultado
     tempos_execucao[nome] = tempo_execucao
     
@@ -1172,7 +990,7 @@ for nome, query in queries:
 homicidios_hoje, homicidios_ontem, homicidios_mes, homicidios_mes_ontem,homicidios_ano, homicidios_ano_ontem = resultados["Homicídios"]
 feminicidios_hoje, feminicidios_ontem, feminicidios_mes, feminicidios_mes_ontem, feminicidios_ano, feminicidios_ano_ontem = resultados["Feminicídios"]
 
-hoje = datetime.now()
+hoje = DATA_REFERENCIA
 dia_atual = hoje.day
 mes_atual = hoje.strftime('%b').capitalize()  # Ex: 'Jul'
 ano_atual = hoje.year
@@ -1474,7 +1292,7 @@ for _, linha in df_homicidio_2anos.iterrows():
     ano = int(linha['ANO_FATO'])
     
     # Para o ano atual, usa apenas os meses até o mês de ontem
-    if ano == datetime.now().year:
+    if ano == hoje.year:
         # Obtém o mês de ontem como número (1-12)
         mes_ontem_num = (hoje - timedelta(days=1)).month
         # Seleciona apenas os meses até o mês de ontem
@@ -2599,5 +2417,15 @@ pdf.output(os.path.join(PROJECT_ROOT, 'pysql', 'reports_pysql', 'relatorio_homic
 # Salva os tempos de execução para uso futuro
 salvar_tempos_execucao(tempos_execucao)
 
+# Encerra os destinos de progresso (ex.: resumo das métricas das consultas)
+finalizar_destinos(destinos_progresso)
+
+# Grava o diagnóstico (compara planos das consultas que regrediram)
+if diagnosticos:
+    try:
+        registrar_diagnosticos(NOME_HISTORICO, diagnosticos)
+    except Exception as e:
+        print(f"Erro ao registrar diagnóstico das consultas: {e}")
+
 cursor.close()
 conn.close()
\ No newline at end of file
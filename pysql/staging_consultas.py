@@ -0,0 +1,177 @@
+"""
+Etapa de staging das consultas PySQL
+Materializa uma vez por execução o mapeamento bairro → siglas (LISTAGG das
+circunscrições) e o conjunto filtrado de vítimas (natureza/qualificação), em
+tabelas temporárias globais (GTT) do Oracle, para que as demais consultas
+façam join com elas em vez de reavaliar as mesmas subconsultas
+
+Se as GTTs não puderem ser criadas/preenchidas (ex.: usuário somente leitura),
+as consultas usam os trechos originais inline, sem mudança de resultado
+
+Desativação: PYSQL_STAGING=0 no .env (ou no ambiente)
+"""
+
+import os
+
+from parametros_consultas import parametros_da_consulta
+
+
+# Tabelas temporárias globais (dados por sessão, preservados entre commits)
+TABELA_AREA_BAIRRO = 'stg_pysql_area_bairro'
+TABELA_VITIMAS = 'stg_pysql_vitimas'
+
+# Início da série histórica usada nos relatórios (comparativo de todos os anos)
+DATA_INICIO_SERIE = '2016-01-01'
+
+# Naturezas consideradas em cada grupo, além do GRUPO tipificado
+NATUREZAS_HOMICIDIO = (
+    '500001', '500002', '500003', '500004', '500005', '500006', '500007', '500011',
+    '400711', '400712', '400001', '400002', '501199', '501200', '501201', '501202',
+    '501203', '501204', '501220', '501136', '501137', '501138', '501139', '501140',
+    '501141', '501288', '520269', '520323', '521062', '522242', '522243', '522262',
+    '523006', '523007', '523008', '523009', '523010', '523011', '522745',
+)
+NATUREZAS_FEMINICIDIO = (
+    '501138', '501139', '501199', '501201', '501204', '520269', '520323', '523011', '523006',
+)
+
+# Grupo de vítimas → (GRUPO tipificado, naturezas adicionais)
+GRUPOS_VITIMAS = {
+    'homicidio': ('HOMICÍDIO', NATUREZAS_HOMICIDIO),
+    'feminicidio': ('FEMINICÍDIO', NATUREZAS_FEMINICIDIO),
+}
+
+# Subconsulta bairro → siglas das circunscrições (antes repetida em cada consulta)
+SQL_AREA_BAIRRO = (
+    "SELECT cod_bairro, LISTAGG(eor.sigla, ', ') AS siglas "
+    "FROM sicad.circunscricao circ "
+    "INNER JOIN sicad.estrutura_organizacional_real eor "
+    "ON eor.cod_estrutura_organizacional = circ.cod_estrutura_organizacional "
+    "GROUP BY cod_bairro"
+)
+
+
+def parametros_vitimas(grupos):
+    """Bind variables das naturezas (:nat_<grupo>_<i>) e do grupo staged (:grupo_<grupo>)"""
+    parametros = {}
+    for grupo in grupos:
+        parametros[f'grupo_{grupo}'] = grupo
+        for i, natureza in enumerate(GRUPOS_VITIMAS[grupo][1]):
+            parametros[f'nat_{grupo}_{i}'] = natureza
+    return parametros
+
+
+def filtro_vitimas_inline(grupo):
+    """Filtro original de vítimas (natureza consumada, pessoa física, qualificação VÍTIMA)"""
+    grupo_tipificado, naturezas = GRUPOS_VITIMAS[grupo]
+    lista = ', '.join(f':nat_{grupo}_{i}' for i in range(len(naturezas)))
+    return (
+        f"(UPPER(nat_tip_pes.GRUPO) = '{grupo_tipificado}' OR nat_pes.naturezaid IN ({lista}))\n"
+        "  AND nat_pes.consumacaoenum = 'CONSUMADO'\n"
+        "  AND ope.tipopessoaenum = 'FISICA'\n"
+        "  AND qcap.nome = 'VÍTIMA'"
+    )
+
+
+def sql_carga_vitimas(grupo):
+    """INSERT ... SELECT que materializa as vítimas do grupo desde o início da série"""
+    return f"""
+INSERT INTO {TABELA_VITIMAS} (grupo, ocorrenciapessoa_id, pessoa_natureza_id, pessoa_natureza_qual_id)
+SELECT DISTINCT :grupo_{grupo}, ope.id, opn.id, opnq.id
+FROM bu.ocorrencia oc
+INNER JOIN bu.ocorrenciapessoa ope ON ope.ocorrencia_id = oc.id
+INNER JOIN bu.ocorrencia_pessoa_natur opn ON opn.ocorrenciapessoa_id = ope.id
+INNER JOIN bu.natureza nat_pes ON nat_pes.id = opn.natureza_id
+INNER JOIN user_transacional.e_natureza_spi_tipificada_mview nat_tip_pes ON nat_tip_pes.spi_natureza_id = nat_pes.naturezaid
+INNER JOIN bu.ocorrencia_pessoa_natur_qual opnq ON opnq.ocorrenciapessoanatureza_id = opn.id
+INNER JOIN bu.qualificacao qua ON qua.id = opnq.qualificacoes_id
+INNER JOIN spi.qalificacao qa ON qa.codigo_qualificacao = qua.qualificacaoid
+INNER JOIN spi.qualificacao_categorias qcap ON qcap.qualificacao_categoria = qa.qualificacao_categoria
+WHERE oc.statusocorrencia = 'OCORRENCIA'
+  AND oc.datafato >= DATE '{DATA_INICIO_SERIE}'
+  AND {filtro_vitimas_inline(grupo)}
+"""
+
+
+def fontes_inline(grupos):
+    """Trechos originais (sem staging) para cada marcador das consultas"""
+    fontes = {'area_bairro': f"({SQL_AREA_BAIRRO})"}
+    for grupo in grupos:
+        fontes[f'vitimas_{grupo}'] = filtro_vitimas_inline(grupo)
+    return fontes
+
+
+def _garantir_gtt(cur, tabela, definicao):
+    """Cria a GTT se ainda não existir (ORA-00955 = nome já usado)"""
+    try:
+        cur.execute(f"CREATE GLOBAL TEMPORARY TABLE {tabela} {definicao}")
+    except Exception as e:
+        if 'ORA-00955' not in str(e):
+            raise
+
+
+def staging_ativo():
+    """PYSQL_STAGING lido na hora do uso (o .env pode ser carregado depois do import)"""
+    return os.getenv('PYSQL_STAGING', '1').strip().lower() not in ('0', 'false', 'nao', 'não', 'no')
+
+
+def preparar_staging(cursor, grupos=('homicidio',)):
+    """
+    Materializa o mapeamento de áreas e as vítimas dos grupos informados.
+
+    Args:
+        cursor: Cursor Oracle (um cursor separado é usado para o staging)
+        grupos (tuple): Grupos de vítimas usados pelo script
+
+    Returns:
+        dict: Trecho SQL de cada marcador ({area_bairro}, {vitimas_<grupo>})
+    """
+    fontes = fontes_inline(grupos)
+    if not staging_ativo():
+        print("ℹ️ Staging desativado (PYSQL_STAGING=0); usando subconsultas inline.")
+        return fontes
+
+    cur = cursor.connection.cursor()
+    try:
+        # 1. Bairro → siglas das circunscrições
+        try:
+            _garantir_gtt(cur, TABELA_AREA_BAIRRO, f"ON COMMIT PRESERVE ROWS AS {SQL_AREA_BAIRRO} HAVING 1 = 0")
+            cur.execute(f"DELETE FROM {TABELA_AREA_BAIRRO}")
+            cur.execute(f"INSERT INTO {TABELA_AREA_BAIRRO} (cod_bairro, siglas) {SQL_AREA_BAIRRO}")
+            print(f"✅ Staging de áreas: {cur.rowcount} bairro(s) em {TABELA_AREA_BAIRRO}")
+            fontes['area_bairro'] = TABELA_AREA_BAIRRO
+        except Exception as e:
+            print(f"⚠️ Staging de áreas indisponível, usando subconsulta inline: {e}")
+
+        # 2. Vítimas filtradas por natureza/qualificação
+        try:
+            _garantir_gtt(
+                cur, TABELA_VITIMAS,
+                "(grupo VARCHAR2(20), ocorrenciapessoa_id NUMBER, pessoa_natureza_id NUMBER, "
+                "pessoa_natureza_qual_id NUMBER) ON COMMIT PRESERVE ROWS"
+            )
+            cur.execute(f"DELETE FROM {TABELA_VITIMAS}")
+            for grupo in grupos:
+                carga = sql_carga_vitimas(grupo)
+                cur.execute(carga, parametros_da_consulta(carga, parametros_vitimas((grupo,))))
+                print(f"✅ Staging de vítimas ({grupo}): {cur.rowcount} registro(s) em {TABELA_VITIMAS}")
+                fontes[f'vitimas_{grupo}'] = (
+                    f"(ope.id, opn.id, opnq.id) IN (SELECT ocorrenciapessoa_id, pessoa_natureza_id, "
+                    f"pessoa_natureza_qual_id FROM {TABELA_VITIMAS} WHERE grupo = :grupo_{grupo})"
+                )
+        except Exception as e:
+            print(f"⚠️ Staging de vítimas indisponível, usando filtro inline: {e}")
+            for grupo in grupos:
+                fontes[f'vitimas_{grupo}'] = filtro_vitimas_inline(grupo)
+
+        cursor.connection.commit()
+    finally:
+        cur.close()
+    return fontes
+
+
+def montar_consulta(query, fontes):
+    """Substitui os marcadores {area_bairro} e {vitimas_<grupo>} pelos trechos da etapa de staging"""
+    for marcador, trecho in fontes.items():
+        query = query.replace('{' + marcador + '}', trecho)
+    return query
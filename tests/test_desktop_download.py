@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do download segmentado do Qlik Sense Desktop contra um servidor HTTP local
+O servidor entrega um conteúdo fixo, com ou sem suporte a Range, e registra
+as faixas pedidas para conferir a divisão e a retomada
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik import desktop_download
+from crawler_qlik.desktop_download import download, partial_path
+
+CONTEUDO = bytes(range(256)) * 400  # 102400 bytes
+SHA256 = hashlib.sha256(CONTEUDO).hexdigest()
+SEGMENTO = 16 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Responde GET com CONTEUDO; com aceita_range, atende "Range: bytes=a-b" com 206"""
+
+    def do_GET(self):
+        servidor = self.server
+        faixa = self.headers.get("Range")
+        servidor.faixas.append(faixa)
+        if faixa and servidor.aceita_range:
+            inicio, fim = (int(v) for v in faixa.split("=", 1)[1].split("-"))
+            corpo = CONTEUDO[inicio:fim + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{inicio + len(corpo) - 1}/{len(CONTEUDO)}")
+        else:
+            corpo = CONTEUDO
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    """Servidor HTTP local em porta livre; aceita_range liga/desliga o suporte a Range"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.aceita_range = True
+    httpd.faixas = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/QlikSenseDesktopSetup.exe"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def pasta_parcial(tmp_path, monkeypatch):
+    """Downloads parciais numa pasta temporária e faixas pequenas para dividir o arquivo de teste"""
+    pasta = tmp_path / "parciais"
+    monkeypatch.setattr(desktop_download, "PARTIAL_DIR", pasta)
+    monkeypatch.setattr(desktop_download, "MIN_SEGMENT_SIZE", SEGMENTO)
+    return pasta
+
+
+def _baixar(url, destino, **kwargs):
+    return download(url, destino, {}, destino.name, expected_size=len(CONTEUDO),
+                    expected_sha256=SHA256, segments=4, timeout=10, retries=1, retry_sleep=0, **kwargs)
+
+
+def test_download_em_faixas_confere_tamanho_e_sha(servidor, tmp_path, pasta_parcial):
+    destino = tmp_path / "destino" / "QlikSenseDesktopSetup.exe"
+
+    _baixar(servidor.url, destino)
+
+    assert destino.read_bytes() == CONTEUDO
+    # Sonda do primeiro byte e quatro faixas de 25600 bytes
+    assert servidor.faixas[0] == "bytes=0-0"
+    assert sorted(servidor.faixas[1:]) == [
+        "bytes=0-25599", "bytes=25600-51199", "bytes=51200-76799", "bytes=76800-102399",
+    ]
+    assert list(pasta_parcial.iterdir()) == []
+
+
+def test_retoma_de_part_e_estado_existentes(servidor, tmp_path, pasta_parcial):
+    destino = tmp_path / "QlikSenseDesktopSetup.exe"
+    pasta_parcial.mkdir(parents=True)
+    part = partial_path(servidor.url, destino.name)
+    # Primeira faixa completa e metade da segunda já gravadas por uma execução anterior
+    gravado = bytearray(len(CONTEUDO))
+    gravado[:38400] = CONTEUDO[:38400]
+    part.write_bytes(bytes(gravado))
+    estado = {"url_key": part.stem, "total": len(CONTEUDO),
+              "segments": [[25600, 25599], [38400, 51199], [51200, 76799], [76800, 102399]]}
+    part.with_name(part.name + ".json").write_text(json.dumps(estado), encoding="utf-8")
+
+    _baixar(servidor.url, destino)
+
+    assert destino.read_bytes() == CONTEUDO
+    assert sorted(servidor.faixas[1:]) == ["bytes=38400-51199", "bytes=51200-76799", "bytes=76800-102399"]
+    assert not part.exists() and not part.with_name(part.name + ".json").exists()
+
+
+def test_servidor_sem_range_usa_fluxo_unico(servidor, tmp_path):
+    servidor.aceita_range = False
+    destino = tmp_path / "QlikSenseDesktopSetup.exe"
+
+    _baixar(servidor.url, destino)
+
+    assert destino.read_bytes() == CONTEUDO
+    # Sonda (ignorada pelo servidor) e um único GET sem Range
+    assert servidor.faixas == ["bytes=0-0", None]
+
+
+def test_conclusao_remove_parciais_abandonados(servidor, tmp_path, pasta_parcial):
+    destino = tmp_path / "QlikSenseDesktopSetup.exe"
+    pasta_parcial.mkdir(parents=True)
+    versao_antiga = partial_path(servidor.url, destino.name, version_tag="2024-11-01")
+    versao_antiga.write_bytes(b"x")
+    versao_antiga.with_name(versao_antiga.name + ".json").write_text("{}", encoding="utf-8")
+    outro_recente = partial_path(servidor.url + "?outro", "QlikSenseDesktopSetup.exe.sig")
+    outro_recente.write_bytes(b"x")
+    outro_parado = partial_path(servidor.url + "?velho", "Outro.exe")
+    outro_parado.write_bytes(b"x")
+    oito_dias = time.time() - 8 * 86400
+    os.utime(outro_parado, (oito_dias, oito_dias))
+
+    _baixar(servidor.url, destino, version_tag="2025-03-01")
+
+    assert sorted(p.name for p in pasta_parcial.iterdir()) == [outro_recente.name]
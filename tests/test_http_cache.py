@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do cache HTTP condicional com um servidor local no lugar da API do GitHub
+O servidor responde 304 quando recebe o ETag atual em If-None-Match e
+registra os cabeçalhos de cada requisição
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.http_cache import HttpCache
+
+ETAG = '"release-v1"'
+LAST_MODIFIED = "Mon, 03 Mar 2025 08:00:00 GMT"
+CORPO = [{"tag_name": "v1", "assets": []}]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET com ETag/Last-Modified; 304 sem corpo quando o ETag enviado é o atual"""
+
+    def do_GET(self):
+        self.server.requisicoes.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        corpo = json.dumps(CORPO).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    """Servidor local em porta livre com a lista de requisições recebidas"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requisicoes = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/repos/qlik/desktop/releases"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_resposta_200_guarda_etag_e_last_modified(servidor, tmp_path):
+    arquivo = tmp_path / "github_http.json"
+    cache = HttpCache(arquivo)
+
+    assert cache.get_json(servidor.url, {}, timeout=5) == CORPO
+
+    entrada = json.loads(arquivo.read_text(encoding="utf-8"))[servidor.url]
+    assert entrada["etag"] == ETAG
+    assert entrada["last_modified"] == LAST_MODIFIED
+    assert entrada["body"] == CORPO and entrada["synced"] is False
+    assert "If-None-Match" not in servidor.requisicoes[0]
+
+
+def test_resposta_304_devolve_o_corpo_do_cache(servidor, tmp_path):
+    cache = HttpCache(tmp_path / "github_http.json")
+    cache.get_json(servidor.url, {}, timeout=5)
+
+    assert cache.get_json(servidor.url, {}, timeout=5) == CORPO
+
+    condicional = servidor.requisicoes[1]
+    assert condicional["If-None-Match"] == ETAG
+    assert condicional["If-Modified-Since"] == LAST_MODIFIED
+    assert servidor.url in cache.revalidated
+
+
+def test_unchanged_so_depois_de_mark_synced(servidor, tmp_path):
+    arquivo = tmp_path / "github_http.json"
+    cache = HttpCache(arquivo)
+    urls = [servidor.url]
+
+    cache.get_json(servidor.url, {}, timeout=5)
+    assert not cache.unchanged(urls)  # 200: conteúdo novo
+    cache.get_json(servidor.url, {}, timeout=5)
+    assert not cache.unchanged(urls)  # 304, mas ainda não processado
+    cache.mark_synced(urls)
+    assert cache.unchanged(urls)
+
+    # Próxima execução: a marca de processado vem do disco e vale após um novo 304
+    proxima = HttpCache(arquivo)
+    assert not proxima.unchanged(urls)
+    proxima.get_json(servidor.url, {}, timeout=5)
+    assert proxima.unchanged(urls)
+
+
+def test_entradas_vencidas_sao_descartadas_na_carga(servidor, tmp_path):
+    arquivo = tmp_path / "github_http.json"
+    vencida = {"etag": ETAG, "last_modified": LAST_MODIFIED, "fetched_at": time.time() - 3 * 3600,
+               "synced": True, "body": CORPO}
+    recente = dict(vencida, fetched_at=time.time())
+    arquivo.write_text(json.dumps({servidor.url: vencida, "http://outra/url": recente}), encoding="utf-8")
+
+    cache = HttpCache(arquivo, max_age_hours=2)
+    cache.get_json(servidor.url, {}, timeout=5)
+
+    # Sem a entrada vencida, a requisição sai sem condição e recebe 200
+    assert "If-None-Match" not in servidor.requisicoes[0]
+    assert not cache.unchanged([servidor.url])
+    assert set(json.loads(arquivo.read_text(encoding="utf-8"))) == {servidor.url, "http://outra/url"}
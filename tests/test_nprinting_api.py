@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do cliente da API do NPrinting com uma sessão HTTP injetada
+A sessão de teste responde às rotas da API a partir de listas em memória e
+registra cada requisição, sem servidor nem rede
+"""
+
+import json
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+import requests
+from requests.cookies import RequestsCookieJar
+
+# Adiciona o diretório raiz do projeto ao sys.path (execução direta ou via -m)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawler_qlik.nprinting_api import NPrintingApiClient, NPrintingApiError
+
+DIA = date(2025, 3, 3)
+BASE_URL = "https://nprinting.local:4993"
+STATUS_MAP = {"label label-danger": "Falha", "label label-success": "Concluída"}
+
+
+def _criado(dia: date, hora: int) -> str:
+    """Data ISO da API (no fuso local, com offset) para um horário do dia"""
+    return datetime(dia.year, dia.month, dia.day, hora).astimezone().isoformat()
+
+
+def _resposta(url: str, status: int, corpo=None) -> requests.Response:
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta.url = url
+    resposta._content = json.dumps(corpo or {}).encode("utf-8")
+    resposta.headers["Content-Type"] = "application/json"
+    return resposta
+
+
+class SessaoStub:
+    """Sessão HTTP de teste: execuções/tarefas em memória, paginadas por limit/offset"""
+
+    def __init__(self, execucoes, tarefas=None, aceita_filtro=True, login_status=200):
+        self.execucoes = execucoes
+        self.tarefas = tarefas or []
+        self.aceita_filtro = aceita_filtro
+        self.login_status = login_status
+        self.cookies = RequestsCookieJar()
+        self.headers = {}
+        self.verify = True
+        self.chamadas = []
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        self.chamadas.append(("POST", url, json))
+        if self.login_status < 400:
+            self.cookies.set("NPWEBCONSOLE_XSRF-TOKEN", "token-xsrf")
+        return _resposta(url, self.login_status)
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        params = dict(params or {})
+        self.chamadas.append(("GET", url, params))
+        if url.endswith("/api/v1/tasks/executions"):
+            if "created" in params and not self.aceita_filtro:
+                return _resposta(url, 400)
+            itens = self.execucoes
+        elif url.endswith("/api/v1/tasks"):
+            itens = self.tarefas
+        else:
+            return _resposta(url, 404)
+        inicio = params.get("offset", 0)
+        pagina = itens[inicio:inicio + params.get("limit", len(itens))]
+        return _resposta(url, 200, {"data": {"items": pagina, "totalItems": len(itens)}})
+
+    def consultas_execucoes(self):
+        return [params for metodo, url, params in self.chamadas
+                if metodo == "GET" and url.endswith("/api/v1/tasks/executions")]
+
+
+def _execucoes():
+    """Três execuções do dia (mais recentes primeiro) seguidas de histórico"""
+    hoje = [{"id": f"e{h}", "task": "t1", "status": "Completed", "progress": 1, "created": _criado(DIA, h)}
+            for h in (15, 12, 9)]
+    ontem = DIA - timedelta(days=1)
+    historico = [{"id": f"h{h}", "task": "t1", "status": "Completed", "progress": 1, "created": _criado(ontem, h)}
+                 for h in (22, 20, 18, 16, 14, 12)]
+    return hoje + historico
+
+
+def test_paginacao_para_no_primeiro_registro_anterior_ao_dia():
+    sessao = SessaoStub(_execucoes())
+    cliente = NPrintingApiClient(BASE_URL, session=sessao, page_size=2)
+
+    ids = [item["id"] for item in cliente.execucoes_do_dia(DIA)]
+
+    assert ids == ["e15", "e12", "e9"]
+    # Página 1: e15, e12; página 2: e9 e o primeiro do histórico, onde a leitura para
+    consultas = sessao.consultas_execucoes()
+    assert [c["offset"] for c in consultas] == [0, 2]
+    assert all(c["sort"] == "-created" and "created" in c for c in consultas)
+
+
+def test_filtro_por_data_recusado_repete_sem_o_filtro():
+    sessao = SessaoStub(_execucoes(), aceita_filtro=False)
+    cliente = NPrintingApiClient(BASE_URL, session=sessao, page_size=2)
+
+    ids = [item["id"] for item in cliente.execucoes_do_dia(DIA)]
+
+    assert ids == ["e15", "e12", "e9"]
+    consultas = sessao.consultas_execucoes()
+    assert "created" in consultas[0]
+    assert all("created" not in c for c in consultas[1:])
+    assert [c["offset"] for c in consultas[1:]] == [0, 2]
+
+
+def test_login_copia_token_xsrf_e_recusa_credenciais_invalidas():
+    sessao = SessaoStub([])
+    NPrintingApiClient(BASE_URL, session=sessao).login("bi@exemplo.gov.br", "senha")
+    assert sessao.headers["X-XSRF-TOKEN"] == "token-xsrf"
+
+    with pytest.raises(NPrintingApiError):
+        NPrintingApiClient(BASE_URL, session=SessaoStub([], login_status=401)).login("bi@exemplo.gov.br", "errada")
+
+
+def test_tarefas_por_status_no_formato_da_raspagem():
+    execucoes = [
+        {"id": "e2", "task": "t1", "status": "Failed", "progress": 0.5, "created": _criado(DIA, 10)},
+        {"id": "e1", "task": "t1", "status": "Completed", "progress": 1, "created": _criado(DIA, 8)},
+    ]
+    tarefas = [{"id": "t1", "name": "Relatório Diário", "type": "publish"}]
+    cliente = NPrintingApiClient(BASE_URL, session=SessaoStub(execucoes, tarefas))
+
+    por_status = cliente.tarefas_por_status(DIA, STATUS_MAP)
+
+    assert por_status["Falha"] == [[
+        "Relatório Diário", "Publicação de relatórios", "Falha", "50%",
+        "3 de março de 2025 às 10:00", "",
+    ]]
+    assert len(por_status["Concluída"]) == 1
+    assert cliente.falhas == [("Relatório Diário", "e2")]